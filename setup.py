@@ -51,6 +51,16 @@ extras_require = {
             "python-dotenv==0.19.2",
         ]
     ),
+    "http2": (
+        [
+            "h2>=3,<5",
+        ]
+    ),
+    "orjson": (
+        [
+            "orjson>=3.6.0",
+        ]
+    ),
 }
 
 exclude_list = [
@@ -0,0 +1,170 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import abc
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING, Dict, List, Union
+
+if TYPE_CHECKING:
+    from .supertokens import Host
+
+
+def get_host_key(host: Host) -> str:
+    return (
+        host.domain.get_as_string_dangerous() + host.base_path.get_as_string_dangerous()
+    )
+
+
+class HostSelector(abc.ABC):
+    """
+    Decides the order in which the SuperTokens core hosts (from `connection_uri`)
+    are tried for a request. The querier reports the outcome of every attempt
+    back to the selector so that it can adapt the order over time.
+    """
+
+    @abc.abstractmethod
+    def get_hosts_in_order_of_preference(self, hosts: List[Host]) -> List[Host]:
+        pass
+
+    def on_success(self, host: Host, latency_ms: float) -> None:
+        pass
+
+    def on_failure(self, host: Host) -> None:
+        pass
+
+
+class RoundRobinHostSelector(HostSelector):
+    def __init__(self):
+        self.__last_tried_index = 0
+        self.__lock = Lock()
+
+    def get_hosts_in_order_of_preference(self, hosts: List[Host]) -> List[Host]:
+        if len(hosts) == 0:
+            return []
+        with self.__lock:
+            start = self.__last_tried_index % len(hosts)
+            self.__last_tried_index = (start + 1) % len(hosts)
+        return hosts[start:] + hosts[:start]
+
+    def on_failure(self, host: Host) -> None:
+        # The next request should start after the host that just failed,
+        # which is where a retry of the current request would have gone.
+        with self.__lock:
+            self.__last_tried_index += 1
+
+
+class HostHealth:
+    def __init__(self):
+        self.ewma_latency_ms: Union[float, None] = None
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.total_successes = 0
+        self.circuit_opened_at: Union[float, None] = None
+        self.probe_started_at: Union[float, None] = None
+
+
+class HealthAwareHostSelector(HostSelector):
+    """
+    Prefers the healthy host with the lowest EWMA latency. A host that fails
+    `failure_threshold` times in a row has its circuit opened and is only tried
+    after all other hosts, until `open_circuit_duration_ms` has passed. After
+    that a single request is let through as a probe (half-open state): if it
+    succeeds the circuit is closed again, otherwise it is re-opened.
+    """
+
+    def __init__(
+        self,
+        ewma_alpha: float = 0.3,
+        failure_threshold: int = 3,
+        open_circuit_duration_ms: int = 10000,
+    ):
+        if not 0 < ewma_alpha <= 1:
+            raise ValueError("ewma_alpha must be in the range (0, 1]")
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.open_circuit_duration_ms = open_circuit_duration_ms
+        self.__health: Dict[str, HostHealth] = {}
+        self.__lock = Lock()
+
+    def get_host_health(self, host: Host) -> HostHealth:
+        key = get_host_key(host)
+        health = self.__health.get(key)
+        if health is None:
+            health = self.__health.setdefault(key, HostHealth())
+        return health
+
+    def get_hosts_in_order_of_preference(self, hosts: List[Host]) -> List[Host]:
+        now = monotonic() * 1000
+        closed: List[Host] = []
+        probes: List[Host] = []
+        opened: List[Host] = []
+        with self.__lock:
+            for host in hosts:
+                health = self.get_host_health(host)
+                if health.circuit_opened_at is None:
+                    closed.append(host)
+                elif (
+                    now - health.circuit_opened_at >= self.open_circuit_duration_ms
+                    and (
+                        health.probe_started_at is None
+                        or now - health.probe_started_at
+                        >= self.open_circuit_duration_ms
+                    )
+                ):
+                    health.probe_started_at = now
+                    probes.append(host)
+                else:
+                    opened.append(host)
+
+        # Hosts that have been failing (but not enough to open their circuit)
+        # are tried last. Hosts we have no latency data about yet are tried
+        # first so that we learn about them.
+        closed.sort(
+            key=lambda h: (
+                self.get_host_health(h).consecutive_failures > 0,
+                self.get_host_health(h).ewma_latency_ms or 0.0,
+            ),
+        )
+        return probes + closed + opened
+
+    def on_success(self, host: Host, latency_ms: float) -> None:
+        with self.__lock:
+            health = self.get_host_health(host)
+            if health.ewma_latency_ms is None:
+                health.ewma_latency_ms = latency_ms
+            else:
+                health.ewma_latency_ms = (
+                    self.ewma_alpha * latency_ms
+                    + (1 - self.ewma_alpha) * health.ewma_latency_ms
+                )
+            health.total_successes += 1
+            health.consecutive_failures = 0
+            health.circuit_opened_at = None
+            health.probe_started_at = None
+
+    def on_failure(self, host: Host) -> None:
+        with self.__lock:
+            health = self.get_host_health(host)
+            health.total_failures += 1
+            health.consecutive_failures += 1
+            if (
+                health.probe_started_at is not None
+                or health.consecutive_failures >= self.failure_threshold
+            ):
+                health.circuit_opened_at = monotonic() * 1000
+                health.probe_started_at = None
@@ -0,0 +1,124 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import abc
+import json
+from typing import Any, Union
+
+
+class JSONCodec(abc.ABC):
+    """
+    Encodes / decodes the JSON used by the SDK (requests to and responses from
+    the core, JWT payloads, the front token header, logs). `dumps` always
+    produces compact output (no whitespace). `loads` raises a ValueError for
+    invalid JSON.
+    """
+
+    name: str
+
+    @abc.abstractmethod
+    def dumps(self, obj: Any, sort_keys: bool = False) -> str:
+        pass
+
+    @abc.abstractmethod
+    def loads(self, s: Union[str, bytes]) -> Any:
+        pass
+
+
+class StdlibJSONCodec(JSONCodec):
+    name = "json"
+
+    def dumps(self, obj: Any, sort_keys: bool = False) -> str:
+        return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys)
+
+    def loads(self, s: Union[str, bytes]) -> Any:
+        return json.loads(s)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson  # type: ignore # pylint: disable=import-outside-toplevel
+
+        self.__orjson: Any = orjson
+        self.__stdlib = StdlibJSONCodec()
+
+    def dumps(self, obj: Any, sort_keys: bool = False) -> str:
+        try:
+            return self.__orjson.dumps(
+                obj, option=self.__orjson.OPT_SORT_KEYS if sort_keys else None
+            ).decode()
+        except TypeError:
+            # orjson is stricter than json (for example for non str dict keys
+            # or ints larger than 64 bits)
+            return self.__stdlib.dumps(obj, sort_keys)
+
+    def loads(self, s: Union[str, bytes]) -> Any:
+        try:
+            return self.__orjson.loads(s)
+        except ValueError:
+            # Same as above, for example for NaN. Invalid JSON raises again.
+            return self.__stdlib.loads(s)
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def __init__(self):
+        import ujson  # type: ignore # pylint: disable=import-outside-toplevel
+
+        self.__ujson: Any = ujson
+
+    def dumps(self, obj: Any, sort_keys: bool = False) -> str:
+        return self.__ujson.dumps(
+            obj, sort_keys=sort_keys, escape_forward_slashes=False
+        )
+
+    def loads(self, s: Union[str, bytes]) -> Any:
+        return self.__ujson.loads(s)
+
+
+def _detect_json_codec() -> JSONCodec:
+    for codec_class in (OrjsonCodec, UjsonCodec):
+        try:
+            return codec_class()
+        except ImportError:
+            pass
+    return StdlibJSONCodec()
+
+
+_codec: JSONCodec = _detect_json_codec()
+
+
+def get_json_codec() -> JSONCodec:
+    return _codec
+
+
+def set_json_codec(codec: JSONCodec) -> None:
+    """
+    Overrides the codec detected at import time (orjson, then ujson if
+    installed, else the json module).
+    """
+    global _codec  # pylint: disable=global-statement
+    _codec = codec
+
+
+def json_dumps(obj: Any, sort_keys: bool = False) -> str:
+    return _codec.dumps(obj, sort_keys)
+
+
+def json_loads(s: Union[str, bytes]) -> Any:
+    return _codec.loads(s)
@@ -12,13 +12,14 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import json
 import logging
 from datetime import datetime
+from functools import lru_cache
 from os import getenv, path
-from typing import Union
+from typing import Any, Callable, Union
 
 from .constants import VERSION
+from .json_codec import json_dumps
 
 NAMESPACE = "com.supertokens"
 DEBUG_ENV_VAR = "SUPERTOKENS_DEBUG"
@@ -36,11 +37,17 @@ def _get_log_timestamp() -> str:
     return datetime.utcnow().isoformat()[:-3] + "Z"
 
 
+@lru_cache(maxsize=None)
+def _get_relative_path(pathname: str) -> str:
+    # Only called with the paths of the source files that log
+    return path.relpath(pathname, supertokens_dir)
+
+
 class CustomStreamHandler(logging.StreamHandler):  # type: ignore
     def emit(self, record: logging.LogRecord):
-        relative_path = path.relpath(record.pathname, supertokens_dir)
+        relative_path = _get_relative_path(record.pathname)
 
-        record.msg = json.dumps(
+        record.msg = json_dumps(
             {
                 "t": _get_log_timestamp(),
                 "sdkVer": VERSION,
@@ -62,12 +69,29 @@ _logger.addHandler(streamHandler)
 # The debug logger can be used like this:
 # log_debug_message("Hello")
 # Output log format:
-# com.supertokens {"t": "2022-03-24T06:28:33.659Z", "sdkVer": "0.5.1", "message": "Hello", "file": "logger.py:73"}
+# com.supertokens {"t":"2022-03-24T06:28:33.659Z","sdkVer":"0.5.1","message":"Hello","file":"logger.py:73"}
 
-# Export logger.debug as log_debug_message function
+# Export logger.debug as log_debug_message function. The message is only
+# formatted (with "%s" placeholders for the args) if debug logging is enabled.
 log_debug_message = _logger.debug
 
 
+class LazyLogArg:
+    """
+    An argument of log_debug_message that is only computed if the message is
+    logged, for arguments that are expensive to compute:
+    log_debug_message("value: %s", LazyLogArg(lambda: json_dumps(value)))
+    """
+
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+
+    def __str__(self) -> str:
+        return str(self.func())
+
+
 def get_maybe_none_as_str(o: Union[str, None]) -> str:
     if o is None:
         return "None"
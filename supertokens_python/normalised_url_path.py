@@ -14,6 +14,7 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
@@ -42,6 +43,9 @@ class NormalisedURLPath:
         return self.__value == "/recipe" or self.__value.startswith("/recipe/")
 
 
+# Request paths are normalised for every request the middleware handles, and
+# most of them repeat. Invalid paths aren't cached, so they raise every time.
+@lru_cache(maxsize=1024)
 def normalise_url_path_or_throw_error(input_str: str) -> str:
     input_str = input_str.strip().lower()
 
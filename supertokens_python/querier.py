@@ -13,11 +13,25 @@
 # under the License.
 from __future__ import annotations
 
-from json import JSONDecodeError
+import asyncio
+import sys
+from copy import deepcopy
 from os import environ
-from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict
+from threading import Lock
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Awaitable, Callable, Dict
 
-from httpx import AsyncClient, ConnectTimeout, NetworkError, Response
+from httpx import (
+    USE_CLIENT_DEFAULT,
+    AsyncClient,
+    Client,
+    ConnectTimeout,
+    Limits,
+    NetworkError,
+    Response,
+    TimeoutException,
+)
+from typing_extensions import Literal
 
 from .constants import (
     API_KEY_HEADER,
@@ -31,11 +45,61 @@ from .normalised_url_path import NormalisedURLPath
 if TYPE_CHECKING:
     from .supertokens import Host
 
-from typing import List, Set, Union
+from typing import List, Set, Tuple, Union
 
 from .exceptions import raise_general_exception
+from .host_selector import HostSelector, RoundRobinHostSelector, get_host_key
+from .json_codec import json_loads
+from .logger import log_debug_message
 from .process_state import AllowedProcessStates, ProcessState
-from .utils import find_max_version, is_4xx_error, is_5xx_error
+from .request_hedging import HedgingConfig
+from .request_observer import CoreRequestEvent, CoreRequestObserver
+from .response_cache import ResponseCacheConfig
+from .retry_policy import RetryPolicy
+from .utils import (
+    SingleFlight,
+    find_max_version,
+    is_4xx_error,
+    is_5xx_error,
+    run_with_limited_concurrency,
+)
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_KEEP_ALIVE_EXPIRY_IN_SEC = 5.0
+DEFAULT_SEND_MANY_MAX_CONCURRENCY = 10
+
+
+def is_ok_response(response: Any) -> bool:
+    return isinstance(response, dict) and response.get("status") == "OK"  # type: ignore
+
+
+class RequestCoalescingStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get_hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+
+class CoreRequest:
+    """
+    A request to the core, as sent by `Querier.send_many`. `data` is sent as
+    the query params for GET and DELETE requests, and as the body otherwise.
+    """
+
+    def __init__(
+        self,
+        method: Literal["GET", "POST", "PUT", "DELETE"],
+        path: NormalisedURLPath,
+        data: Union[Dict[str, Any], None] = None,
+    ):
+        self.method: Literal["GET", "POST", "PUT", "DELETE"] = method
+        self.path = path
+        self.data = data
 
 
 class Querier:
@@ -43,8 +107,30 @@ class Querier:
     __hosts: List[Host] = []
     __api_key: Union[None, str] = None
     __api_version = None
-    __last_tried_index: int = 0
+    __host_selector: HostSelector = RoundRobinHostSelector()
     __hosts_alive_for_testing: Set[str] = set()
+    __max_connections: int = DEFAULT_MAX_CONNECTIONS
+    __keep_alive_expiry_in_sec: float = DEFAULT_KEEP_ALIVE_EXPIRY_IN_SEC
+    __http2: bool = False
+    # One pooled client per event loop: httpx connections are bound to the loop
+    # that opened them, and sync mode runs requests on thread local loops.
+    __clients: Dict[asyncio.AbstractEventLoop, AsyncClient] = {}
+    # See __close_client_on_loop_shutdown
+    __client_closers: Dict[asyncio.AbstractEventLoop, AsyncGenerator[None, None]] = {}
+    # Used by the *_sync methods, which don't need an event loop. Unlike the
+    # async clients, a sync client can be shared across threads.
+    __sync_client: Union[Client, None] = None
+    __sync_client_lock = Lock()
+    __coalesce_get_requests: bool = False
+    __in_flight_get_requests: SingleFlight[str, Any] = SingleFlight()
+    __coalescing_stats = RequestCoalescingStats()
+    __response_cache: Union[ResponseCacheConfig, None] = None
+    # Bumped on every cache invalidation, so that a GET that was in flight while
+    # a write happened doesn't put its (possibly stale) response in the cache.
+    __response_cache_generation: int = 0
+    __hedging: Union[HedgingConfig, None] = None
+    __retry_policy: Union[RetryPolicy, None] = None
+    __request_observers: List[CoreRequestObserver] = []
 
     def __init__(self, hosts: List[Host], rid_to_core: Union[None, str] = None):
         self.__hosts = hosts
@@ -59,6 +145,9 @@ class Querier:
         ):
             raise_general_exception("calling testing function in non testing env")
         Querier.__init_called = False
+        Querier.__clients = {}
+        Querier.__client_closers = {}
+        Querier.__sync_client = None
 
     @staticmethod
     def get_hosts_alive_for_testing():
@@ -80,24 +169,50 @@ class Querier:
             headers = {}
             if Querier.__api_key is not None:
                 headers = {API_KEY_HEADER: Querier.__api_key}
-            async with AsyncClient() as client:
-                return await client.get(url, headers=headers)  # type:ignore
+            return await Querier.__get_client().get(url, headers=headers)  # type:ignore
 
         response = await self.__send_request_helper(
-            NormalisedURLPath(API_VERSION), "GET", f, len(self.__hosts)
+            NormalisedURLPath(API_VERSION), "GET", f
         )
+        return Querier.__set_api_version(response)
+
+    def get_api_version_sync(self):
+        if Querier.__api_version is not None:
+            return Querier.__api_version
+
+        ProcessState.get_instance().add_state(
+            AllowedProcessStates.CALLING_SERVICE_IN_GET_API_VERSION
+        )
+
+        def f(url: str, timeout: Union[float, None]) -> Response:
+            headers = {}
+            if Querier.__api_key is not None:
+                headers = {API_KEY_HEADER: Querier.__api_key}
+            return Querier.__get_sync_client().get(  # type:ignore
+                url,
+                headers=headers,
+                timeout=USE_CLIENT_DEFAULT if timeout is None else timeout,
+            )
+
+        response = self.__send_request_helper_sync(
+            NormalisedURLPath(API_VERSION), "GET", f
+        )
+        return Querier.__set_api_version(response)
+
+    @staticmethod
+    def __set_api_version(response: Any) -> str:
         cdi_supported_by_server = response["versions"]
         api_version = find_max_version(cdi_supported_by_server, SUPPORTED_CDI_VERSIONS)
 
         if api_version is None:
-            raise_general_exception(
+            return raise_general_exception(
                 "The running SuperTokens core version is not compatible with this FastAPI "
                 "SDK. Please visit https://supertokens.io/docs/community/compatibility-table "
                 "to find the right versions"
             )
 
         Querier.__api_version = api_version
-        return Querier.__api_version
+        return api_version
 
     @staticmethod
     def get_instance(rid_to_core: Union[str, None] = None):
@@ -108,17 +223,170 @@ class Querier:
         return Querier(Querier.__hosts, rid_to_core)
 
     @staticmethod
-    def init(hosts: List[Host], api_key: Union[str, None] = None):
+    def init(
+        hosts: List[Host],
+        api_key: Union[str, None] = None,
+        max_connections: Union[int, None] = None,
+        keep_alive_expiry_in_sec: Union[float, None] = None,
+        http2: bool = False,
+        host_selector: Union[HostSelector, None] = None,
+        coalesce_get_requests: bool = False,
+        response_cache: Union[ResponseCacheConfig, None] = None,
+        hedging: Union[HedgingConfig, None] = None,
+        retry_policy: Union[RetryPolicy, None] = None,
+        request_observers: Union[List[CoreRequestObserver], None] = None,
+    ):
         if not Querier.__init_called:
+            if http2:
+                try:
+                    import h2  # type: ignore # pylint: disable=import-outside-toplevel,unused-import
+                except ImportError:
+                    raise_general_exception(
+                        "http2 is enabled in supertokens_config, but the h2 package is not "
+                        "installed. Please install it using: pip install supertokens_python[http2]"
+                    )
             Querier.__init_called = True
             Querier.__hosts = hosts
             Querier.__api_key = api_key
             Querier.__api_version = None
-            Querier.__last_tried_index = 0
+            Querier.__host_selector = (
+                host_selector if host_selector is not None else RoundRobinHostSelector()
+            )
             Querier.__hosts_alive_for_testing = set()
+            Querier.__max_connections = (
+                max_connections
+                if max_connections is not None
+                else DEFAULT_MAX_CONNECTIONS
+            )
+            Querier.__keep_alive_expiry_in_sec = (
+                keep_alive_expiry_in_sec
+                if keep_alive_expiry_in_sec is not None
+                else DEFAULT_KEEP_ALIVE_EXPIRY_IN_SEC
+            )
+            Querier.__http2 = http2
+            Querier.__clients = {}
+            Querier.__client_closers = {}
+            Querier.__sync_client = None
+            Querier.__coalesce_get_requests = coalesce_get_requests
+            Querier.__in_flight_get_requests = SingleFlight()
+            Querier.__coalescing_stats = RequestCoalescingStats()
+            Querier.__response_cache = response_cache
+            Querier.__response_cache_generation = 0
+            Querier.__hedging = hedging
+            Querier.__retry_policy = retry_policy
+            Querier.__request_observers = (
+                list(request_observers) if request_observers is not None else []
+            )
+
+    @staticmethod
+    def get_request_coalescing_stats() -> RequestCoalescingStats:
+        return Querier.__coalescing_stats
+
+    @staticmethod
+    def __get_client() -> AsyncClient:
+        loop = asyncio.get_event_loop()
+        client = Querier.__clients.get(loop)
+        if client is None:
+            # Forget the clients of loops that have since been closed, their
+            # connections can't be reused. The ones of loops that were shut down
+            # by asyncio.run have already been closed by their closer.
+            closed_loops = [l for l in Querier.__clients if l.is_closed()]
+            for closed_loop in closed_loops:
+                del Querier.__clients[closed_loop]
+                Querier.__client_closers.pop(closed_loop, None)
+            client = AsyncClient(
+                limits=Limits(
+                    max_connections=Querier.__max_connections,
+                    max_keepalive_connections=Querier.__max_connections,
+                    keepalive_expiry=Querier.__keep_alive_expiry_in_sec,
+                ),
+                http2=Querier.__http2,
+            )
+            Querier.__clients[loop] = client
+            closer = Querier.__close_client_on_loop_shutdown(client)
+            if closer is not None:
+                Querier.__client_closers[loop] = closer
+        return client
+
+    @staticmethod
+    def __close_client_on_loop_shutdown(
+        client: AsyncClient,
+    ) -> Union[AsyncGenerator[None, None], None]:
+        # A client has to be closed on its own loop, before that loop is closed
+        # (its sockets stay open otherwise). asyncio has no shutdown callbacks,
+        # but asyncio.run (and loop.shutdown_asyncgens) closes all the async
+        # generators that were started on the loop, so this starts one that
+        # closes the client when that happens.
+        if sys.get_asyncgen_hooks().firstiter is None:
+            # The loop doesn't track async generators (this is called from a
+            # coroutine running on it), so there is nothing to hook into.
+            return None
+
+        async def closer() -> AsyncGenerator[None, None]:
+            try:
+                yield
+            finally:
+                await client.aclose()
+
+        generator = closer()
+        try:
+            # Runs it up to the yield, which registers it with the loop.
+            generator.__anext__().__await__().send(None)
+        except StopIteration:
+            pass
+        return generator
+
+    @staticmethod
+    def __get_sync_client() -> Client:
+        client = Querier.__sync_client
+        if client is None:
+            with Querier.__sync_client_lock:
+                client = Querier.__sync_client
+                if client is None:
+                    client = Querier.__sync_client = Client(
+                        limits=Limits(
+                            max_connections=Querier.__max_connections,
+                            max_keepalive_connections=Querier.__max_connections,
+                            keepalive_expiry=Querier.__keep_alive_expiry_in_sec,
+                        ),
+                        http2=Querier.__http2,
+                    )
+        return client
+
+    @staticmethod
+    def close_sync():
+        sync_client = Querier.__sync_client
+        Querier.__sync_client = None
+        if sync_client is not None:
+            sync_client.close()
+
+    @staticmethod
+    async def close():
+        Querier.close_sync()
+        clients = Querier.__clients
+        Querier.__clients = {}
+        Querier.__client_closers = {}
+        current_loop = asyncio.get_event_loop()
+        for loop, client in clients.items():
+            if loop is current_loop:
+                await client.aclose()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            elif not loop.is_closed():
+                # An idle loop, like the thread local ones of sync mode. It can't
+                # be run from this thread while the current loop is running.
+                await current_loop.run_in_executor(
+                    None, loop.run_until_complete, client.aclose()
+                )
 
     async def __get_headers_with_api_version(self, path: NormalisedURLPath):
-        headers = {API_VERSION_HEADER: await self.get_api_version()}
+        return self.__get_headers(path, await self.get_api_version())
+
+    def __get_headers_with_api_version_sync(self, path: NormalisedURLPath):
+        return self.__get_headers(path, self.get_api_version_sync())
+
+    def __get_headers(self, path: NormalisedURLPath, api_version: str):
+        headers = {API_VERSION_HEADER: api_version}
         if Querier.__api_key is not None:
             headers = {**headers, API_KEY_HEADER: Querier.__api_key}
         if path.is_a_recipe_path() and self.__rid_to_core is not None:
@@ -127,19 +395,115 @@ class Querier:
 
     async def send_get_request(
         self, path: NormalisedURLPath, params: Union[Dict[str, Any], None] = None
-    ):
+    ) -> Any:
         if params is None:
             params = {}
 
+        response_cache = Querier.__response_cache
+        if not Querier.__coalesce_get_requests and response_cache is None:
+            return await self.__send_get_request(path, params)
+
+        key = self.__get_request_key(path, params)
+
+        ttl_in_ms = None
+        if response_cache is not None:
+            ttl_in_ms = response_cache.get_ttl_in_ms(path.get_as_string_dangerous())
+            if ttl_in_ms is not None:
+                cached_response = response_cache.cache.get(key)
+                if cached_response is not None:
+                    return deepcopy(cached_response)
+
+        if ttl_in_ms is None and not Querier.__coalesce_get_requests:
+            return await self.__send_get_request(path, params)
+
+        cache_generation = Querier.__response_cache_generation
+        if Querier.__coalesce_get_requests:
+            response = await self.__send_coalesced_get_request(key, path, params)
+        else:
+            response = await self.__send_get_request(path, params)
+
+        if response_cache is not None and ttl_in_ms is not None:
+            Querier.__cache_response(
+                response_cache, key, path, params, response, ttl_in_ms, cache_generation
+            )
+
+        if Querier.__coalesce_get_requests:
+            # The response object is shared with the other callers, and callers
+            # are free to mutate the response they get.
+            return deepcopy(response)
+        return response
+
+    def __get_request_key(self, path: NormalisedURLPath, params: Dict[str, Any]):
+        # The rid is part of the key since the core uses it to pick the recipe
+        # that handles the request.
+        return repr(
+            (
+                path.get_as_string_dangerous(),
+                self.__rid_to_core,
+                sorted((k, repr(v)) for k, v in params.items()),
+            )
+        )
+
+    @staticmethod
+    def __cache_response(
+        response_cache: ResponseCacheConfig,
+        key: str,
+        path: NormalisedURLPath,
+        params: Dict[str, Any],
+        response: Any,
+        ttl_in_ms: int,
+        cache_generation: int,
+    ):
+        if cache_generation != Querier.__response_cache_generation:
+            return
+        if not is_ok_response(response):
+            return
+        user_id = params.get("userId")
+        response_cache.cache.set(
+            key,
+            path.get_as_string_dangerous(),
+            user_id if isinstance(user_id, str) else None,
+            deepcopy(response),
+            ttl_in_ms,
+        )
+
+    async def __send_coalesced_get_request(
+        self, key: str, path: NormalisedURLPath, params: Dict[str, Any]
+    ) -> Any:
+        # Concurrent identical GETs share one request to the core.
+        request, started = Querier.__in_flight_get_requests.start(
+            key, lambda: self.__send_get_request(path, params)
+        )
+        if started:
+            Querier.__coalescing_stats.misses += 1
+        else:
+            Querier.__coalescing_stats.hits += 1
+        return await Querier.__in_flight_get_requests.wait(request)
+
+    def __invalidate_response_cache(
+        self, path: NormalisedURLPath, data: Dict[str, Any]
+    ):
+        response_cache = Querier.__response_cache
+        if response_cache is None:
+            return
+        Querier.__response_cache_generation += 1
+        user_id = data.get("userId")
+        response_cache.invalidate_for_write(
+            path.get_as_string_dangerous(),
+            user_id if isinstance(user_id, str) else None,
+        )
+
+    async def __send_get_request(
+        self, path: NormalisedURLPath, params: Dict[str, Any]
+    ) -> Any:
         async def f(url: str) -> Response:
-            async with AsyncClient() as client:
-                return await client.get(  # type:ignore
-                    url,
-                    params=params,
-                    headers=await self.__get_headers_with_api_version(path),
-                )
+            return await Querier.__get_client().get(  # type:ignore
+                url,
+                params=params,
+                headers=await self.__get_headers_with_api_version(path),
+            )
 
-        return await self.__send_request_helper(path, "GET", f, len(self.__hosts))
+        return await self.__send_request_helper(path, "GET", f)
 
     async def send_post_request(
         self,
@@ -161,10 +525,12 @@ class Querier:
         headers["content-type"] = "application/json; charset=utf-8"
 
         async def f(url: str) -> Response:
-            async with AsyncClient() as client:
-                return await client.post(url, json=data, headers=headers)  # type: ignore
+            return await Querier.__get_client().post(url, json=data, headers=headers)  # type: ignore
 
-        return await self.__send_request_helper(path, "POST", f, len(self.__hosts))
+        try:
+            return await self.__send_request_helper(path, "POST", f)
+        finally:
+            self.__invalidate_response_cache(path, data)
 
     async def send_delete_request(
         self, path: NormalisedURLPath, params: Union[Dict[str, Any], None] = None
@@ -173,14 +539,16 @@ class Querier:
             params = {}
 
         async def f(url: str) -> Response:
-            async with AsyncClient() as client:
-                return await client.delete(  # type:ignore
-                    url,
-                    params=params,
-                    headers=await self.__get_headers_with_api_version(path),
-                )
+            return await Querier.__get_client().delete(  # type:ignore
+                url,
+                params=params,
+                headers=await self.__get_headers_with_api_version(path),
+            )
 
-        return await self.__send_request_helper(path, "DELETE", f, len(self.__hosts))
+        try:
+            return await self.__send_request_helper(path, "DELETE", f)
+        finally:
+            self.__invalidate_response_cache(path, params)
 
     async def send_put_request(
         self, path: NormalisedURLPath, data: Union[Dict[str, Any], None] = None
@@ -192,62 +560,601 @@ class Querier:
         headers["content-type"] = "application/json; charset=utf-8"
 
         async def f(url: str) -> Response:
-            async with AsyncClient() as client:
-                return await client.put(url, json=data, headers=headers)  # type: ignore
+            return await Querier.__get_client().put(url, json=data, headers=headers)  # type: ignore
+
+        try:
+            return await self.__send_request_helper(path, "PUT", f)
+        finally:
+            self.__invalidate_response_cache(path, data)
+
+    def send_get_request_sync(
+        self, path: NormalisedURLPath, params: Union[Dict[str, Any], None] = None
+    ) -> Any:
+        if params is None:
+            params = {}
+
+        def f(url: str, timeout: Union[float, None]) -> Response:
+            return Querier.__get_sync_client().get(  # type:ignore
+                url,
+                params=params,
+                headers=self.__get_headers_with_api_version_sync(path),
+                timeout=USE_CLIENT_DEFAULT if timeout is None else timeout,
+            )
+
+        response_cache = Querier.__response_cache
+        ttl_in_ms = None
+        if response_cache is not None:
+            ttl_in_ms = response_cache.get_ttl_in_ms(path.get_as_string_dangerous())
+        if response_cache is None or ttl_in_ms is None:
+            return self.__send_request_helper_sync(path, "GET", f)
+
+        key = self.__get_request_key(path, params)
+        cached_response = response_cache.cache.get(key)
+        if cached_response is not None:
+            return deepcopy(cached_response)
+
+        cache_generation = Querier.__response_cache_generation
+        response = self.__send_request_helper_sync(path, "GET", f)
+        Querier.__cache_response(
+            response_cache, key, path, params, response, ttl_in_ms, cache_generation
+        )
+        return response
 
-        return await self.__send_request_helper(path, "PUT", f, len(self.__hosts))
+    def send_post_request_sync(
+        self, path: NormalisedURLPath, data: Union[Dict[str, Any], None] = None
+    ) -> Any:
+        if data is None:
+            data = {}
+
+        headers = self.__get_headers_with_api_version_sync(path)
+        headers["content-type"] = "application/json; charset=utf-8"
+
+        def f(url: str, timeout: Union[float, None]) -> Response:
+            return Querier.__get_sync_client().post(  # type: ignore
+                url,
+                json=data,
+                headers=headers,
+                timeout=USE_CLIENT_DEFAULT if timeout is None else timeout,
+            )
+
+        try:
+            return self.__send_request_helper_sync(path, "POST", f)
+        finally:
+            self.__invalidate_response_cache(path, data)
+
+    def send_delete_request_sync(
+        self, path: NormalisedURLPath, params: Union[Dict[str, Any], None] = None
+    ) -> Any:
+        if params is None:
+            params = {}
+
+        def f(url: str, timeout: Union[float, None]) -> Response:
+            return Querier.__get_sync_client().delete(  # type:ignore
+                url,
+                params=params,
+                headers=self.__get_headers_with_api_version_sync(path),
+                timeout=USE_CLIENT_DEFAULT if timeout is None else timeout,
+            )
+
+        try:
+            return self.__send_request_helper_sync(path, "DELETE", f)
+        finally:
+            self.__invalidate_response_cache(path, params)
+
+    def send_put_request_sync(
+        self, path: NormalisedURLPath, data: Union[Dict[str, Any], None] = None
+    ) -> Any:
+        if data is None:
+            data = {}
+
+        headers = self.__get_headers_with_api_version_sync(path)
+        headers["content-type"] = "application/json; charset=utf-8"
+
+        def f(url: str, timeout: Union[float, None]) -> Response:
+            return Querier.__get_sync_client().put(  # type: ignore
+                url,
+                json=data,
+                headers=headers,
+                timeout=USE_CLIENT_DEFAULT if timeout is None else timeout,
+            )
+
+        try:
+            return self.__send_request_helper_sync(path, "PUT", f)
+        finally:
+            self.__invalidate_response_cache(path, data)
+
+    async def send_many(
+        self,
+        requests: List[CoreRequest],
+        max_concurrency: int = DEFAULT_SEND_MANY_MAX_CONCURRENCY,
+    ) -> List[Union[Any, Exception]]:
+        """
+        Sends the requests with at most `max_concurrency` of them in flight at a
+        time, over the pooled connections of this querier. The results are in
+        the order of `requests`. A request that fails doesn't fail the others:
+        its exception is returned in place of its response.
+        """
+
+        def get_request_function(request: CoreRequest) -> Callable[[], Awaitable[Any]]:
+            if request.method == "GET":
+                return lambda: self.send_get_request(request.path, request.data)
+            if request.method == "POST":
+                return lambda: self.send_post_request(request.path, request.data)
+            if request.method == "PUT":
+                return lambda: self.send_put_request(request.path, request.data)
+            return lambda: self.send_delete_request(request.path, request.data)
+
+        return await run_with_limited_concurrency(
+            [get_request_function(request) for request in requests], max_concurrency
+        )
 
     async def __send_request_helper(
         self,
         path: NormalisedURLPath,
         method: str,
         http_function: Callable[[str], Awaitable[Response]],
-        no_of_tries: int,
     ) -> Any:
-        if no_of_tries == 0:
-            raise_general_exception("No SuperTokens core available to query")
+        spans = None
+        if len(Querier.__request_observers) != 0:
+            spans = Querier.__start_spans(method, path)
+        response = None
+        error = None
+        try:
+            retry_policy = Querier.__retry_policy
+            can_retry = Querier.__can_retry(retry_policy, method, path)
+            deadline = Querier.__get_deadline(retry_policy)
+
+            attempt = 0
+            while True:
+                attempt += 1
+                response = await self.__send_request_to_hosts(
+                    path,
+                    method,
+                    http_function,
+                    Querier.__get_attempt_timeout(retry_policy, deadline),
+                    can_retry,
+                    attempt,
+                )
+                backoff = Querier.__get_retry_backoff(
+                    retry_policy, can_retry, attempt, response, deadline
+                )
+                if backoff is None:
+                    break
+                log_debug_message(
+                    "Retrying %s request to path: %s (attempt %s)",
+                    method,
+                    path.get_as_string_dangerous(),
+                    attempt + 1,
+                )
+                await asyncio.sleep(backoff)
+
+            return Querier.__get_response_body(path, method, response)
+
+        except Exception as e:
+            error = e
+            raise_general_exception(e)
+        finally:
+            if spans is not None:
+                Querier.__end_spans(spans, response, error)
+
+    def __send_request_helper_sync(
+        self,
+        path: NormalisedURLPath,
+        method: str,
+        http_function: Callable[[str, Union[float, None]], Response],
+    ) -> Any:
+        # Same as __send_request_helper, minus hedging (which needs concurrent
+        # requests).
+        spans = None
+        if len(Querier.__request_observers) != 0:
+            spans = Querier.__start_spans(method, path)
+        response = None
+        error = None
+        try:
+            retry_policy = Querier.__retry_policy
+            can_retry = Querier.__can_retry(retry_policy, method, path)
+            deadline = Querier.__get_deadline(retry_policy)
+
+            attempt = 0
+            while True:
+                attempt += 1
+                response = self.__send_request_to_hosts_sync(
+                    path,
+                    method,
+                    http_function,
+                    Querier.__get_attempt_timeout(retry_policy, deadline),
+                    can_retry,
+                    attempt,
+                )
+                backoff = Querier.__get_retry_backoff(
+                    retry_policy, can_retry, attempt, response, deadline
+                )
+                if backoff is None:
+                    break
+                log_debug_message(
+                    "Retrying %s request to path: %s (attempt %s)",
+                    method,
+                    path.get_as_string_dangerous(),
+                    attempt + 1,
+                )
+                sleep(backoff)
+
+            return Querier.__get_response_body(path, method, response)
+
+        except Exception as e:
+            error = e
+            raise_general_exception(e)
+        finally:
+            if spans is not None:
+                Querier.__end_spans(spans, response, error)
+
+    @staticmethod
+    def __can_retry(
+        retry_policy: Union[RetryPolicy, None], method: str, path: NormalisedURLPath
+    ) -> bool:
+        return retry_policy is not None and retry_policy.is_idempotent(
+            method, path.get_as_string_dangerous()
+        )
+
+    @staticmethod
+    def __get_deadline(retry_policy: Union[RetryPolicy, None]) -> Union[float, None]:
+        if retry_policy is None or retry_policy.deadline_ms is None:
+            return None
+        return monotonic() + retry_policy.deadline_ms / 1000
+
+    @staticmethod
+    def __get_attempt_timeout(
+        retry_policy: Union[RetryPolicy, None], deadline: Union[float, None]
+    ) -> Union[float, None]:
+        if retry_policy is None:
+            return None
+        attempt_timeout = None
+        if retry_policy.attempt_timeout_ms is not None:
+            attempt_timeout = retry_policy.attempt_timeout_ms / 1000
+        if deadline is not None:
+            remaining = max(deadline - monotonic(), 0)
+            attempt_timeout = (
+                remaining
+                if attempt_timeout is None
+                else min(attempt_timeout, remaining)
+            )
+        return attempt_timeout
+
+    @staticmethod
+    def __get_retry_backoff(
+        retry_policy: Union[RetryPolicy, None],
+        can_retry: bool,
+        attempt: int,
+        response: Union[Response, None],
+        deadline: Union[float, None],
+    ) -> Union[float, None]:
+        # Returns how long to wait (in seconds) before the next attempt, or
+        # None if the request should not be retried.
+        if retry_policy is None or not can_retry:
+            return None
+        if attempt >= retry_policy.max_attempts:
+            return None
+        if response is not None and not retry_policy.is_retryable_status_code(
+            response.status_code
+        ):
+            return None
+        backoff = retry_policy.get_backoff_ms(attempt) / 1000
+        if deadline is not None and monotonic() + backoff >= deadline:
+            return None
+        return backoff
+
+    @staticmethod
+    def __get_response_body(
+        path: NormalisedURLPath, method: str, response: Union[Response, None]
+    ) -> Any:
+        if response is None:
+            return raise_general_exception("No SuperTokens core available to query")
+
+        if is_4xx_error(response.status_code) or is_5xx_error(response.status_code):  # type: ignore
+            raise_general_exception(
+                "SuperTokens core threw an error for a "
+                + method
+                + " request to path: "
+                + path.get_as_string_dangerous()
+                + " with status code: "
+                + str(response.status_code)
+                + " and message: "
+                + response.text  # type: ignore
+            )
 
         try:
-            current_host_domain = self.__hosts[
-                Querier.__last_tried_index
-            ].domain.get_as_string_dangerous()
-            current_host_base_path = self.__hosts[
-                Querier.__last_tried_index
-            ].base_path.get_as_string_dangerous()
-            current_host: str = current_host_domain + current_host_base_path
-            Querier.__last_tried_index += 1
-            Querier.__last_tried_index %= len(self.__hosts)
-            url = current_host + path.get_as_string_dangerous()
+            return json_loads(response.content)
+        except ValueError:
+            return response.text
 
+    @staticmethod
+    def __start_spans(
+        method: str, path: NormalisedURLPath
+    ) -> List[Tuple[CoreRequestObserver, Any]]:
+        spans: List[Tuple[CoreRequestObserver, Any]] = []
+        for observer in Querier.__request_observers:
+            try:
+                spans.append(
+                    (
+                        observer,
+                        observer.on_span_start(method, path.get_as_string_dangerous()),
+                    )
+                )
+            except Exception as e:
+                # A failing observer must not fail the request to the core
+                log_debug_message("Request observer on_span_start failed: %s", str(e))
+        return spans
+
+    @staticmethod
+    def __end_spans(
+        spans: List[Tuple[CoreRequestObserver, Any]],
+        response: Union[Response, None],
+        error: Union[Exception, None],
+    ):
+        status_code = None if response is None else response.status_code
+        for observer, span in spans:
+            try:
+                observer.on_span_end(span, status_code, error)
+            except Exception as e:
+                log_debug_message("Request observer on_span_end failed: %s", str(e))
+
+    async def __send_request_to_hosts(
+        self,
+        path: NormalisedURLPath,
+        method: str,
+        http_function: Callable[[str], Awaitable[Response]],
+        timeout: Union[float, None],
+        can_retry: bool,
+        attempt: int,
+    ) -> Union[Response, None]:
+        # Tries the hosts in order of preference until one of them responds.
+        # Returns None if none of them could be reached.
+        hosts = Querier.__host_selector.get_hosts_in_order_of_preference(self.__hosts)
+        hedging = Querier.__hedging
+        hedge = hedging is not None and hedging.should_hedge(
+            method, path.get_as_string_dangerous()
+        )
+        i = 0
+        while i < len(hosts):
+            if hedge and i + 1 < len(hosts):
+                response, hosts_tried = await self.__send_hedged_request_to_hosts(
+                    hosts[i],
+                    hosts[i + 1],
+                    path,
+                    method,
+                    http_function,
+                    timeout,
+                    can_retry,
+                    attempt,
+                )
+                i += hosts_tried
+            else:
+                response = await self.__send_request_to_host(
+                    hosts[i], path, method, http_function, timeout, can_retry, attempt
+                )
+                i += 1
+            if response is not None:
+                return response
+        return None
+
+    def __send_request_to_hosts_sync(
+        self,
+        path: NormalisedURLPath,
+        method: str,
+        http_function: Callable[[str, Union[float, None]], Response],
+        timeout: Union[float, None],
+        can_retry: bool,
+        attempt: int,
+    ) -> Union[Response, None]:
+        for host in Querier.__host_selector.get_hosts_in_order_of_preference(
+            self.__hosts
+        ):
+            current_host = get_host_key(host)
             ProcessState.get_instance().add_state(
                 AllowedProcessStates.CALLING_SERVICE_IN_REQUEST_HELPER
             )
-            response = await http_function(url)
-            if ("SUPERTOKENS_ENV" in environ) and (
-                environ["SUPERTOKENS_ENV"] == "testing"
-            ):
-                Querier.__hosts_alive_for_testing.add(current_host)
+            start_time = monotonic()
+            try:
+                response = http_function(
+                    current_host + path.get_as_string_dangerous(), timeout
+                )
+            except (ConnectionError, NetworkError, ConnectTimeout):
+                Querier.__on_host_failure(
+                    host, path, method, current_host, start_time, attempt
+                )
+                continue
+            except TimeoutException:
+                if not can_retry:
+                    Querier.__on_host_failure(
+                        None, path, method, current_host, start_time, attempt
+                    )
+                    raise
+                Querier.__on_host_failure(
+                    host, path, method, current_host, start_time, attempt
+                )
+                continue
+            Querier.__on_host_response(
+                host, path, method, current_host, response, start_time, attempt
+            )
+            return response
+        return None
 
-            if is_4xx_error(response.status_code) or is_5xx_error(response.status_code):  # type: ignore
-                raise_general_exception(
-                    "SuperTokens core threw an error for a "
-                    + method
-                    + " request to path: "
-                    + path.get_as_string_dangerous()
-                    + " with status code: "
-                    + str(response.status_code)
-                    + " and message: "
-                    + response.text  # type: ignore
+    async def __send_request_to_host(
+        self,
+        host: Host,
+        path: NormalisedURLPath,
+        method: str,
+        http_function: Callable[[str], Awaitable[Response]],
+        timeout: Union[float, None],
+        can_retry: bool,
+        attempt: int,
+    ) -> Union[Response, None]:
+        # Returns None if the host could not be reached (or if it timed out and
+        # the request can be retried).
+        current_host = get_host_key(host)
+        url = current_host + path.get_as_string_dangerous()
+
+        ProcessState.get_instance().add_state(
+            AllowedProcessStates.CALLING_SERVICE_IN_REQUEST_HELPER
+        )
+        start_time = monotonic()
+        try:
+            if timeout is None:
+                response = await http_function(url)
+            else:
+                response = await asyncio.wait_for(http_function(url), timeout)
+        except (ConnectionError, NetworkError, ConnectTimeout):
+            Querier.__on_host_failure(
+                host, path, method, current_host, start_time, attempt
+            )
+            return None
+        except (asyncio.TimeoutError, TimeoutException):
+            if not can_retry:
+                Querier.__on_host_failure(
+                    None, path, method, current_host, start_time, attempt
                 )
+                raise
+            Querier.__on_host_failure(
+                host, path, method, current_host, start_time, attempt
+            )
+            return None
+        Querier.__on_host_response(
+            host, path, method, current_host, response, start_time, attempt
+        )
+        return response
 
+    @staticmethod
+    def __on_host_failure(
+        host: Union[Host, None],
+        path: NormalisedURLPath,
+        method: str,
+        current_host: str,
+        start_time: float,
+        attempt: int,
+    ):
+        # host is None if the failure should not count against the host
+        if host is not None:
+            Querier.__host_selector.on_failure(host)
+        if len(Querier.__request_observers) != 0:
+            Querier.__notify_request_observers(
+                method, path, current_host, None, start_time, attempt
+            )
+
+    @staticmethod
+    def __on_host_response(
+        host: Host,
+        path: NormalisedURLPath,
+        method: str,
+        current_host: str,
+        response: Response,
+        start_time: float,
+        attempt: int,
+    ):
+        latency_ms = (monotonic() - start_time) * 1000
+        if len(Querier.__request_observers) != 0:
+            Querier.__notify_request_observers(
+                method, path, current_host, response, start_time, attempt
+            )
+
+        if ("SUPERTOKENS_ENV" in environ) and (environ["SUPERTOKENS_ENV"] == "testing"):
+            Querier.__hosts_alive_for_testing.add(current_host)
+
+        if is_5xx_error(response.status_code):  # type: ignore
+            Querier.__host_selector.on_failure(host)
+        else:
+            Querier.__host_selector.on_success(host, latency_ms)
+            if Querier.__hedging is not None:
+                Querier.__hedging.add_latency_sample(
+                    path.get_as_string_dangerous(), latency_ms
+                )
+
+    @staticmethod
+    def __notify_request_observers(
+        method: str,
+        path: NormalisedURLPath,
+        host: str,
+        response: Union[Response, None],
+        start_time: float,
+        attempt: int,
+    ):
+        event = CoreRequestEvent(
+            method,
+            path.get_as_string_dangerous(),
+            host,
+            None if response is None else response.status_code,
+            (monotonic() - start_time) * 1000,
+            attempt,
+            None if response is None else len(response.content),
+        )
+        for observer in Querier.__request_observers:
             try:
-                return response.json()
-            except JSONDecodeError:
-                return response.text
+                observer.on_request(event)
+            except Exception as e:
+                log_debug_message("Request observer on_request failed: %s", str(e))
 
-        except (ConnectionError, NetworkError, ConnectTimeout):
-            return await self.__send_request_helper(
-                path, method, http_function, no_of_tries - 1
+    async def __send_hedged_request_to_hosts(
+        self,
+        primary_host: Host,
+        secondary_host: Host,
+        path: NormalisedURLPath,
+        method: str,
+        http_function: Callable[[str], Awaitable[Response]],
+        timeout: Union[float, None],
+        can_retry: bool,
+        attempt: int,
+    ) -> Tuple[Union[Response, None], int]:
+        # Returns the first response and the number of hosts that were tried
+        hedging = Querier.__hedging
+        assert hedging is not None
+        primary = asyncio.ensure_future(
+            self.__send_request_to_host(
+                primary_host, path, method, http_function, timeout, can_retry, attempt
             )
-        except Exception as e:
-            raise_general_exception(e)
+        )
+        delay_ms = hedging.get_delay_ms(path.get_as_string_dangerous())
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay_ms / 1000)
+        except BaseException:
+            primary.cancel()
+            raise
+        if len(done) != 0:
+            return primary.result(), 1
+
+        hedging.stats.hedges_issued += 1
+        secondary = asyncio.ensure_future(
+            self.__send_request_to_host(
+                secondary_host,
+                path,
+                method,
+                http_function,
+                timeout,
+                can_retry,
+                attempt,
+            )
+        )
+        pending = {primary, secondary}
+        # A request that raises (for example a timeout that can't be retried)
+        # only fails the call if the other request fails too.
+        first_error: Union[BaseException, None] = None
+        try:
+            while len(pending) != 0:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for request in done:
+                    error = request.exception()
+                    if error is not None:
+                        if first_error is None:
+                            first_error = error
+                        continue
+                    response = request.result()
+                    if response is not None:
+                        if request is secondary:
+                            hedging.stats.hedges_won += 1
+                        return response, 2
+            if first_error is not None:
+                raise first_error
+            return None, 2
+        finally:
+            for request in pending:
+                request.cancel()
@@ -1,4 +1,3 @@
-import asyncio
 from typing import List, Optional
 
 from supertokens_python.exceptions import raise_bad_input_exception
@@ -6,6 +5,7 @@ from supertokens_python.recipe.session.asyncio import (
     get_all_session_handles_for_user,
     get_session_information,
 )
+from supertokens_python.utils import run_with_limited_concurrency
 
 from ...interfaces import (
     APIInterface,
@@ -14,6 +14,8 @@ from ...interfaces import (
     UserSessionsGetAPIResponse,
 )
 
+SESSIONS_FETCH_MAX_CONCURRENCY = 10
+
 
 async def handle_sessions_get(
     _api_interface: APIInterface, api_options: APIOptions
@@ -27,17 +29,17 @@ async def handle_sessions_get(
     sessions: List[Optional[SessionInfo]] = [None for _ in session_handles]
 
     async def call_(i: int, session_handle: str):
-        try:
-            session_response = await get_session_information(session_handle)
-            if session_response is not None:
-                sessions[i] = SessionInfo(session_response)
-        except Exception:
-            sessions[i] = None
-
-    session_info_promises = [
-        call_(i, handle) for i, handle in enumerate(session_handles)
-    ]
-
-    await asyncio.gather(*session_info_promises)
+        session_response = await get_session_information(session_handle)
+        if session_response is not None:
+            sessions[i] = SessionInfo(session_response)
+
+    # A session that can't be fetched is left out of the response
+    await run_with_limited_concurrency(
+        [
+            lambda i=i, handle=handle: call_(i, handle)
+            for i, handle in enumerate(session_handles)
+        ],
+        SESSIONS_FETCH_MAX_CONCURRENCY,
+    )
 
     return UserSessionsGetAPIResponse([s for s in sessions if s is not None])
@@ -13,10 +13,10 @@
 # under the License.
 from __future__ import annotations
 
-import asyncio
-from typing import TYPE_CHECKING, Any, Awaitable, List
+from typing import TYPE_CHECKING, Awaitable, Callable, List
 
 from supertokens_python.supertokens import Supertokens
+from supertokens_python.utils import run_with_limited_concurrency
 
 from ...usermetadata import UserMetadataRecipe
 from ...usermetadata.asyncio import get_user_metadata
@@ -70,7 +70,7 @@ async def handle_users_get_api(
     users_with_metadata: List[UserWithMetadata] = [
         UserWithMetadata().from_user(user) for user in users_response.users
     ]
-    metadata_fetch_awaitables: List[Awaitable[Any]] = []
+    metadata_fetch_functions: List[Callable[[], Awaitable[None]]] = []
 
     async def get_user_metadata_and_update_user(user_idx: int) -> None:
         user = users_response.users[user_idx]
@@ -82,28 +82,16 @@ async def handle_users_get_api(
         users_with_metadata[user_idx].first_name = first_name
         users_with_metadata[user_idx].last_name = last_name
 
-    # Batch calls to get user metadata:
     for i, _ in enumerate(users_response.users):
-        metadata_fetch_awaitables.append(get_user_metadata_and_update_user(i))
-
-    promise_arr_start_position = 0
-    batch_size = 5
-
-    while promise_arr_start_position < len(metadata_fetch_awaitables):
-        # We want to query only 5 in parallel at a time
-        promises_to_call = [
-            metadata_fetch_awaitables[i]
-            for i in range(
-                promise_arr_start_position,
-                min(
-                    promise_arr_start_position + batch_size,
-                    len(metadata_fetch_awaitables),
-                ),
-            )
-        ]
-        await asyncio.gather(*promises_to_call)
-
-        promise_arr_start_position += batch_size
+        metadata_fetch_functions.append(
+            lambda i=i: get_user_metadata_and_update_user(i)
+        )
+
+    # We want to query only 5 in parallel at a time
+    results = await run_with_limited_concurrency(metadata_fetch_functions, 5)
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
 
     return DashboardUsersGetResponse(
         users_with_metadata,
@@ -16,6 +16,12 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Dict, Union
 
 from supertokens_python.normalised_url_path import NormalisedURLPath
+from supertokens_python.recipe.emailverification.constants import (
+    EMAIL_VERIFICATION_CLAIM_KEY,
+)
+from supertokens_python.recipe.session.claim_value_cache import (
+    invalidate_claim_values,
+)
 
 from .interfaces import (
     CreateResetPasswordOkResult,
@@ -153,6 +159,8 @@ class RecipeImplementation(RecipeInterface):
             NormalisedURLPath("/recipe/user"), data
         )
         if "status" in response and response["status"] == "OK":
+            if email is not None:
+                invalidate_claim_values([EMAIL_VERIFICATION_CLAIM_KEY], user_id)
             return UpdateEmailOrPasswordOkResult()
         if "status" in response and response["status"] == "EMAIL_ALREADY_EXISTS_ERROR":
             return UpdateEmailOrPasswordEmailAlreadyExistsError()
@@ -13,3 +13,4 @@
 # under the License.
 USER_EMAIL_VERIFY_TOKEN = "/user/email/verify/token"
 USER_EMAIL_VERIFY = "/user/email/verify"
+EMAIL_VERIFICATION_CLAIM_KEY = "st-ev"
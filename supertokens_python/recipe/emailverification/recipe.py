@@ -40,6 +40,7 @@ from ..session.claim_base_classes.boolean_claim import (
     BooleanClaim,
     BooleanClaimValidators,
 )
+from ..session.claim_value_cache import with_claim_value_cache
 from ..session.exceptions import raise_unauthorised_exception
 from ..session.interfaces import (
     ClaimValidationResult,
@@ -47,6 +48,7 @@ from ..session.interfaces import (
     SessionClaimValidator,
     SessionContainer,
 )
+from .constants import EMAIL_VERIFICATION_CLAIM_KEY
 from .interfaces import (
     APIInterface,
     APIOptions,
@@ -324,7 +326,18 @@ class EmailVerificationClaimClass(BooleanClaim):
                 return True
             raise Exception("UNKNOWN_USER_ID")
 
-        super().__init__("st-ev", fetch_value, default_max_age_in_sec)
+        # Only verified emails are cached, since unverified ones are refetched
+        # more often (see refetch_time_on_false_in_seconds)
+        super().__init__(
+            EMAIL_VERIFICATION_CLAIM_KEY,
+            with_claim_value_cache(
+                EMAIL_VERIFICATION_CLAIM_KEY,
+                fetch_value,
+                default_max_age_in_sec,
+                lambda value: value,
+            ),
+            default_max_age_in_sec,
+        )
 
         self.validators = EmailVerificationClaimValidators(
             claim=self, default_max_age_in_sec=default_max_age_in_sec
@@ -16,7 +16,11 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Dict, Union
 
 from supertokens_python.normalised_url_path import NormalisedURLPath
+from supertokens_python.recipe.session.claim_value_cache import (
+    invalidate_claim_values,
+)
 
+from .constants import EMAIL_VERIFICATION_CLAIM_KEY
 from .interfaces import (
     CreateEmailVerificationTokenEmailAlreadyVerifiedError,
     CreateEmailVerificationTokenOkResult,
@@ -62,6 +66,7 @@ class RecipeImplementation(RecipeInterface):
             NormalisedURLPath("/recipe/user/email/verify"), data
         )
         if "status" in response and response["status"] == "OK":
+            invalidate_claim_values([EMAIL_VERIFICATION_CLAIM_KEY], response["userId"])
             return VerifyEmailUsingTokenOkResult(
                 User(response["userId"], response["email"])
             )
@@ -92,4 +97,5 @@ class RecipeImplementation(RecipeInterface):
         await self.querier.send_post_request(
             NormalisedURLPath("/recipe/user/email/verify/remove"), data
         )
+        invalidate_claim_values([EMAIL_VERIFICATION_CLAIM_KEY], user_id)
         return UnverifyEmailOkResult()
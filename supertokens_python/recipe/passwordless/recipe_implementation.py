@@ -20,6 +20,12 @@ from supertokens_python.querier import Querier
 from .types import DeviceCode, DeviceType, User
 
 from supertokens_python.normalised_url_path import NormalisedURLPath
+from supertokens_python.recipe.emailverification.constants import (
+    EMAIL_VERIFICATION_CLAIM_KEY,
+)
+from supertokens_python.recipe.session.claim_value_cache import (
+    invalidate_claim_values,
+)
 
 from .interfaces import (
     ConsumeCodeExpiredUserInputCodeError,
@@ -238,6 +244,8 @@ class RecipeImplementation(RecipeInterface):
             NormalisedURLPath("/recipe/user"), data
         )
         if result["status"] == "OK":
+            if email is not None:
+                invalidate_claim_values([EMAIL_VERIFICATION_CLAIM_KEY], user_id)
             return UpdateUserOkResult()
         if result["status"] == "UNKNOWN_USER_ID_ERROR":
             return UpdateUserUnknownUserIdError()
@@ -253,6 +261,7 @@ class RecipeImplementation(RecipeInterface):
             NormalisedURLPath("/recipe/user"), data
         )
         if result["status"] == "OK":
+            invalidate_claim_values([EMAIL_VERIFICATION_CLAIM_KEY], user_id)
             return DeleteUserInfoOkResult()
         if result.get("EMAIL_ALREADY_EXISTS_ERROR"):
             raise Exception("Should never come here")
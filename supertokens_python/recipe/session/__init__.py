@@ -50,6 +50,12 @@ def init(
     override: Union[InputOverrideConfig, None] = None,
     jwt: Union[JWTConfig, None] = None,
     invalid_claim_status_code: Union[int, None] = None,
+    verified_access_token_cache_size: Union[int, None] = None,
+    refresh_signing_keys_before_expiry_in_ms: Union[int, None] = None,
+    revocation_filter_max_staleness_in_ms: Union[int, None] = None,
+    handshake_snapshot_path: Union[str, None] = None,
+    refresh_session_coalescing_window_in_ms: Union[int, None] = None,
+    claim_value_cache_size: Union[int, None] = None,
 ) -> Callable[[AppInfo], RecipeModule]:
     return SessionRecipe.init(
         cookie_domain,
@@ -62,4 +68,10 @@ def init(
         override,
         jwt,
         invalid_claim_status_code,
+        verified_access_token_cache_size,
+        refresh_signing_keys_before_expiry_in_ms,
+        revocation_filter_max_staleness_in_ms,
+        handshake_snapshot_path,
+        refresh_session_coalescing_window_in_ms,
+        claim_value_cache_size,
     )
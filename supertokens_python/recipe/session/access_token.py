@@ -21,6 +21,8 @@ from supertokens_python.utils import get_timestamp_ms
 from .exceptions import raise_try_refresh_token_exception
 from .jwt import ParsedJWTInfo, verify_jwt
 
+INVALID_ACCESS_TOKEN_STRUCTURE_MESSAGE = "Access token does not contain all the information. Maybe the structure has changed?"
+
 
 def sanitize_string(s: Any) -> Union[str, None]:
     if s == "":
@@ -40,59 +42,65 @@ def sanitize_number(n: Any) -> Union[Union[int, float], None]:
     return None
 
 
+def get_access_token_info_from_payload(jwt_info: ParsedJWTInfo) -> Dict[str, Any]:
+    """
+    Validates the structure of the payload of the access token and returns its
+    (sanitized) fields. This is done once per parsed token, the result is kept
+    on jwt_info. It does not verify the signature.
+    """
+    access_token_info = jwt_info.access_token_info
+    if access_token_info is not None:
+        return access_token_info
+
+    payload = jwt_info.payload
+    session_handle = payload.get("sessionHandle")
+    refresh_token_hash_1 = payload.get("refreshTokenHash1")
+    user_data = payload.get("userData")
+    expiry_time = payload.get("expiryTime")
+    time_created = payload.get("timeCreated")
+    if (
+        not isinstance(session_handle, str)
+        or user_data is None
+        or not isinstance(refresh_token_hash_1, str)
+        or not isinstance(expiry_time, int)
+        or not isinstance(time_created, int)
+    ):
+        raise Exception(INVALID_ACCESS_TOKEN_STRUCTURE_MESSAGE)
+
+    access_token_info = jwt_info.access_token_info = {
+        "sessionHandle": session_handle.strip(),
+        "userId": sanitize_string(payload.get("userId")),
+        "refreshTokenHash1": refresh_token_hash_1.strip(),
+        "parentRefreshTokenHash1": sanitize_string(
+            payload.get("parentRefreshTokenHash1")
+        ),
+        "userData": user_data,
+        "antiCsrfToken": sanitize_string(payload.get("antiCsrfToken")),
+        "expiryTime": sanitize_number(expiry_time),
+        "timeCreated": sanitize_number(time_created),
+    }
+    return access_token_info
+
+
 def get_info_from_access_token(
     jwt_info: ParsedJWTInfo, jwt_signing_public_key: str, do_anti_csrf_check: bool
-):
+) -> Dict[str, Any]:
     try:
         verify_jwt(jwt_info, jwt_signing_public_key)
-        payload = jwt_info.payload
-
-        validate_access_token_structure(payload)
+        access_token_info = get_access_token_info_from_payload(jwt_info)
 
-        session_handle = sanitize_string(payload.get("sessionHandle"))
-        user_id = sanitize_string(payload.get("userId"))
-        refresh_token_hash_1 = sanitize_string(payload.get("refreshTokenHash1"))
-        parent_refresh_token_hash_1 = sanitize_string(
-            payload.get("parentRefreshTokenHash1")
-        )
-        user_data = payload.get("userData")
-        anti_csrf_token = sanitize_string(payload.get("antiCsrfToken"))
-        expiry_time = sanitize_number(payload.get("expiryTime"))
-        time_created = sanitize_number(payload.get("timeCreated"))
-
-        if anti_csrf_token is None and do_anti_csrf_check:
+        if access_token_info["antiCsrfToken"] is None and do_anti_csrf_check:
             raise Exception("Access token does not contain the anti-csrf token")
 
+        expiry_time = access_token_info["expiryTime"]
         assert isinstance(expiry_time, int)
 
         if expiry_time < get_timestamp_ms():
             raise Exception("Access token expired")
 
-        return {
-            "sessionHandle": session_handle,
-            "userId": user_id,
-            "refreshTokenHash1": refresh_token_hash_1,
-            "parentRefreshTokenHash1": parent_refresh_token_hash_1,
-            "userData": user_data,
-            "antiCsrfToken": anti_csrf_token,
-            "expiryTime": expiry_time,
-            "timeCreated": time_created,
-        }
+        return access_token_info
     except Exception as e:
         log_debug_message(
             "getSession: Returning TRY_REFRESH_TOKEN because failed to decode access token"
         )
         raise_try_refresh_token_exception(e)
-
-
-def validate_access_token_structure(payload: Dict[str, Any]) -> None:
-    if (
-        not isinstance(payload.get("sessionHandle"), str)
-        or payload.get("userData") is None
-        or not isinstance(payload.get("refreshTokenHash1"), str)
-        or not isinstance(payload.get("expiryTime"), int)
-        or not isinstance(payload.get("timeCreated"), int)
-    ):
-        raise Exception(
-            "Access token does not contain all the information. Maybe the structure has changed?"
-        )
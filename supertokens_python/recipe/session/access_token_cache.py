@@ -0,0 +1,71 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from typing import Any, Dict, Union
+
+from supertokens_python.utils import get_timestamp_ms
+
+
+class VerifiedAccessTokenCache:
+    """
+    LRU cache of the info of access tokens whose signature has been verified,
+    so that the same access token (which the frontend sends with every request
+    until it expires) is only verified once. Entries are never returned after
+    the expiry time of their access token.
+    """
+
+    def __init__(self, max_size: int):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[bytes, Dict[str, Any]] = OrderedDict()
+        self.__lock = Lock()
+
+    @staticmethod
+    def __get_key(raw_token_string: str) -> bytes:
+        return sha256(raw_token_string.encode("utf-8")).digest()
+
+    def get(self, raw_token_string: str) -> Union[Dict[str, Any], None]:
+        key = VerifiedAccessTokenCache.__get_key(raw_token_string)
+        with self.__lock:
+            access_token_info = self.__entries.get(key)
+            if access_token_info is not None:
+                if access_token_info["expiryTime"] > get_timestamp_ms():
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    return access_token_info
+                del self.__entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, raw_token_string: str, access_token_info: Dict[str, Any]) -> None:
+        key = VerifiedAccessTokenCache.__get_key(raw_token_string)
+        with self.__lock:
+            self.__entries[key] = access_token_info
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
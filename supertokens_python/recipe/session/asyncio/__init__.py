@@ -11,7 +11,8 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
-from typing import Any, Dict, List, Union, TypeVar, Callable, Optional
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Dict, List, Union, TypeVar, Callable, Optional
 
 from supertokens_python.recipe.openid.interfaces import (
     GetOpenIdDiscoveryConfigurationResult,
@@ -27,9 +28,15 @@ from supertokens_python.recipe.session.interfaces import (
     JSONObject,
     GetClaimValueOkResult,
 )
+from supertokens_python.recipe.session.exceptions import SuperTokensSessionError
 from supertokens_python.recipe.session.recipe import SessionRecipe
 from supertokens_python.types import MaybeAwaitable
-from supertokens_python.utils import FRAMEWORKS, resolve, deprecated_warn
+from supertokens_python.utils import (
+    FRAMEWORKS,
+    resolve,
+    deprecated_warn,
+    run_with_limited_concurrency,
+)
 from ..utils import get_required_claim_validators
 from ...jwt.interfaces import (
     CreateJwtOkResult,
@@ -39,6 +46,10 @@ from ...jwt.interfaces import (
 
 _T = TypeVar("_T")
 
+# Max number of sessions whose claims are validated at a time by
+# verify_access_tokens_batch (validating a claim can make requests)
+VERIFY_ACCESS_TOKENS_BATCH_CLAIMS_MAX_CONCURRENCY = 10
+
 
 async def create_new_session(
     request: Any,
@@ -271,6 +282,66 @@ async def get_session(
     return session
 
 
+async def verify_access_tokens_batch(
+    access_tokens: List[str],
+    executor: Union[Executor, None] = None,
+    override_global_claim_validators: Optional[
+        Callable[
+            [List[SessionClaimValidator], SessionContainer, Dict[str, Any]],
+            MaybeAwaitable[List[SessionClaimValidator]],
+        ]
+    ] = None,
+    user_context: Union[None, Dict[str, Any]] = None,
+) -> List[Union[SessionContainer, SuperTokensSessionError]]:
+    """
+    Verifies many access tokens (for example in an API gateway) as get_session
+    would if each was sent in the authorization header, and returns for each
+    token either its session or the error get_session would raise for it.
+
+    The signature verifications are split among the workers of executor (the
+    default executor of the event loop if None). Pass a ProcessPoolExecutor to
+    verify tokens on all the CPU cores.
+    """
+    if user_context is None:
+        user_context = {}
+
+    session_recipe_impl = SessionRecipe.get_instance().recipe_implementation
+    results = await session_recipe_impl.verify_access_tokens_batch(
+        access_tokens, executor, user_context
+    )
+
+    def get_assert_claims_func(
+        session: SessionContainer,
+    ) -> Callable[[], Awaitable[None]]:
+        async def func():
+            claim_validators = await get_required_claim_validators(
+                session, override_global_claim_validators, user_context
+            )
+            await session.assert_claims(claim_validators, user_context)
+
+        return func
+
+    session_indexes = [
+        index
+        for index, result in enumerate(results)
+        if not isinstance(result, SuperTokensSessionError)
+    ]
+    claim_errors = await run_with_limited_concurrency(
+        [
+            get_assert_claims_func(results[index])  # type: ignore
+            for index in session_indexes
+        ],
+        VERIFY_ACCESS_TOKENS_BATCH_CLAIMS_MAX_CONCURRENCY,
+    )
+    for index, error in zip(session_indexes, claim_errors):
+        if isinstance(error, SuperTokensSessionError):
+            results[index] = error
+        elif isinstance(error, Exception):
+            raise error
+
+    return results
+
+
 async def refresh_session(
     request: Any, user_context: Union[None, Dict[str, Any]] = None
 ) -> SessionContainer:
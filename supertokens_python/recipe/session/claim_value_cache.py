@@ -0,0 +1,154 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+from collections import OrderedDict
+from copy import deepcopy
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+from supertokens_python.exceptions import GeneralError
+from supertokens_python.types import MaybeAwaitable
+from supertokens_python.utils import get_timestamp_ms, resolve
+
+_T = TypeVar("_T")
+
+
+class ClaimValueCache:
+    """
+    LRU cache of the values of claims by (claim key, user id), shared by all
+    the sessions of a user, so that their claims are fetched once per
+    process instead of once per session. A value is never returned after its
+    ttl, but it can be up to ttl older than the time saved with it in the
+    access token payload.
+    """
+
+    def __init__(self, max_size: int):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # (claim key, user id) -> (expiry time, value)
+        self.__entries: OrderedDict[Tuple[str, str], Tuple[int, Any]] = OrderedDict()
+        # Incremented whenever values are invalidated, so that values fetched
+        # before that aren't saved afterwards
+        self.__generation = 0
+        self.__lock = Lock()
+
+    @property
+    def generation(self) -> int:
+        return self.__generation
+
+    def get(self, claim_key: str, user_id: str) -> Tuple[bool, Any]:
+        """Returns whether a value was found, and the value"""
+        key = (claim_key, user_id)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                if entry[0] > get_timestamp_ms():
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    # Copied since the value is added to (mutable) payloads
+                    return True, deepcopy(entry[1])
+                del self.__entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(
+        self,
+        claim_key: str,
+        user_id: str,
+        value: Any,
+        ttl_in_ms: int,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        If generation (read before fetching the value) is given, the value is
+        only saved if no values were invalidated since, as it could be stale.
+        """
+        key = (claim_key, user_id)
+        with self.__lock:
+            if generation is not None and generation != self.__generation:
+                return
+            self.__entries[key] = (get_timestamp_ms() + ttl_in_ms, deepcopy(value))
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, claim_keys: List[str], user_id: Optional[str] = None) -> None:
+        """Removes the values of the claims for user_id, or for all users if None"""
+        with self.__lock:
+            self.__generation += 1
+            if user_id is not None:
+                for claim_key in claim_keys:
+                    self.__entries.pop((claim_key, user_id), None)
+                return
+            for key in [key for key in self.__entries if key[0] in claim_keys]:
+                del self.__entries[key]
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__generation += 1
+            self.__entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
+def get_claim_value_cache() -> Union[ClaimValueCache, None]:
+    from .recipe import SessionRecipe
+
+    try:
+        return SessionRecipe.get_instance().claim_value_cache
+    except GeneralError:
+        return None
+
+
+def invalidate_claim_values(claim_keys: List[str], user_id: Optional[str] = None):
+    claim_value_cache = get_claim_value_cache()
+    if claim_value_cache is not None:
+        claim_value_cache.invalidate(claim_keys, user_id)
+
+
+def with_claim_value_cache(
+    claim_key: str,
+    fetch_value: Callable[[str, Dict[str, Any]], MaybeAwaitable[Optional[_T]]],
+    ttl_in_sec: int,
+    should_cache: Callable[[_T], bool] = lambda _: True,
+) -> Callable[[str, Dict[str, Any]], Awaitable[Optional[_T]]]:
+    """
+    Wraps the fetch_value of a claim so that it uses the claim value cache of
+    the session recipe (if enabled with claim_value_cache_size).
+    """
+
+    async def cached_fetch_value(
+        user_id: str, user_context: Dict[str, Any]
+    ) -> Optional[_T]:
+        claim_value_cache = get_claim_value_cache()
+        if claim_value_cache is None:
+            return await resolve(fetch_value(user_id, user_context))
+
+        found, value = claim_value_cache.get(claim_key, user_id)
+        if found:
+            return value
+        generation = claim_value_cache.generation
+        value = await resolve(fetch_value(user_id, user_context))
+        if value is not None and should_cache(value):
+            claim_value_cache.set(
+                claim_key, user_id, value, ttl_in_sec * 1000, generation
+            )
+        return value
+
+    return cached_fetch_value
@@ -38,9 +38,9 @@ if TYPE_CHECKING:
     from .recipe import SessionRecipe
     from .utils import TokenTransferMethod, TokenType, SessionConfig
 
-from json import dumps
 from typing import Any, Dict, Union
 
+from supertokens_python.json_codec import json_dumps
 from supertokens_python.utils import get_header, utf_base64encode
 
 
@@ -56,7 +56,7 @@ def _set_front_token_in_headers(
     set_header(
         response,
         FRONT_TOKEN_HEADER_SET_KEY,
-        utf_base64encode(dumps(token_info, separators=(",", ":"), sort_keys=True)),
+        utf_base64encode(json_dumps(token_info, sort_keys=True)),
         False,
     )
     set_header(
@@ -0,0 +1,91 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import os
+from tempfile import mkstemp
+from typing import Any, Dict, List, Union
+
+from supertokens_python.json_codec import json_dumps, json_loads
+from supertokens_python.logger import log_debug_message
+from supertokens_python.utils import get_timestamp_ms
+
+# A snapshot of the handshake info (in the format of the response of
+# /recipe/handshake) saved to a file, so that new processes can verify access
+# tokens without waiting for the handshake. It only contains public keys, but
+# anyone who can write it can make the SDK accept their tokens, so it must only
+# be writable by the app.
+
+
+def load_handshake_snapshot(path: str) -> Union[Dict[str, Any], None]:
+    """
+    Returns the snapshot saved at path, or None if there is none, if it isn't
+    valid or if none of its signing keys are still valid.
+    """
+    try:
+        with open(path, "rb") as f:
+            snapshot = json_loads(f.read())
+        key_list: List[Dict[str, Any]] = snapshot["jwtSigningPublicKeyList"]
+        for key in key_list:
+            if not isinstance(key["publicKey"], str):
+                raise ValueError("publicKey must be a string")
+            if not isinstance(key["expiryTime"], int):
+                raise ValueError("expiryTime must be an integer")
+            if not isinstance(key["createdAt"], int):
+                raise ValueError("createdAt must be an integer")
+        if not isinstance(snapshot["accessTokenBlacklistingEnabled"], bool):
+            raise ValueError("accessTokenBlacklistingEnabled must be a boolean")
+        snapshot["accessTokenValidity"] = int(snapshot["accessTokenValidity"])
+        snapshot["refreshTokenValidity"] = int(snapshot["refreshTokenValidity"])
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log_debug_message("Ignoring the handshake snapshot in %s: %s", path, str(e))
+        return None
+
+    time_now = get_timestamp_ms()
+    if all(key["expiryTime"] <= time_now for key in key_list):
+        return None
+    return snapshot
+
+
+def save_handshake_snapshot(
+    path: str,
+    access_token_blacklisting_enabled: bool,
+    access_token_validity: int,
+    refresh_token_validity: int,
+    jwt_signing_public_key_list: List[Dict[str, Any]],
+) -> None:
+    snapshot = {
+        "accessTokenBlacklistingEnabled": access_token_blacklisting_enabled,
+        "accessTokenValidity": access_token_validity,
+        "refreshTokenValidity": refresh_token_validity,
+        "jwtSigningPublicKeyList": jwt_signing_public_key_list,
+    }
+    try:
+        # Written to a temporary file (only readable / writable by the
+        # current user) that replaces the snapshot, so that processes reading
+        # the snapshot never see a partially written file.
+        fd, temp_path = mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)), prefix=".handshake-"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json_dumps(snapshot).encode("utf-8"))
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except Exception as e:
+        log_debug_message("Could not save the handshake snapshot: %s", str(e))
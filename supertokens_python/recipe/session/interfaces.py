@@ -30,10 +30,12 @@ from supertokens_python.async_to_sync_wrapper import sync
 from supertokens_python.types import APIResponse, GeneralErrorResponse, MaybeAwaitable
 
 from ...utils import resolve
-from .exceptions import ClaimValidationError
+from .exceptions import ClaimValidationError, SuperTokensSessionError
 from .utils import SessionConfig, TokenTransferMethod
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
     from supertokens_python.framework import BaseRequest
 
 from supertokens_python.framework import BaseResponse
@@ -100,9 +102,14 @@ class ClaimsValidationResult:
         self,
         invalid_claims: List[ClaimValidationError],
         access_token_payload_update: Optional[Dict[str, Any]] = None,
+        claim_fetch_times_in_ms: Optional[Dict[str, float]] = None,
     ):
         self.invalid_claims = invalid_claims
         self.access_token_payload_update = access_token_payload_update
+        # claim key -> time it took to fetch the value of the claim
+        self.claim_fetch_times_in_ms = (
+            claim_fetch_times_in_ms if claim_fetch_times_in_ms is not None else {}
+        )
 
 
 class RecipeInterface(ABC):  # pylint: disable=too-many-public-methods
@@ -139,6 +146,15 @@ class RecipeInterface(ABC):  # pylint: disable=too-many-public-methods
     ) -> Union[SessionContainer, None]:
         pass
 
+    @abstractmethod
+    async def verify_access_tokens_batch(
+        self,
+        access_tokens: List[str],
+        executor: Union[Executor, None],
+        user_context: Dict[str, Any],
+    ) -> List[Union[SessionContainer, SuperTokensSessionError]]:
+        pass
+
     @abstractmethod
     async def validate_claims(
         self,
@@ -13,30 +13,28 @@
 # under the License.
 
 from base64 import b64decode
-from json import dumps, loads
 from textwrap import wrap
-from typing import Any, Dict
+from threading import Lock
+from typing import Any, Dict, List, Union
 
 from Crypto.Hash import SHA256
 from Crypto.PublicKey import RSA
 from Crypto.Signature.pkcs1_15 import PKCS115_SigScheme
-from supertokens_python.utils import utf_base64decode, utf_base64encode
+from supertokens_python.json_codec import json_dumps, json_loads
+from supertokens_python.utils import utf_base64encode
 
 _key_start = "-----BEGIN PUBLIC KEY-----\n"
 _key_end = "\n-----END PUBLIC KEY-----"
 
 """
-why separators is used in dumps:
-- without it's use, output of dumps is: '{"alg": "RS256", "typ": "JWT", "version": "1"}'
-- with it's use, output of dumps is: '{"alg":"RS256","typ":"JWT","version":"1"}'
+json_dumps outputs the non-spaced version: '{"alg":"RS256","typ":"JWT","version":"1"}'
 
 we require the non-spaced version, else the base64 encoding string will end up different than required
 """
 _allowed_headers = [
     utf_base64encode(
-        dumps(
+        json_dumps(
             {"alg": "RS256", "typ": "JWT", "version": "2"},
-            separators=(",", ":"),
             sort_keys=True,
         )
     )
@@ -44,19 +42,38 @@ _allowed_headers = [
 
 
 class ParsedJWTInfo:
+    __slots__ = (
+        "raw_token_string",
+        "raw_payload",
+        "header",
+        "signature",
+        "access_token_info",
+        "__payload",
+    )
+
     def __init__(
         self,
         raw_token_string: str,
         raw_payload: str,
         header: str,
-        payload: Dict[str, Any],
+        payload: Union[Dict[str, Any], None],
         signature: str,
     ) -> None:
         self.raw_token_string = raw_token_string
         self.raw_payload = raw_payload
         self.header = header
-        self.payload = payload
         self.signature = signature
+        # Set by access_token.get_access_token_info_from_payload
+        self.access_token_info: Union[Dict[str, Any], None] = None
+        self.__payload = payload
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        # Decoded once, on first use
+        if self.__payload is None:
+            # The JSON codec decodes the bytes as UTF-8 itself
+            self.__payload = json_loads(b64decode(self.raw_payload))
+        return self.__payload  # type: ignore
 
 
 def parse_jwt_without_signature_verification(jwt: str) -> ParsedJWTInfo:
@@ -68,22 +85,61 @@ def parse_jwt_without_signature_verification(jwt: str) -> ParsedJWTInfo:
     if header not in _allowed_headers:
         raise Exception("jwt header mismatch")
 
-    return ParsedJWTInfo(
-        raw_token_string=jwt,
-        raw_payload=payload,
-        header=header,
-        # Ideally we would only parse this after the signature verification is done
-        # We do this at the start, since we want to check if a token can be a supertokens access token or not.
-        payload=loads(utf_base64decode(payload)),
-        signature=signature,
-    )
+    # The payload is decoded when it's first accessed, which raises if it is
+    # not valid
+    return ParsedJWTInfo(jwt, payload, header, None, signature)
 
 
-def verify_jwt(info: ParsedJWTInfo, jwt_signing_public_key: str):
+# Importing a public key is much more expensive than verifying a signature
+# with it, so the verifiers are cached by the public key string sent by the
+# core. The cache is replaced whenever the list of signing keys is updated.
+_MAX_CACHED_VERIFIERS = 100
+_verifiers: Dict[str, PKCS115_SigScheme] = {}
+# Guards insertions and evictions, since WSGI threads and the executor workers
+# of verify_access_tokens_batch update the cache concurrently
+_verifiers_lock = Lock()
+
+
+def _create_verifier(jwt_signing_public_key: str) -> PKCS115_SigScheme:
     public_key = RSA.import_key(
         _key_start + "\n".join(wrap(jwt_signing_public_key, width=64)) + _key_end
     )
-    verifier = PKCS115_SigScheme(public_key)
+    return PKCS115_SigScheme(public_key)
+
+
+def get_verifier(jwt_signing_public_key: str) -> PKCS115_SigScheme:
+    verifier = _verifiers.get(jwt_signing_public_key)
+    if verifier is None:
+        verifier = _create_verifier(jwt_signing_public_key)
+        with _verifiers_lock:
+            if len(_verifiers) >= _MAX_CACHED_VERIFIERS:
+                _verifiers.pop(next(iter(_verifiers)), None)
+            _verifiers[jwt_signing_public_key] = verifier
+    return verifier
+
+
+def set_cached_verifiers(jwt_signing_public_keys: List[str]):
+    """
+    Keeps only the verifiers of the given keys (which evicts the ones of keys
+    that have expired), creating the ones that are not cached yet.
+    """
+    global _verifiers  # pylint: disable=global-statement
+    verifiers: Dict[str, PKCS115_SigScheme] = {}
+    for key in jwt_signing_public_keys[:_MAX_CACHED_VERIFIERS]:
+        verifier = _verifiers.get(key)
+        if verifier is None:
+            try:
+                verifier = _create_verifier(key)
+            except Exception:
+                # verify_jwt will raise for this key
+                continue
+        verifiers[key] = verifier
+    with _verifiers_lock:
+        _verifiers = verifiers
+
+
+def verify_jwt(info: ParsedJWTInfo, jwt_signing_public_key: str):
+    verifier = get_verifier(jwt_signing_public_key)
     to_verify = SHA256.new((info.header + "." + info.raw_payload).encode("utf-8"))
     try:
         verifier.verify(to_verify, b64decode(info.signature.encode("utf-8")))
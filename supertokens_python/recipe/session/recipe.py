@@ -46,6 +46,7 @@ from supertokens_python.recipe.session.with_jwt import (
 from supertokens_python.recipe_module import APIHandled, RecipeModule
 
 from .api.implementation import APIImplementation
+from .claim_value_cache import ClaimValueCache
 from .constants import SESSION_REFRESH, SIGNOUT
 from .interfaces import (
     APIInterface,
@@ -93,6 +94,12 @@ class SessionRecipe(RecipeModule):
         override: Union[InputOverrideConfig, None] = None,
         jwt: Union[JWTConfig, None] = None,
         invalid_claim_status_code: Union[int, None] = None,
+        verified_access_token_cache_size: Union[int, None] = None,
+        refresh_signing_keys_before_expiry_in_ms: Union[int, None] = None,
+        revocation_filter_max_staleness_in_ms: Union[int, None] = None,
+        handshake_snapshot_path: Union[str, None] = None,
+        refresh_session_coalescing_window_in_ms: Union[int, None] = None,
+        claim_value_cache_size: Union[int, None] = None,
     ):
         super().__init__(recipe_id, app_info)
         self.openid_recipe: Union[None, OpenIdRecipe] = None
@@ -108,6 +115,12 @@ class SessionRecipe(RecipeModule):
             override,
             jwt,
             invalid_claim_status_code,
+            verified_access_token_cache_size,
+            refresh_signing_keys_before_expiry_in_ms,
+            revocation_filter_max_staleness_in_ms,
+            handshake_snapshot_path,
+            refresh_session_coalescing_window_in_ms,
+            claim_value_cache_size,
         )
         log_debug_message("session init: anti_csrf: %s", self.config.anti_csrf)
         if self.config.cookie_domain is not None:
@@ -166,6 +179,12 @@ class SessionRecipe(RecipeModule):
             else self.config.override.apis(api_implementation)
         )
 
+        self.claim_value_cache: Union[ClaimValueCache, None] = (
+            ClaimValueCache(self.config.claim_value_cache_size)
+            if self.config.claim_value_cache_size is not None
+            else None
+        )
+
         self.claims_added_by_other_recipes: List[SessionClaim[Any]] = []
         self.claim_validators_added_by_other_recipes: List[SessionClaimValidator] = []
 
@@ -289,6 +308,12 @@ class SessionRecipe(RecipeModule):
         override: Union[InputOverrideConfig, None] = None,
         jwt: Union[JWTConfig, None] = None,
         invalid_claim_status_code: Union[int, None] = None,
+        verified_access_token_cache_size: Union[int, None] = None,
+        refresh_signing_keys_before_expiry_in_ms: Union[int, None] = None,
+        revocation_filter_max_staleness_in_ms: Union[int, None] = None,
+        handshake_snapshot_path: Union[str, None] = None,
+        refresh_session_coalescing_window_in_ms: Union[int, None] = None,
+        claim_value_cache_size: Union[int, None] = None,
     ):
         def func(app_info: AppInfo):
             if SessionRecipe.__instance is None:
@@ -305,6 +330,12 @@ class SessionRecipe(RecipeModule):
                     override,
                     jwt,
                     invalid_claim_status_code,
+                    verified_access_token_cache_size,
+                    refresh_signing_keys_before_expiry_in_ms,
+                    revocation_filter_max_staleness_in_ms,
+                    handshake_snapshot_path,
+                    refresh_session_coalescing_window_in_ms,
+                    claim_value_cache_size,
                 )
                 return SessionRecipe.__instance
             raise_general_exception(
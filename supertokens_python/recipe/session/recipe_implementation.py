@@ -13,24 +13,31 @@
 # under the License.
 from __future__ import annotations
 
-import json
-from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+import asyncio
+from bisect import bisect_right
+from copy import deepcopy
+from threading import RLock, Timer
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional
 
 from supertokens_python.framework import BaseRequest
-from supertokens_python.logger import log_debug_message
+from supertokens_python.json_codec import json_dumps
+from supertokens_python.logger import LazyLogArg, log_debug_message
 from supertokens_python.normalised_url_path import NormalisedURLPath
 from supertokens_python.process_state import AllowedProcessStates, ProcessState
 from supertokens_python.utils import (
+    SingleFlight,
     execute_async,
     get_timestamp_ms,
     is_an_ip_address,
     normalise_http_method,
     resolve,
+    run_with_limited_concurrency,
 )
 
 from ...types import MaybeAwaitable
 from . import session_functions
-from .access_token import validate_access_token_structure
+from .access_token import get_access_token_info_from_payload
 from .cookie_and_header import (
     anti_csrf_response_mutator,
     clear_session_response_mutator,
@@ -42,6 +49,7 @@ from .cookie_and_header import (
     token_response_mutator,
 )
 from .exceptions import (
+    SuperTokensSessionError,
     TokenTheftError,
     UnauthorisedError,
     raise_try_refresh_token_exception,
@@ -61,7 +69,15 @@ from .interfaces import (
     SessionInformationResult,
     SessionObj,
 )
-from .jwt import ParsedJWTInfo, parse_jwt_without_signature_verification
+from .access_token_cache import VerifiedAccessTokenCache
+from .handshake_snapshot import load_handshake_snapshot, save_handshake_snapshot
+from .refresh_coalescer import RefreshSessionCoalescer
+from .revocation_filter import SessionRevocationFilter
+from .jwt import (
+    ParsedJWTInfo,
+    parse_jwt_without_signature_verification,
+    set_cached_verifiers,
+)
 from .session_class import Session
 from .utils import (
     HUNDRED_YEARS_IN_MS,
@@ -71,6 +87,7 @@ from .utils import (
 )
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
     from typing import List, Union
     from supertokens_python import AppInfo
     from supertokens_python.querier import Querier
@@ -79,6 +96,18 @@ from .constants import available_token_transfer_methods
 from .interfaces import SessionContainer
 
 
+class _JWTSigningPublicKeyIndex(NamedTuple):
+    # The raw key list this was built from
+    raw_keys: List[Dict[str, Any]]
+    # Its unexpired keys
+    keys: List[Dict[str, Any]]
+    # The same keys sorted by createdAt, and their createdAt values
+    keys_by_created_at: List[Dict[str, Any]]
+    created_at_list: List[int]
+    # When the first of the keys expires
+    valid_until: float
+
+
 class HandshakeInfo:
     def __init__(self, info: Dict[str, Any]):
         self.access_token_blacklisting_enabled = info["accessTokenBlacklistingEnabled"]
@@ -86,17 +115,63 @@ class HandshakeInfo:
         self.anti_csrf = info["antiCsrf"]
         self.access_token_validity = info["accessTokenValidity"]
         self.refresh_token_validity = info["refreshTokenValidity"]
+        self.__jwt_signing_public_key_index = _JWTSigningPublicKeyIndex(
+            [], [], [], [], 0
+        )
 
     def set_jwt_signing_public_key_list(self, updated_list: List[Dict[str, Any]]):
         self.raw_jwt_signing_public_key_list = updated_list
 
-    def get_jwt_signing_public_key_list(self) -> List[Dict[str, Any]]:
+    def __get_jwt_signing_public_key_index(self) -> _JWTSigningPublicKeyIndex:
+        # The list of unexpired keys only changes when a key in it expires, so
+        # it's rebuilt then (or when the raw list is set) instead of every call.
+        # It's replaced as a whole, so that concurrent readers (which read it
+        # once) never see a partially updated index.
+        index = self.__jwt_signing_public_key_index
+        raw_keys = self.raw_jwt_signing_public_key_list
         time_now = get_timestamp_ms()
-        return [
-            key
-            for key in self.raw_jwt_signing_public_key_list
-            if key["expiryTime"] > time_now
-        ]
+        if index.raw_keys is raw_keys and time_now < index.valid_until:
+            return index
+
+        keys = [key for key in raw_keys if key["expiryTime"] > time_now]
+        keys_by_created_at = sorted(keys, key=lambda key: key["createdAt"])
+        index = _JWTSigningPublicKeyIndex(
+            raw_keys,
+            keys,
+            keys_by_created_at,
+            [key["createdAt"] for key in keys_by_created_at],
+            min((key["expiryTime"] for key in keys), default=float("inf")),
+        )
+        self.__jwt_signing_public_key_index = index
+        return index
+
+    def get_jwt_signing_public_key_list(self) -> List[Dict[str, Any]]:
+        return self.__get_jwt_signing_public_key_index().keys
+
+    def get_jwt_signing_public_key_for_access_token(
+        self, time_created: int
+    ) -> Union[Dict[str, Any], None]:
+        """
+        Returns the newest unexpired key created at or before time_created,
+        which is the key the core signed an access token created then with, or
+        None if there is no such key.
+        """
+        index = self.__get_jwt_signing_public_key_index()
+        position = bisect_right(index.created_at_list, time_created)
+        if position == 0:
+            return None
+        return index.keys_by_created_at[position - 1]
+
+
+# Bounds of the delay of the background refresh of the signing keys when the
+# core keeps returning the same keys after they entered the refresh window
+# (because it hasn't rotated them yet). The delay doubles after each such
+# refresh instead of querying the core every second until the keys change.
+MIN_SIGNING_KEYS_REFRESH_DELAY_IN_MS = 1000
+MAX_SIGNING_KEYS_REFRESH_DELAY_IN_MS = 10 * 60 * 1000
+
+# Max number of claim values validate_claims fetches at the same time
+VALIDATE_CLAIMS_FETCH_MAX_CONCURRENCY = 5
 
 
 LEGACY_ID_REFRESH_TOKEN_COOKIE_NAME = "sIdRefreshToken"
@@ -109,6 +184,57 @@ class RecipeImplementation(RecipeInterface):  # pylint: disable=too-many-public-
         self.config = config
         self.app_info = app_info
         self.handshake_info: Union[HandshakeInfo, None] = None
+        self.verified_access_token_cache: Union[VerifiedAccessTokenCache, None] = (
+            VerifiedAccessTokenCache(config.verified_access_token_cache_size)
+            if config.verified_access_token_cache_size is not None
+            else None
+        )
+        self.revocation_filter: Union[SessionRevocationFilter, None] = (
+            SessionRevocationFilter(config.revocation_filter_max_staleness_in_ms)
+            if config.revocation_filter_max_staleness_in_ms is not None
+            else None
+        )
+        self.refresh_session_coalescer: Union[RefreshSessionCoalescer, None] = (
+            RefreshSessionCoalescer(config.refresh_session_coalescing_window_in_ms)
+            if config.refresh_session_coalescing_window_in_ms is not None
+            else None
+        )
+        self.__handshake_requests: SingleFlight[None, HandshakeInfo] = SingleFlight()
+        # Guards the handshake info, its keys and the refresh of the keys,
+        # which are updated from the request path and from the refresh thread.
+        self.__signing_keys_lock = RLock()
+        self.__signing_keys_refresh_timer: Union[Timer, None] = None
+        self.__signing_keys_refresh_backoff_in_ms = MIN_SIGNING_KEYS_REFRESH_DELAY_IN_MS
+
+        if config.handshake_snapshot_path is not None:
+            snapshot = load_handshake_snapshot(config.handshake_snapshot_path)
+            if snapshot is not None:
+                # Tokens can be verified right away, and the handshake is done
+                # when the keys of the snapshot expire.
+                self.handshake_info = HandshakeInfo(
+                    {**snapshot, "antiCsrf": config.anti_csrf}
+                )
+                self.handshake_info.set_jwt_signing_public_key_list(
+                    snapshot["jwtSigningPublicKeyList"]
+                )
+                set_cached_verifiers(
+                    [key["publicKey"] for key in snapshot["jwtSigningPublicKeyList"]]
+                )
+                self.__schedule_signing_keys_refresh(
+                    snapshot["jwtSigningPublicKeyList"], True
+                )
+                return
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Like with WSGI: the handshake uses the sync transport instead of
+            # an event loop that would only be used for it.
+            try:
+                self.__fetch_handshake_info_sync()
+            except Exception:
+                pass
+            return
 
         async def call_get_handshake_info():
             try:
@@ -122,28 +248,108 @@ class RecipeImplementation(RecipeInterface):  # pylint: disable=too-many-public-
             pass
 
     async def get_handshake_info(self, force_refetch: bool = False) -> HandshakeInfo:
+        handshake_info = self.handshake_info
         if (
-            self.handshake_info is None
-            or len(self.handshake_info.get_jwt_signing_public_key_list()) == 0
+            handshake_info is None
+            or len(handshake_info.get_jwt_signing_public_key_list()) == 0
             or force_refetch
         ):
-            ProcessState.get_instance().add_state(
-                AllowedProcessStates.CALLING_SERVICE_IN_GET_HANDSHAKE_INFO
-            )
-            response = await self.querier.send_post_request(
-                NormalisedURLPath("/recipe/handshake"), {}
-            )
-            self.handshake_info = HandshakeInfo(
-                {**response, "antiCsrf": self.config.anti_csrf}
+            # Concurrent callers (for example all the requests that arrive at
+            # startup or when the keys expire) share one handshake request.
+            return await self.__handshake_requests.run(
+                None, self.__fetch_handshake_info
             )
 
+        return handshake_info
+
+    async def __fetch_handshake_info(self) -> HandshakeInfo:
+        ProcessState.get_instance().add_state(
+            AllowedProcessStates.CALLING_SERVICE_IN_GET_HANDSHAKE_INFO
+        )
+        response = await self.querier.send_post_request(
+            NormalisedURLPath("/recipe/handshake"), {}
+        )
+        return self.__set_handshake_info(response)
+
+    def __fetch_handshake_info_sync(self) -> HandshakeInfo:
+        ProcessState.get_instance().add_state(
+            AllowedProcessStates.CALLING_SERVICE_IN_GET_HANDSHAKE_INFO
+        )
+        response = self.querier.send_post_request_sync(
+            NormalisedURLPath("/recipe/handshake"), {}
+        )
+        return self.__set_handshake_info(response)
+
+    def __set_handshake_info(self, response: Dict[str, Any]) -> HandshakeInfo:
+        handshake_info = HandshakeInfo({**response, "antiCsrf": self.config.anti_csrf})
+        with self.__signing_keys_lock:
+            if self.handshake_info is not None:
+                # So that update_jwt_signing_public_key_info compares the new
+                # keys with the ones we already had.
+                handshake_info.set_jwt_signing_public_key_list(
+                    self.handshake_info.raw_jwt_signing_public_key_list
+                )
+            self.handshake_info = handshake_info
+
             self.update_jwt_signing_public_key_info(
                 response["jwtSigningPublicKeyList"],
                 response["jwtSigningPublicKey"],
                 response["jwtSigningPublicKeyExpiryTime"],
             )
 
-        return self.handshake_info
+        return handshake_info
+
+    def __schedule_signing_keys_refresh(
+        self, key_list: List[Dict[str, Any]], keys_changed: bool
+    ):
+        refresh_before_expiry_in_ms = (
+            self.config.refresh_signing_keys_before_expiry_in_ms
+        )
+        if refresh_before_expiry_in_ms is None or len(key_list) == 0:
+            return
+        if not keys_changed and self.__signing_keys_refresh_timer is not None:
+            # Like when the core sends the keys with a session it created or
+            # verified: the scheduled refresh is still right
+            return
+
+        if keys_changed:
+            self.__signing_keys_refresh_backoff_in_ms = (
+                MIN_SIGNING_KEYS_REFRESH_DELAY_IN_MS
+            )
+        backoff_in_ms = self.__signing_keys_refresh_backoff_in_ms
+        time_until_expiry_in_ms = (
+            max(key["expiryTime"] for key in key_list) - get_timestamp_ms()
+        )
+        delay_in_ms = time_until_expiry_in_ms - refresh_before_expiry_in_ms
+        if delay_in_ms < backoff_in_ms:
+            # The keys are in the refresh window already
+            delay_in_ms = backoff_in_ms
+            if time_until_expiry_in_ms >= MIN_SIGNING_KEYS_REFRESH_DELAY_IN_MS:
+                delay_in_ms = min(delay_in_ms, time_until_expiry_in_ms)
+            self.__signing_keys_refresh_backoff_in_ms = min(
+                backoff_in_ms * 2, MAX_SIGNING_KEYS_REFRESH_DELAY_IN_MS
+            )
+
+        if self.__signing_keys_refresh_timer is not None:
+            self.__signing_keys_refresh_timer.cancel()
+        # A thread (instead of a callback on the running event loop) so that the
+        # refresh happens with WSGI too, where there is no running event loop.
+        timer = Timer(delay_in_ms / 1000, self.__refresh_signing_keys)
+        timer.daemon = True
+        timer.start()
+        self.__signing_keys_refresh_timer = timer
+
+    def __refresh_signing_keys(self):
+        with self.__signing_keys_lock:
+            # So that the refresh is rescheduled even if the keys didn't change
+            self.__signing_keys_refresh_timer = None
+        try:
+            # The sync transport, since this thread has no event loop
+            self.__fetch_handshake_info_sync()
+        except Exception as e:
+            # Not retried here: once the keys expire, get_handshake_info fetches
+            # them on the request path (and schedules the next refresh).
+            log_debug_message("Refreshing the signing keys failed: %s", str(e))
 
     def update_jwt_signing_public_key_info(
         self,
@@ -160,8 +366,30 @@ class RecipeImplementation(RecipeInterface):  # pylint: disable=too-many-public-
                 }
             ]
 
-        if self.handshake_info is not None:
-            self.handshake_info.set_jwt_signing_public_key_list(key_list)
+        with self.__signing_keys_lock:
+            handshake_info = self.handshake_info
+            keys_changed = True
+            if handshake_info is not None:
+                # createdAt is ignored since it's set to the current time above
+                keys_changed = [
+                    (key["publicKey"], key["expiryTime"])
+                    for key in handshake_info.raw_jwt_signing_public_key_list
+                ] != [(key["publicKey"], key["expiryTime"]) for key in key_list]
+                if keys_changed:
+                    if self.verified_access_token_cache is not None:
+                        self.verified_access_token_cache.clear()
+                    if self.config.handshake_snapshot_path is not None:
+                        save_handshake_snapshot(
+                            self.config.handshake_snapshot_path,
+                            handshake_info.access_token_blacklisting_enabled,
+                            handshake_info.access_token_validity,
+                            handshake_info.refresh_token_validity,
+                            key_list,
+                        )
+                handshake_info.set_jwt_signing_public_key_list(key_list)
+
+            set_cached_verifiers([key["publicKey"] for key in key_list])
+            self.__schedule_signing_keys_refresh(key_list, keys_changed)
 
     async def create_new_session(
         self,
@@ -291,40 +519,76 @@ class RecipeImplementation(RecipeInterface):  # pylint: disable=too-many-public-
         user_context: Dict[str, Any],
     ) -> ClaimsValidationResult:
         access_token_payload_update = None
-        original_access_token_payload = json.dumps(access_token_payload)
 
+        # The claims to refetch, in the order of their first validator. A claim
+        # can be checked by several validators but is only fetched once.
+        claims_to_refetch: Dict[str, SessionClaim[Any]] = {}
         for validator in claim_validators:
             log_debug_message(
                 "update_claims_in_payload_if_needed checking should_refetch for %s",
                 validator.id,
             )
-            if validator.claim is not None and validator.should_refetch(
-                access_token_payload, user_context
+            if (
+                validator.claim is not None
+                and validator.claim.key not in claims_to_refetch
+                and validator.should_refetch(access_token_payload, user_context)
             ):
                 log_debug_message(
                     "update_claims_in_payload_if_needed refetching for %s", validator.id
                 )
-                value = await resolve(
-                    validator.claim.fetch_value(user_id, user_context)
-                )
-                log_debug_message(
-                    "update_claims_in_payload_if_needed %s refetch result %s",
-                    validator.id,
-                    json.dumps(value),
+                claims_to_refetch[validator.claim.key] = validator.claim
+
+        claim_fetch_times_in_ms: Dict[str, float] = {}
+
+        def fetch_value_func(claim: SessionClaim[Any]):
+            async def fetch_value() -> Any:
+                start = perf_counter()
+                try:
+                    return await resolve(claim.fetch_value(user_id, user_context))
+                finally:
+                    claim_fetch_times_in_ms[claim.key] = (perf_counter() - start) * 1000
+
+            return fetch_value
+
+        # The claims are fetched concurrently, but added to the payload in the
+        # order of the validators so that the result doesn't depend on timing.
+        values = await run_with_limited_concurrency(
+            [fetch_value_func(claim) for claim in claims_to_refetch.values()],
+            VALIDATE_CLAIMS_FETCH_MAX_CONCURRENCY,
+        )
+        # Only the entries of the refetched claims can change. They're copied
+        # deeply since add_to_payload_ can update them in place.
+        original_claim_entries = {
+            claim.key: deepcopy(access_token_payload.get(claim.key))
+            for claim in claims_to_refetch.values()
+        }
+        for claim, value in zip(claims_to_refetch.values(), values):
+            if isinstance(value, Exception):
+                raise value
+            log_debug_message(
+                "update_claims_in_payload_if_needed %s refetch result %s in %.1fms",
+                claim.key,
+                LazyLogArg(lambda value=value: json_dumps(value)),
+                claim_fetch_times_in_ms[claim.key],
+            )
+            if value is not None:
+                access_token_payload = claim.add_to_payload_(
+                    access_token_payload, value, user_context
                 )
-                if value is not None:
-                    access_token_payload = validator.claim.add_to_payload_(
-                        access_token_payload, value, user_context
-                    )
 
-        if json.dumps(access_token_payload) != original_access_token_payload:
+        if any(
+            access_token_payload.get(key) != entry
+            for key, entry in original_claim_entries.items()
+        ):
             access_token_payload_update = access_token_payload
 
         invalid_claims = await validate_claims_in_payload(
             claim_validators, access_token_payload, user_context
         )
 
-        return ClaimsValidationResult(invalid_claims, access_token_payload_update)
+        return ClaimsValidationResult(
+            invalid_claims, access_token_payload_update, claim_fetch_times_in_ms
+        )
 
     async def validate_claims_in_jwt_payload(
         self,
@@ -373,7 +637,7 @@ class RecipeImplementation(RecipeInterface):  # pylint: disable=too-many-public-
             if token_string is not None:
                 try:
                     info = parse_jwt_without_signature_verification(token_string)
-                    validate_access_token_structure(info.payload)
+                    get_access_token_info_from_payload(info)
                     log_debug_message(
                         "getSession: got access token from %s", transfer_method
                     )
@@ -441,9 +705,21 @@ class RecipeImplementation(RecipeInterface):  # pylint: disable=too-many-public-
             get_rid_header(request) is not None,
         )
 
-        # Default is to respond with the access token obtained from the request
-        access_token_string = request_access_token.raw_token_string
+        session = self.__create_session_from_verification_result(
+            result, request_access_token.raw_token_string, request_transfer_method
+        )
 
+        log_debug_message("getSession: Success!")
+        request.set_session(session)
+        return session
+
+    def __create_session_from_verification_result(
+        self,
+        result: Dict[str, Any],
+        access_token_string: str,
+        transfer_method: TokenTransferMethod,
+    ) -> Session:
+        # Default is to respond with the access token obtained from the request
         session = Session(
             self,
             self.config,
@@ -451,7 +727,7 @@ class RecipeImplementation(RecipeInterface):  # pylint: disable=too-many-public-
             result["session"]["handle"],
             result["session"]["userId"],
             result["session"]["userDataInJWT"],
-            request_transfer_method,
+            transfer_method,
         )
 
         if "accessToken" in result:
@@ -479,10 +755,59 @@ class RecipeImplementation(RecipeInterface):  # pylint: disable=too-many-public-
                 )
             )
 
-        log_debug_message("getSession: Success!")
-        request.set_session(session)
         return session
 
+    async def verify_access_tokens_batch(
+        self,
+        access_tokens: List[str],
+        executor: Union[Executor, None],
+        user_context: Dict[str, Any],
+    ) -> List[Union[SessionContainer, SuperTokensSessionError]]:
+        log_debug_message("verifyAccessTokensBatch: Started")
+
+        results: List[Union[SessionContainer, SuperTokensSessionError, None]] = []
+        parsed_access_tokens: List[ParsedJWTInfo] = []
+        for access_token in access_tokens:
+            try:
+                info = parse_jwt_without_signature_verification(access_token)
+                get_access_token_info_from_payload(info)
+                parsed_access_tokens.append(info)
+                results.append(None)
+            except Exception:
+                # Same as get_session for a request without an access token
+                results.append(
+                    UnauthorisedError(
+                        "Session does not exist. Are you sending the session tokens in the "
+                        "request with the appropriate token transfer method?",
+                        clear_tokens=False,
+                    )
+                )
+
+        session_results = iter(
+            zip(
+                parsed_access_tokens,
+                await session_functions.get_sessions_batch(
+                    self, parsed_access_tokens, executor
+                ),
+            )
+        )
+        for index, result in enumerate(results):
+            if result is not None:
+                continue
+            parsed_access_token, session_result = next(session_results)
+            if isinstance(session_result, SuperTokensSessionError):
+                results[index] = session_result
+            elif isinstance(session_result, Exception):
+                # For example if the core could not be reached
+                raise session_result
+            else:
+                results[index] = self.__create_session_from_verification_result(
+                    session_result, parsed_access_token.raw_token_string, "header"
+                )
+
+        log_debug_message("verifyAccessTokensBatch: Done")
+        return results  # type: ignore
+
     # In all cases: if sIdRefreshToken token exists (it's a legacy session) we clear it
     # Check http://localhost:3002/docs/contribute/decisions/session/0008 for further details and
     # a table of expected behaviours
@@ -560,13 +885,34 @@ class RecipeImplementation(RecipeInterface):  # pylint: disable=too-many-public-
 
         try:
             anti_csrf_token = get_anti_csrf_header(request)
-            result = await session_functions.refresh_session(
-                self,
-                refresh_token,
-                anti_csrf_token,
-                get_rid_header(request) is not None,
-                request_transfer_method,
-            )
+            contains_custom_header = get_rid_header(request) is not None
+            refresh_session_coalescer = self.refresh_session_coalescer
+            if refresh_session_coalescer is None:
+                result = await session_functions.refresh_session(
+                    self,
+                    refresh_token,
+                    anti_csrf_token,
+                    contains_custom_header,
+                    request_transfer_method,
+                )
+            else:
+                refresh_token_to_use = refresh_token
+                transfer_method_to_use = request_transfer_method
+                result = await refresh_session_coalescer.refresh(
+                    RefreshSessionCoalescer.get_key(
+                        refresh_token,
+                        anti_csrf_token,
+                        contains_custom_header,
+                        request_transfer_method,
+                    ),
+                    lambda: session_functions.refresh_session(
+                        self,
+                        refresh_token_to_use,
+                        anti_csrf_token,
+                        contains_custom_header,
+                        transfer_method_to_use,
+                    ),
+                )
             log_debug_message(
                 "refreshSession: Attaching refresh session info as %s",
                 request_transfer_method,
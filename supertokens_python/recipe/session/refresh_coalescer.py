@@ -0,0 +1,120 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from copy import copy, deepcopy
+from hashlib import sha256
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Tuple, Union
+
+from supertokens_python.utils import SingleFlight, get_timestamp_ms
+
+from .exceptions import SuperTokensSessionError
+
+
+class RefreshSessionCoalescer:
+    """
+    Makes concurrent refreshes with the same refresh token (sent by several
+    tabs, or retried by a client) share one call to the core, so that they all
+    get the same new tokens instead of each rotating the refresh token. The
+    result is also reused for refreshes that arrive up to window_in_ms after
+    it. Only callers that hold the refresh token can get the result.
+    """
+
+    def __init__(self, window_in_ms: int):
+        if window_in_ms < 0:
+            raise ValueError("window_in_ms must be at least 0")
+        self.window_in_ms = window_in_ms
+        self.hits = 0
+        self.misses = 0
+        self.__in_flight: SingleFlight[bytes, Dict[str, Any]] = SingleFlight(
+            self.__on_refresh_done
+        )
+        # key -> (time at which the refresh finished, its result), in the
+        # order in which they finished
+        self.__recent: OrderedDict[
+            bytes, Tuple[int, "asyncio.Future[Dict[str, Any]]"]
+        ] = OrderedDict()
+        self.__lock = Lock()
+
+    @staticmethod
+    def get_key(
+        refresh_token: str,
+        anti_csrf_token: Union[str, None],
+        contains_custom_header: bool,
+        transfer_method: str,
+    ) -> bytes:
+        # Everything the result of the refresh depends on
+        return sha256(
+            "\n".join(
+                [
+                    refresh_token,
+                    anti_csrf_token or "",
+                    str(contains_custom_header),
+                    transfer_method,
+                ]
+            ).encode("utf-8")
+        ).digest()
+
+    async def refresh(
+        self, key: bytes, refresh_func: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        time_now = get_timestamp_ms()
+        with self.__lock:
+            while len(self.__recent) > 0:
+                finished_at, _ = next(iter(self.__recent.values()))
+                if time_now - finished_at < self.window_in_ms:
+                    break
+                self.__recent.popitem(last=False)
+
+            recent = self.__recent.get(key)
+            if recent is not None:
+                self.hits += 1
+                request = recent[1]
+            else:
+                request, started = self.__in_flight.start(key, refresh_func)
+                if started:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+
+        # Each caller gets its own copy of the result (used to build a session
+        # object) or error (to which response mutators are added)
+        try:
+            return deepcopy(await self.__in_flight.wait(request))
+        except SuperTokensSessionError as e:
+            error = copy(e)
+            error.response_mutators = list(e.response_mutators)
+            raise error from None
+
+    def __on_refresh_done(self, key: bytes, request: "asyncio.Future[Dict[str, Any]]"):
+        with self.__lock:
+            # Errors from the core (like UNAUTHORISED or token theft) are
+            # reused, but not others (like network errors) so they're retried
+            if (
+                self.window_in_ms > 0
+                and not request.cancelled()
+                and (
+                    request.exception() is None
+                    or isinstance(request.exception(), SuperTokensSessionError)
+                )
+            ):
+                self.__recent[key] = (get_timestamp_ms(), request)
+                self.__recent.move_to_end(key)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__recent.clear()
@@ -0,0 +1,96 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List
+
+from supertokens_python.utils import get_timestamp_ms
+
+# Max number of session handles the filter keeps track of
+DEFAULT_REVOCATION_FILTER_MAX_SIZE = 10000
+
+
+class SessionRevocationFilter:
+    """
+    Lets get_session skip the core when access token blacklisting is enabled.
+    A session is accepted locally if the core confirmed it exists less than
+    max_staleness_in_ms ago, unless it was revoked through this SDK since.
+    Sessions revoked elsewhere (by another instance of the backend or by the
+    core itself) can be accepted for up to max_staleness_in_ms.
+    """
+
+    def __init__(
+        self,
+        max_staleness_in_ms: int,
+        max_size: int = DEFAULT_REVOCATION_FILTER_MAX_SIZE,
+    ):
+        if max_staleness_in_ms < 1:
+            raise ValueError("max_staleness_in_ms must be at least 1")
+        self.max_staleness_in_ms = max_staleness_in_ms
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # session handle -> time at which the core last confirmed it exists
+        self.__verified_at: OrderedDict[str, int] = OrderedDict()
+        # session handle -> time at which it can be forgotten. Kept so that a
+        # verification that was in flight when the session was revoked
+        # doesn't mark it as verified again.
+        self.__revoked_until: Dict[str, int] = {}
+        self.__lock = Lock()
+
+    def is_recently_verified(self, session_handle: str) -> bool:
+        time_now = get_timestamp_ms()
+        with self.__lock:
+            verified_at = self.__verified_at.get(session_handle)
+            if verified_at is not None:
+                if time_now - verified_at < self.max_staleness_in_ms:
+                    self.hits += 1
+                    return True
+                del self.__verified_at[session_handle]
+            self.misses += 1
+            return False
+
+    def set_verified(self, session_handle: str) -> None:
+        time_now = get_timestamp_ms()
+        with self.__lock:
+            revoked_until = self.__revoked_until.get(session_handle)
+            if revoked_until is not None:
+                if revoked_until > time_now:
+                    return
+                del self.__revoked_until[session_handle]
+            self.__verified_at[session_handle] = time_now
+            self.__verified_at.move_to_end(session_handle)
+            while len(self.__verified_at) > self.max_size:
+                self.__verified_at.popitem(last=False)
+
+    def set_revoked(self, session_handles: List[str]) -> None:
+        time_now = get_timestamp_ms()
+        with self.__lock:
+            self.__revoked_until = {
+                session_handle: revoked_until
+                for session_handle, revoked_until in self.__revoked_until.items()
+                if revoked_until > time_now
+            }
+            for session_handle in session_handles:
+                self.__verified_at.pop(session_handle, None)
+                self.__revoked_until[session_handle] = (
+                    time_now + self.max_staleness_in_ms
+                )
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__verified_at.clear()
+            self.__revoked_until.clear()
@@ -13,8 +13,20 @@
 # under the License.
 from __future__ import annotations
 
+import asyncio
+import os
 import time
-from typing import TYPE_CHECKING, Any, Dict, List, Union
+from concurrent.futures import Executor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Tuple,
+    Union,
+)
 
 from supertokens_python.recipe.session.interfaces import SessionInformationResult
 
@@ -22,12 +34,13 @@ from .access_token import get_info_from_access_token
 from .jwt import ParsedJWTInfo
 
 if TYPE_CHECKING:
-    from .recipe_implementation import RecipeImplementation
+    from .recipe_implementation import HandshakeInfo, RecipeImplementation
     from .utils import TokenTransferMethod
 
 from supertokens_python.logger import log_debug_message
 from supertokens_python.normalised_url_path import NormalisedURLPath
 from supertokens_python.process_state import AllowedProcessStates, ProcessState
+from supertokens_python.utils import run_with_limited_concurrency
 
 from .exceptions import (
     TryRefreshTokenError,
@@ -36,6 +49,9 @@ from .exceptions import (
     raise_unauthorised_exception,
 )
 
+# Max number of requests to the core in flight at a time for get_sessions_batch
+BATCH_CORE_VERIFY_MAX_CONCURRENCY = 10
+
 
 async def create_new_session(
     recipe_implementation: RecipeImplementation,
@@ -75,26 +91,42 @@ async def create_new_session(
     return response
 
 
-async def get_session(
-    recipe_implementation: RecipeImplementation,
-    parsed_access_token: ParsedJWTInfo,
-    anti_csrf_token: Union[str, None],
-    do_anti_csrf_check: bool,
-    contains_custom_header: bool,
-) -> Dict[str, Any]:
-    handshake_info = await recipe_implementation.get_handshake_info()
-    access_token_info = None
-    found_a_sign_key_that_is_older_than_the_access_token = False
+def get_signing_keys_to_try(
+    handshake_info: HandshakeInfo, parsed_access_token: ParsedJWTInfo
+) -> List[Dict[str, Any]]:
+    time_created = parsed_access_token.payload.get("timeCreated")
+    signing_key = (
+        handshake_info.get_jwt_signing_public_key_for_access_token(time_created)
+        if isinstance(time_created, int)
+        else None
+    )
+    # The keys are tried newest first, until one verifies the token or is
+    # older than it. So when we know the key the token was signed with,
+    # that is the only one that needs to be tried. Otherwise (for example
+    # for keys whose createdAt is not known) all the keys are tried.
+    if signing_key is not None:
+        return [signing_key]
+    return handshake_info.get_jwt_signing_public_key_list()
 
-    for key in handshake_info.get_jwt_signing_public_key_list():
+
+def verify_access_token_signature(
+    parsed_access_token: ParsedJWTInfo,
+    keys_to_try: List[Dict[str, Any]],
+    do_anti_csrf_check_in_token: bool,
+) -> Tuple[Union[Dict[str, Any], None], bool]:
+    """
+    Returns the info of the access token (None if it could not be verified
+    with the given keys) and whether a signing key that is older than the
+    access token was found.
+    """
+    for key in keys_to_try:
         try:
             access_token_info = get_info_from_access_token(
                 parsed_access_token,
                 key["publicKey"],
-                handshake_info.anti_csrf == "VIA_TOKEN" and do_anti_csrf_check,
+                do_anti_csrf_check_in_token,
             )
-
-            found_a_sign_key_that_is_older_than_the_access_token = True
+            return access_token_info, True
 
         except Exception as e:
             if not isinstance(e, TryRefreshTokenError):
@@ -111,8 +143,102 @@ async def get_session(
                 raise e
 
             if payload["timeCreated"] >= key["createdAt"]:
-                found_a_sign_key_that_is_older_than_the_access_token = True
-                break
+                return None, True
+
+    return None, False
+
+
+def verify_access_token_signatures(
+    items: List[Tuple[ParsedJWTInfo, List[Dict[str, Any]], bool]]
+) -> List[Union[Tuple[Union[Dict[str, Any], None], bool], Exception]]:
+    # Runs verify_access_token_signature for a chunk of a batch, in an executor
+    results: List[Union[Tuple[Union[Dict[str, Any], None], bool], Exception]] = []
+    for parsed_access_token, keys_to_try, do_anti_csrf_check_in_token in items:
+        try:
+            results.append(
+                verify_access_token_signature(
+                    parsed_access_token, keys_to_try, do_anti_csrf_check_in_token
+                )
+            )
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def get_cached_access_token_info(
+    recipe_implementation: RecipeImplementation,
+    parsed_access_token: ParsedJWTInfo,
+    do_anti_csrf_check_in_token: bool,
+) -> Union[Dict[str, Any], None]:
+    verified_access_token_cache = recipe_implementation.verified_access_token_cache
+    if verified_access_token_cache is None:
+        return None
+    cached_access_token_info = verified_access_token_cache.get(
+        parsed_access_token.raw_token_string
+    )
+    if cached_access_token_info is None or (
+        do_anti_csrf_check_in_token
+        and cached_access_token_info["antiCsrfToken"] is None
+    ):
+        return None
+    # The payload was parsed from the same token string, so it can be used
+    # instead of the cached (and shared) user data.
+    return {
+        **cached_access_token_info,
+        "userData": parsed_access_token.payload.get("userData"),
+    }
+
+
+def cache_access_token_info(
+    recipe_implementation: RecipeImplementation,
+    parsed_access_token: ParsedJWTInfo,
+    access_token_info: Dict[str, Any],
+):
+    verified_access_token_cache = recipe_implementation.verified_access_token_cache
+    if verified_access_token_cache is not None:
+        verified_access_token_cache.set(
+            parsed_access_token.raw_token_string,
+            {**access_token_info, "userData": None},
+        )
+
+
+async def get_session(
+    recipe_implementation: RecipeImplementation,
+    parsed_access_token: ParsedJWTInfo,
+    anti_csrf_token: Union[str, None],
+    do_anti_csrf_check: bool,
+    contains_custom_header: bool,
+    signature_verification_result: Union[
+        Tuple[Union[Dict[str, Any], None], bool], None
+    ] = None,
+) -> Dict[str, Any]:
+    handshake_info = await recipe_implementation.get_handshake_info()
+    do_anti_csrf_check_in_token = (
+        handshake_info.anti_csrf == "VIA_TOKEN" and do_anti_csrf_check
+    )
+
+    if signature_verification_result is None:
+        # Not already verified as part of a batch
+        access_token_info = get_cached_access_token_info(
+            recipe_implementation, parsed_access_token, do_anti_csrf_check_in_token
+        )
+        signature_verification_result = (access_token_info, True)
+        if access_token_info is None:
+            signature_verification_result = verify_access_token_signature(
+                parsed_access_token,
+                get_signing_keys_to_try(handshake_info, parsed_access_token),
+                do_anti_csrf_check_in_token,
+            )
+            if signature_verification_result[0] is not None:
+                cache_access_token_info(
+                    recipe_implementation,
+                    parsed_access_token,
+                    signature_verification_result[0],
+                )
+    (
+        access_token_info,
+        found_a_sign_key_that_is_older_than_the_access_token,
+    ) = signature_verification_result
 
     if not found_a_sign_key_that_is_older_than_the_access_token:
         log_debug_message(
@@ -151,10 +277,19 @@ async def get_session(
                 "for this API"
             )
 
+    revocation_filter = recipe_implementation.revocation_filter
     if (
         access_token_info is not None
-        and not handshake_info.access_token_blacklisting_enabled
         and access_token_info["parentRefreshTokenHash1"] is None
+        and (
+            not handshake_info.access_token_blacklisting_enabled
+            or (
+                revocation_filter is not None
+                and revocation_filter.is_recently_verified(
+                    access_token_info["sessionHandle"]
+                )
+            )
+        )
     ):
         return {
             "session": {
@@ -185,12 +320,16 @@ async def get_session(
             response["jwtSigningPublicKey"],
             response["jwtSigningPublicKeyExpiryTime"],
         )
+        if revocation_filter is not None:
+            revocation_filter.set_verified(response["session"]["handle"])
         response.pop("status", None)
         response.pop("jwtSigningPublicKey", None)
         response.pop("jwtSigningPublicKeyExpiryTime", None)
         response.pop("jwtSigningPublicKeyList", None)
         return response
     if response["status"] == "UNAUTHORISED":
+        if revocation_filter is not None and access_token_info is not None:
+            revocation_filter.set_revoked([access_token_info["sessionHandle"]])
         log_debug_message("getSession: Returning UNAUTHORISED because of core response")
         raise_unauthorised_exception(response["message"])
     if (
@@ -212,6 +351,86 @@ async def get_session(
     raise_try_refresh_token_exception(response["message"])
 
 
+async def get_sessions_batch(
+    recipe_implementation: RecipeImplementation,
+    parsed_access_tokens: List[ParsedJWTInfo],
+    executor: Union[Executor, None],
+) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Same as get_session for each access token (without anti-csrf checks, like
+    for tokens sent in headers), with the signature verifications split in
+    chunks that run in parallel in executor (the default executor of the event
+    loop if None). Exceptions are returned in place of results.
+    """
+    handshake_info = await recipe_implementation.get_handshake_info()
+
+    signature_verification_results: List[
+        Union[Tuple[Union[Dict[str, Any], None], bool], Exception]
+    ] = []
+    indexes_to_verify: List[int] = []
+    for index, parsed_access_token in enumerate(parsed_access_tokens):
+        access_token_info = get_cached_access_token_info(
+            recipe_implementation, parsed_access_token, False
+        )
+        signature_verification_results.append((access_token_info, True))
+        if access_token_info is None:
+            indexes_to_verify.append(index)
+
+    if len(indexes_to_verify) != 0:
+        chunk_count = min(len(indexes_to_verify), os.cpu_count() or 1)
+        chunks = [indexes_to_verify[i::chunk_count] for i in range(chunk_count)]
+        loop = asyncio.get_event_loop()
+        chunk_results = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    executor,
+                    verify_access_token_signatures,
+                    [
+                        (
+                            parsed_access_tokens[index],
+                            get_signing_keys_to_try(
+                                handshake_info, parsed_access_tokens[index]
+                            ),
+                            False,
+                        )
+                        for index in chunk
+                    ],
+                )
+                for chunk in chunks
+            ]
+        )
+        for chunk, results in zip(chunks, chunk_results):
+            for index, result in zip(chunk, results):
+                signature_verification_results[index] = result
+                if not isinstance(result, Exception) and result[0] is not None:
+                    cache_access_token_info(
+                        recipe_implementation, parsed_access_tokens[index], result[0]
+                    )
+
+    def get_session_func(index: int) -> Callable[[], Awaitable[Dict[str, Any]]]:
+        async def func() -> Dict[str, Any]:
+            result = signature_verification_results[index]
+            if isinstance(result, Exception):
+                raise result
+            return await get_session(
+                recipe_implementation,
+                parsed_access_tokens[index],
+                None,
+                False,
+                False,
+                result,
+            )
+
+        return func
+
+    # Only tokens that need to be verified by the core (for example if access
+    # token blacklisting is enabled) make requests here
+    return await run_with_limited_concurrency(
+        [get_session_func(index) for index in range(len(parsed_access_tokens))],
+        BATCH_CORE_VERIFY_MAX_CONCURRENCY,
+    )
+
+
 async def refresh_session(
     recipe_implementation: RecipeImplementation,
     refresh_token: str,
@@ -263,6 +482,10 @@ async def revoke_all_sessions_for_user(
     response = await recipe_implementation.querier.send_post_request(
         NormalisedURLPath("/recipe/session/remove"), {"userId": user_id}
     )
+    if recipe_implementation.revocation_filter is not None:
+        recipe_implementation.revocation_filter.set_revoked(
+            response["sessionHandlesRevoked"]
+        )
     return response["sessionHandlesRevoked"]
 
 
@@ -282,6 +505,8 @@ async def revoke_session(
         NormalisedURLPath("/recipe/session/remove"),
         {"sessionHandles": [session_handle]},
     )
+    if recipe_implementation.revocation_filter is not None:
+        recipe_implementation.revocation_filter.set_revoked([session_handle])
     return len(response["sessionHandlesRevoked"]) == 1
 
 
@@ -291,6 +516,8 @@ async def revoke_multiple_sessions(
     response = await recipe_implementation.querier.send_post_request(
         NormalisedURLPath("/recipe/session/remove"), {"sessionHandles": session_handles}
     )
+    if recipe_implementation.revocation_filter is not None:
+        recipe_implementation.revocation_filter.set_revoked(session_handles)
     return response["sessionHandlesRevoked"]
 
 
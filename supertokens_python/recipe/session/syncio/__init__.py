@@ -12,6 +12,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from concurrent.futures import Executor
 from typing import Any, Dict, List, Union, Callable, Optional, TypeVar
 
 from supertokens_python.async_to_sync_wrapper import sync
@@ -25,6 +26,7 @@ from ...jwt.interfaces import (
     CreateJwtResultUnsupportedAlgorithm,
     GetJWKSResult,
 )
+from ..exceptions import SuperTokensSessionError
 from ..interfaces import (
     RegenerateAccessTokenOkResult,
     SessionContainer,
@@ -87,6 +89,28 @@ def get_session(
     )
 
 
+def verify_access_tokens_batch(
+    access_tokens: List[str],
+    executor: Union[Executor, None] = None,
+    override_global_claim_validators: Optional[
+        Callable[
+            [List[SessionClaimValidator], SessionContainer, Dict[str, Any]],
+            MaybeAwaitable[List[SessionClaimValidator]],
+        ]
+    ] = None,
+    user_context: Union[None, Dict[str, Any]] = None,
+) -> List[Union[SessionContainer, SuperTokensSessionError]]:
+    from supertokens_python.recipe.session.asyncio import (
+        verify_access_tokens_batch as async_verify_access_tokens_batch,
+    )
+
+    return sync(
+        async_verify_access_tokens_batch(
+            access_tokens, executor, override_global_claim_validators, user_context
+        )
+    )
+
+
 def refresh_session(
     request: Any, user_context: Union[None, Dict[str, Any]] = None
 ) -> SessionContainer:
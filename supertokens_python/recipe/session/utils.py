@@ -13,7 +13,6 @@
 # under the License.
 from __future__ import annotations
 
-import json
 from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Union
 from urllib.parse import urlparse
 
@@ -53,7 +52,8 @@ if TYPE_CHECKING:
     )
     from .recipe import SessionRecipe
 
-from supertokens_python.logger import log_debug_message
+from supertokens_python.json_codec import json_dumps
+from supertokens_python.logger import LazyLogArg, log_debug_message
 
 HUNDRED_YEARS_IN_MS = 3153600000000
 
@@ -363,6 +363,12 @@ class SessionConfig:
         mode: str,
         jwt: JWTConfig,
         invalid_claim_status_code: int,
+        verified_access_token_cache_size: Union[int, None],
+        refresh_signing_keys_before_expiry_in_ms: Union[int, None],
+        revocation_filter_max_staleness_in_ms: Union[int, None],
+        handshake_snapshot_path: Union[str, None],
+        refresh_session_coalescing_window_in_ms: Union[int, None],
+        claim_value_cache_size: Union[int, None],
     ):
         self.session_expired_status_code = session_expired_status_code
         self.invalid_claim_status_code = invalid_claim_status_code
@@ -378,6 +384,18 @@ class SessionConfig:
         self.framework = framework
         self.mode = mode
         self.jwt = jwt
+        self.verified_access_token_cache_size = verified_access_token_cache_size
+        self.refresh_signing_keys_before_expiry_in_ms = (
+            refresh_signing_keys_before_expiry_in_ms
+        )
+        self.revocation_filter_max_staleness_in_ms = (
+            revocation_filter_max_staleness_in_ms
+        )
+        self.handshake_snapshot_path = handshake_snapshot_path
+        self.refresh_session_coalescing_window_in_ms = (
+            refresh_session_coalescing_window_in_ms
+        )
+        self.claim_value_cache_size = claim_value_cache_size
 
 
 def validate_and_normalise_user_input(
@@ -398,6 +416,12 @@ def validate_and_normalise_user_input(
     override: Union[InputOverrideConfig, None] = None,
     jwt: Union[JWTConfig, None] = None,
     invalid_claim_status_code: Union[int, None] = None,
+    verified_access_token_cache_size: Union[int, None] = None,
+    refresh_signing_keys_before_expiry_in_ms: Union[int, None] = None,
+    revocation_filter_max_staleness_in_ms: Union[int, None] = None,
+    handshake_snapshot_path: Union[str, None] = None,
+    refresh_session_coalescing_window_in_ms: Union[int, None] = None,
+    claim_value_cache_size: Union[int, None] = None,
 ):
     if anti_csrf not in {"VIA_TOKEN", "VIA_CUSTOM_HEADER", "NONE", None}:
         raise ValueError(
@@ -413,6 +437,35 @@ def validate_and_normalise_user_input(
     if jwt is not None and not isinstance(jwt, JWTConfig):  # type: ignore
         raise ValueError("jwt must be an instance of JWTConfig or None")
 
+    if verified_access_token_cache_size is not None and (
+        verified_access_token_cache_size < 1
+    ):
+        raise ValueError("verified_access_token_cache_size must be at least 1 or None")
+
+    if refresh_signing_keys_before_expiry_in_ms is not None and (
+        refresh_signing_keys_before_expiry_in_ms < 0
+    ):
+        raise ValueError(
+            "refresh_signing_keys_before_expiry_in_ms must be at least 0 or None"
+        )
+
+    if revocation_filter_max_staleness_in_ms is not None and (
+        revocation_filter_max_staleness_in_ms < 1
+    ):
+        raise ValueError(
+            "revocation_filter_max_staleness_in_ms must be at least 1 or None"
+        )
+
+    if refresh_session_coalescing_window_in_ms is not None and (
+        refresh_session_coalescing_window_in_ms < 0
+    ):
+        raise ValueError(
+            "refresh_session_coalescing_window_in_ms must be at least 0 or None"
+        )
+
+    if claim_value_cache_size is not None and claim_value_cache_size < 1:
+        raise ValueError("claim_value_cache_size must be at least 1 or None")
+
     cookie_domain = (
         normalise_session_scope(cookie_domain) if cookie_domain is not None else None
     )
@@ -481,6 +534,12 @@ def validate_and_normalise_user_input(
         app_info.mode,
         jwt,
         invalid_claim_status_code,
+        verified_access_token_cache_size,
+        refresh_signing_keys_before_expiry_in_ms,
+        revocation_filter_max_staleness_in_ms,
+        handshake_snapshot_path,
+        refresh_session_coalescing_window_in_ms,
+        claim_value_cache_size,
     )
 
 
@@ -530,7 +589,11 @@ async def validate_claims_in_payload(
         log_debug_message(
             "validate_claims_in_payload %s validate res %s",
             validator.id,
-            json.dumps(claim_validation_res.__dict__),
+            LazyLogArg(
+                lambda claim_validation_res=claim_validation_res: json_dumps(
+                    claim_validation_res.__dict__
+                )
+            ),
         )
         if not claim_validation_res.is_valid:
             validation_errors.append(
@@ -13,17 +13,20 @@
 # under the License.
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict, Union, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Union, Optional
 
 from jwt import decode
 
 from supertokens_python.utils import get_timestamp_ms
 
+from ..exceptions import SuperTokensSessionError
 from .constants import ACCESS_TOKEN_PAYLOAD_JWT_PROPERTY_NAME_KEY
 from .session_class import get_session_with_jwt
 from .utills import add_jwt_to_access_token_payload
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
     from supertokens_python.recipe.session.utils import SessionConfig
     from supertokens_python.recipe.session.interfaces import (
         RecipeInterface,
@@ -101,6 +104,23 @@ def get_recipe_implementation_with_jwt(
             return None
         return get_session_with_jwt(session_container, openid_recipe_implementation)
 
+    og_verify_access_tokens_batch = original_implementation.verify_access_tokens_batch
+
+    async def verify_access_tokens_batch(
+        access_tokens: List[str],
+        executor: Union[Executor, None],
+        user_context: Dict[str, Any],
+    ) -> List[Union[SessionContainer, SuperTokensSessionError]]:
+        results = await og_verify_access_tokens_batch(
+            access_tokens, executor, user_context
+        )
+        return [
+            result
+            if isinstance(result, SuperTokensSessionError)
+            else get_session_with_jwt(result, openid_recipe_implementation)
+            for result in results
+        ]
+
     og_refresh_session = original_implementation.refresh_session
 
     async def refresh_session(
@@ -226,6 +246,7 @@ def get_recipe_implementation_with_jwt(
 
     original_implementation.create_new_session = create_new_session
     original_implementation.get_session = get_session
+    original_implementation.verify_access_tokens_batch = verify_access_tokens_batch
     original_implementation.refresh_session = refresh_session
     original_implementation.update_access_token_payload = update_access_token_payload
     original_implementation.merge_into_access_token_payload = (
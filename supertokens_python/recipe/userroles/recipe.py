@@ -27,10 +27,13 @@ from supertokens_python.recipe.userroles.recipe_implementation import (
 from supertokens_python.recipe.userroles.utils import validate_and_normalise_user_input
 from supertokens_python.recipe_module import APIHandled, RecipeModule
 from supertokens_python.supertokens import AppInfo
+from supertokens_python.utils import run_with_limited_concurrency
 
 from ...post_init_callbacks import PostSTInitCallbacks
 from ..session import SessionRecipe
 from ..session.claim_base_classes.primitive_array_claim import PrimitiveArrayClaim
+from ..session.claim_value_cache import with_claim_value_cache
+from .constants import PERMISSION_CLAIM_KEY, USER_ROLE_CLAIM_KEY
 from .exceptions import SuperTokensUserRolesError
 from .interfaces import GetPermissionsForRoleOkResult
 from .utils import InputOverrideConfig
@@ -139,9 +142,12 @@ class UserRolesRecipe(RecipeModule):
         )
 
 
+PERMISSIONS_FETCH_MAX_CONCURRENCY = 10
+
+
 class PermissionClaimClass(PrimitiveArrayClaim[List[str]]):
     def __init__(self) -> None:
-        key = "st-perm"
+        key = PERMISSION_CLAIM_KEY
         default_max_age_in_sec = 300
 
         async def fetch_value(user_id: str, user_context: Dict[str, Any]) -> List[str]:
@@ -153,20 +159,30 @@ class PermissionClaimClass(PrimitiveArrayClaim[List[str]]):
 
             user_permissions: Set[str] = set()
 
-            for role in user_roles.roles:
-                role_permissions = (
-                    await recipe.recipe_implementation.get_permissions_for_role(
+            results = await run_with_limited_concurrency(
+                [
+                    lambda role=role: recipe.recipe_implementation.get_permissions_for_role(
                         role, user_context
                     )
-                )
+                    for role in user_roles.roles
+                ],
+                PERMISSIONS_FETCH_MAX_CONCURRENCY,
+            )
 
+            for role_permissions in results:
+                if isinstance(role_permissions, Exception):
+                    raise role_permissions
                 if isinstance(role_permissions, GetPermissionsForRoleOkResult):
                     for permission in role_permissions.permissions:
                         user_permissions.add(permission)
 
             return list(user_permissions)
 
-        super().__init__(key, fetch_value, default_max_age_in_sec)
+        super().__init__(
+            key,
+            with_claim_value_cache(key, fetch_value, default_max_age_in_sec),
+            default_max_age_in_sec,
+        )
 
 
 PermissionClaim = PermissionClaimClass()
@@ -174,7 +190,7 @@ PermissionClaim = PermissionClaimClass()
 
 class UserRoleClaimClass(PrimitiveArrayClaim[List[str]]):
     def __init__(self) -> None:
-        key = "st-role"
+        key = USER_ROLE_CLAIM_KEY
         default_max_age_in_sec = 300
 
         async def fetch_value(user_id: str, user_context: Dict[str, Any]) -> List[str]:
@@ -184,7 +200,11 @@ class UserRoleClaimClass(PrimitiveArrayClaim[List[str]]):
             )
             return res.roles
 
-        super().__init__(key, fetch_value, default_max_age_in_sec)
+        super().__init__(
+            key,
+            with_claim_value_cache(key, fetch_value, default_max_age_in_sec),
+            default_max_age_in_sec,
+        )
 
 
 UserRoleClaim = UserRoleClaimClass()
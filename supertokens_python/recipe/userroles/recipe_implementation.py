@@ -17,7 +17,11 @@ from typing import Any, Dict, List, Union
 
 from supertokens_python.normalised_url_path import NormalisedURLPath
 from supertokens_python.querier import Querier
+from supertokens_python.recipe.session.claim_value_cache import (
+    invalidate_claim_values,
+)
 
+from .constants import PERMISSION_CLAIM_KEY, USER_ROLE_CLAIM_KEY
 from .interfaces import (
     AddRoleToUserOkResult,
     CreateNewRoleOrAddPermissionsOkResult,
@@ -46,6 +50,7 @@ class RecipeImplementation(RecipeInterface):
         response = await self.querier.send_put_request(
             NormalisedURLPath("/recipe/user/role"), params
         )
+        invalidate_claim_values([USER_ROLE_CLAIM_KEY, PERMISSION_CLAIM_KEY], user_id)
         if response.get("status") == "OK":
             return AddRoleToUserOkResult(
                 did_user_already_have_role=response["didUserAlreadyHaveRole"]
@@ -59,6 +64,7 @@ class RecipeImplementation(RecipeInterface):
         response = await self.querier.send_post_request(
             NormalisedURLPath("/recipe/user/role/remove"), params
         )
+        invalidate_claim_values([USER_ROLE_CLAIM_KEY, PERMISSION_CLAIM_KEY], user_id)
         if response["status"] == "OK":
             return RemoveUserRoleOkResult(
                 did_user_have_role=response["didUserHaveRole"]
@@ -92,6 +98,7 @@ class RecipeImplementation(RecipeInterface):
         response = await self.querier.send_put_request(
             NormalisedURLPath("/recipe/role"), params
         )
+        invalidate_claim_values([PERMISSION_CLAIM_KEY])
         return CreateNewRoleOrAddPermissionsOkResult(
             created_new_role=response["createdNewRole"]
         )
@@ -114,6 +121,7 @@ class RecipeImplementation(RecipeInterface):
         response = await self.querier.send_post_request(
             NormalisedURLPath("/recipe/role/permissions/remove"), params
         )
+        invalidate_claim_values([PERMISSION_CLAIM_KEY])
         if response.get("status") == "OK":
             return RemovePermissionsFromRoleOkResult()
         return UnknownRoleError()
@@ -134,6 +142,7 @@ class RecipeImplementation(RecipeInterface):
         response = await self.querier.send_post_request(
             NormalisedURLPath("/recipe/role/remove"), params
         )
+        invalidate_claim_values([USER_ROLE_CLAIM_KEY, PERMISSION_CLAIM_KEY])
         return DeleteRoleOkResult(did_role_exist=response["didRoleExist"])
 
     async def get_all_roles(self, user_context: Dict[str, Any]) -> GetAllRolesOkResult:
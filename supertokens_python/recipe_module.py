@@ -15,7 +15,7 @@
 from __future__ import annotations
 
 import abc
-from typing import TYPE_CHECKING, List, Union
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union
 
 from typing_extensions import Literal
 
@@ -33,6 +33,7 @@ class RecipeModule(abc.ABC):
     def __init__(self, recipe_id: str, app_info: AppInfo):
         self.recipe_id = recipe_id
         self.app_info = app_info
+        self.__api_routes: Union[Dict[Tuple[str, str], str], None] = None
 
     def get_recipe_id(self):
         return self.recipe_id
@@ -40,20 +41,31 @@ class RecipeModule(abc.ABC):
     def get_app_info(self):
         return self.app_info
 
+    def get_api_routes(self) -> Dict[Tuple[str, str], str]:
+        """
+        Returns the request IDs of the enabled APIs of this recipe by (method,
+        normalised path including the api base path). It's built on first use,
+        since the APIs (and whether they are disabled) don't change after init.
+        """
+        if self.__api_routes is None:
+            api_routes: Dict[Tuple[str, str], str] = {}
+            for current_api in self.get_apis_handled():
+                if current_api.disabled:
+                    continue
+                path = self.app_info.api_base_path.append(
+                    current_api.path_without_api_base_path
+                ).get_as_string_dangerous()
+                # The first API with a method and path handles it
+                api_routes.setdefault(
+                    (current_api.method, path), current_api.request_id
+                )
+            self.__api_routes = api_routes
+        return self.__api_routes
+
     def return_api_id_if_can_handle_request(
         self, path: NormalisedURLPath, method: str
     ) -> Union[str, None]:
-        apis_handled = self.get_apis_handled()
-        for current_api in apis_handled:
-            if (
-                not current_api.disabled
-                and current_api.method == method
-                and self.app_info.api_base_path.append(
-                    current_api.path_without_api_base_path
-                ).equals(path)
-            ):
-                return current_api.request_id
-        return None
+        return self.get_api_routes().get((method, path.get_as_string_dangerous()))
 
     @abc.abstractmethod
     def is_error_from_this_recipe_based_on_instance(self, err: Exception) -> bool:
@@ -0,0 +1,90 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+from collections import deque
+from math import ceil
+from threading import Lock
+from typing import Deque, Dict, List, Set, Tuple, Union
+
+# (method, path) of read only core APIs. Sending these to two cores at once
+# has no side effects.
+DEFAULT_HEDGED_REQUESTS: List[Tuple[str, str]] = [
+    ("post", "/recipe/session/verify"),
+    ("post", "/recipe/handshake"),
+    ("get", "/recipe/user"),
+]
+
+
+class HedgingStats:
+    def __init__(self):
+        self.hedges_issued = 0
+        self.hedges_won = 0
+
+
+class HedgingConfig:
+    """
+    When a hedged request hasn't been answered by the first core within
+    `delay_percentile` of the recently observed latencies of that path, the same
+    request is sent to the next core. The first response wins and the other
+    request is cancelled. Until `min_samples` latencies have been observed for a
+    path, `initial_delay_ms` is used as the delay.
+    """
+
+    def __init__(
+        self,
+        requests: Union[List[Tuple[str, str]], None] = None,
+        delay_percentile: float = 95,
+        initial_delay_ms: int = 50,
+        min_delay_ms: int = 5,
+        window_size: int = 100,
+        min_samples: int = 20,
+    ):
+        if not 0 < delay_percentile <= 100:
+            raise ValueError("delay_percentile must be in the range (0, 100]")
+        if window_size < min_samples:
+            raise ValueError("window_size must be at least min_samples")
+        self.requests: Set[Tuple[str, str]] = {
+            (method.lower(), path)
+            for method, path in (
+                requests if requests is not None else DEFAULT_HEDGED_REQUESTS
+            )
+        }
+        self.delay_percentile = delay_percentile
+        self.initial_delay_ms = initial_delay_ms
+        self.min_delay_ms = min_delay_ms
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.stats = HedgingStats()
+        self.__latencies_ms: Dict[str, Deque[float]] = {}
+        self.__lock = Lock()
+
+    def should_hedge(self, method: str, path: str) -> bool:
+        return (method.lower(), path) in self.requests
+
+    def add_latency_sample(self, path: str, latency_ms: float) -> None:
+        with self.__lock:
+            latencies = self.__latencies_ms.get(path)
+            if latencies is None:
+                latencies = self.__latencies_ms[path] = deque(maxlen=self.window_size)
+            latencies.append(latency_ms)
+
+    def get_delay_ms(self, path: str) -> float:
+        with self.__lock:
+            latencies = self.__latencies_ms.get(path)
+            if latencies is None or len(latencies) < self.min_samples:
+                return self.initial_delay_ms
+            sorted_latencies = sorted(latencies)
+        index = ceil(len(sorted_latencies) * self.delay_percentile / 100) - 1
+        return max(self.min_delay_ms, sorted_latencies[max(index, 0)])
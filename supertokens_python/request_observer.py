@@ -0,0 +1,204 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Dict, List, Tuple, Union
+
+# Upper bounds (in ms) of the latency histogram buckets
+DEFAULT_LATENCY_BUCKETS_IN_MS: List[float] = [
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+]
+
+
+class CoreRequestEvent:
+    """
+    One attempt of a request to one core. `status_code` and
+    `response_size_in_bytes` are None if no response was received (the core
+    could not be reached or the attempt timed out).
+    """
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        host: str,
+        status_code: Union[int, None],
+        duration_ms: float,
+        attempt: int,
+        response_size_in_bytes: Union[int, None],
+    ):
+        self.method = method
+        self.path = path
+        self.host = host
+        self.status_code = status_code
+        self.duration_ms = duration_ms
+        self.attempt = attempt
+        self.response_size_in_bytes = response_size_in_bytes
+
+
+class CoreRequestObserver:
+    """
+    Receives instrumentation events from the querier. `on_request` is called
+    for every attempt sent to a core. `on_span_start` is called when the SDK
+    starts a call to the core and whatever it returns is passed back to
+    `on_span_end` when the call is done (after all retries / failovers), which
+    is what a tracing (for example OpenTelemetry) adapter needs.
+
+    Observers are called inline on the request path, so they should be cheap.
+    Errors they raise are logged (at debug level) and don't fail the request.
+    """
+
+    def on_request(self, event: CoreRequestEvent) -> None:
+        pass
+
+    def on_span_start(  # pylint: disable=unused-argument
+        self, method: str, path: str
+    ) -> Any:
+        return None
+
+    def on_span_end(
+        self,
+        span: Any,
+        status_code: Union[int, None],
+        error: Union[Exception, None],
+    ) -> None:
+        pass
+
+
+class LatencyHistogram:
+    def __init__(self, buckets_in_ms: List[float]):
+        self.bucket_counts = [0 for _ in buckets_in_ms]
+        self.count = 0
+        self.sum_ms = 0.0
+        self.response_size_in_bytes = 0
+
+
+class LatencyHistogramRegistry(CoreRequestObserver):
+    """
+    Keeps a latency histogram per (method, path, status) of core requests, which
+    can be exported in the Prometheus text format using `to_prometheus_text`.
+    """
+
+    def __init__(self, buckets_in_ms: Union[List[float], None] = None):
+        self.buckets_in_ms = sorted(
+            buckets_in_ms
+            if buckets_in_ms is not None
+            else DEFAULT_LATENCY_BUCKETS_IN_MS
+        )
+        self.__histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self.__lock = Lock()
+
+    def on_request(self, event: CoreRequestEvent) -> None:
+        key = (
+            event.method,
+            event.path,
+            "error" if event.status_code is None else str(event.status_code),
+        )
+        bucket_index = bisect_left(self.buckets_in_ms, event.duration_ms)
+        with self.__lock:
+            histogram = self.__histograms.get(key)
+            if histogram is None:
+                histogram = self.__histograms[key] = LatencyHistogram(
+                    self.buckets_in_ms
+                )
+            if bucket_index < len(histogram.bucket_counts):
+                histogram.bucket_counts[bucket_index] += 1
+            histogram.count += 1
+            histogram.sum_ms += event.duration_ms
+            if event.response_size_in_bytes is not None:
+                histogram.response_size_in_bytes += event.response_size_in_bytes
+
+    def get_histogram(
+        self, method: str, path: str, status: str
+    ) -> Union[LatencyHistogram, None]:
+        return self.__histograms.get((method, path, status))
+
+    def to_prometheus_text(self) -> str:
+        duration_metric = "supertokens_core_request_duration_seconds"
+        size_metric = "supertokens_core_response_size_bytes_total"
+        lines = [
+            "# HELP "
+            + duration_metric
+            + " Duration of requests to the SuperTokens core.",
+            "# TYPE " + duration_metric + " histogram",
+        ]
+        size_lines = [
+            "# HELP " + size_metric + " Bytes received from the SuperTokens core.",
+            "# TYPE " + size_metric + " counter",
+        ]
+        with self.__lock:
+            for (method, path, status), histogram in sorted(self.__histograms.items()):
+                labels = (
+                    'method="'
+                    + _escape_label_value(method)
+                    + '",path="'
+                    + _escape_label_value(path)
+                    + '",status="'
+                    + _escape_label_value(status)
+                    + '"'
+                )
+                cumulative_count = 0
+                for bucket_in_ms, bucket_count in zip(
+                    self.buckets_in_ms, histogram.bucket_counts
+                ):
+                    cumulative_count += bucket_count
+                    lines.append(
+                        '%s_bucket{%s,le="%s"} %d'
+                        % (
+                            duration_metric,
+                            labels,
+                            _format_float(bucket_in_ms / 1000),
+                            cumulative_count,
+                        )
+                    )
+                lines.append(
+                    '%s_bucket{%s,le="+Inf"} %d'
+                    % (duration_metric, labels, histogram.count)
+                )
+                lines.append(
+                    "%s_sum{%s} %s"
+                    % (duration_metric, labels, _format_float(histogram.sum_ms / 1000))
+                )
+                lines.append(
+                    "%s_count{%s} %d" % (duration_metric, labels, histogram.count)
+                )
+                size_lines.append(
+                    "%s{%s} %d"
+                    % (size_metric, labels, histogram.response_size_in_bytes)
+                )
+        return "\n".join(lines + size_lines) + "\n"
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__histograms = {}
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
@@ -0,0 +1,192 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import abc
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Set, Tuple, Union
+
+from .utils import get_timestamp_ms
+
+DEFAULT_RESPONSE_CACHE_MAX_SIZE = 1000
+
+# Lookups that are safe to serve from the cache for a short while by default.
+DEFAULT_TTL_PER_PATH_IN_MS: Dict[str, int] = {
+    "/recipe/user": 5000,
+    "/recipe/user/metadata": 5000,
+    "/recipe/user/roles": 5000,
+    "/recipe/role/permissions": 5000,
+    "/recipe/userid/map": 5000,
+}
+
+_ALL_PATHS = "*"
+_USER_PATHS = ["/recipe/user", "/recipe/users/by-email"]
+_ROLE_PATHS = [
+    "/recipe/role/permissions",
+    "/recipe/permission/roles",
+    "/recipe/roles",
+    "/recipe/role/users",
+    "/recipe/user/roles",
+]
+
+# Maps the path of a write (POST / PUT / DELETE) sent by the SDK to the cached
+# GET paths whose responses it can change.
+INVALIDATED_PATHS_BY_WRITE_PATH: Dict[str, List[str]] = {
+    "/recipe/user": _USER_PATHS,
+    "/recipe/signup": _USER_PATHS,
+    "/recipe/signinup": _USER_PATHS,
+    "/recipe/signinup/code/consume": _USER_PATHS,
+    "/recipe/user/metadata": ["/recipe/user/metadata"],
+    "/recipe/user/metadata/remove": ["/recipe/user/metadata"],
+    "/recipe/user/role": ["/recipe/user/roles", "/recipe/role/users"],
+    "/recipe/user/role/remove": ["/recipe/user/roles", "/recipe/role/users"],
+    "/recipe/role": _ROLE_PATHS,
+    "/recipe/role/permissions/remove": _ROLE_PATHS,
+    "/recipe/role/remove": _ROLE_PATHS,
+    "/recipe/userid/map": [_ALL_PATHS],
+    "/recipe/userid/map/remove": [_ALL_PATHS],
+    "/recipe/userid/external-user-id-info": ["/recipe/userid/map"],
+    "/user/remove": [_ALL_PATHS],
+}
+
+
+class ResponseCache(abc.ABC):
+    """
+    Storage used by the querier to cache responses of idempotent core lookups.
+    `key` identifies a request (path, params and rid), `user_id` is the value of
+    the `userId` param of the request, if any, so that writes for one user only
+    evict that user's entries.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Union[Any, None]:
+        pass
+
+    @abc.abstractmethod
+    def set(
+        self,
+        key: str,
+        path: str,
+        user_id: Union[str, None],
+        value: Any,
+        ttl_in_ms: int,
+    ) -> None:
+        pass
+
+    @abc.abstractmethod
+    def invalidate(self, path: str, user_id: Union[str, None]) -> None:
+        pass
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class InMemoryLRUResponseCache(ResponseCache):
+    def __init__(self, max_size: int = DEFAULT_RESPONSE_CACHE_MAX_SIZE):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        # key -> (path, user_id, expiry time, value)
+        self.__entries: OrderedDict[
+            str, Tuple[str, Union[str, None], int, Any]
+        ] = OrderedDict()
+        self.__keys_by_path: Dict[str, Set[str]] = {}
+        self.__lock = Lock()
+
+    def __remove(self, key: str):
+        path = self.__entries.pop(key)[0]
+        keys = self.__keys_by_path[path]
+        keys.discard(key)
+        if len(keys) == 0:
+            del self.__keys_by_path[path]
+
+    def get(self, key: str) -> Union[Any, None]:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= get_timestamp_ms():
+                self.__remove(key)
+                return None
+            self.__entries.move_to_end(key)
+            return entry[3]
+
+    def set(
+        self,
+        key: str,
+        path: str,
+        user_id: Union[str, None],
+        value: Any,
+        ttl_in_ms: int,
+    ) -> None:
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+            self.__entries[key] = (path, user_id, get_timestamp_ms() + ttl_in_ms, value)
+            self.__keys_by_path.setdefault(path, set()).add(key)
+            while len(self.__entries) > self.max_size:
+                self.__remove(next(iter(self.__entries)))
+
+    def invalidate(self, path: str, user_id: Union[str, None]) -> None:
+        with self.__lock:
+            for key in list(self.__keys_by_path.get(path, ())):
+                entry_user_id = self.__entries[key][1]
+                if user_id is None or entry_user_id is None or entry_user_id == user_id:
+                    self.__remove(key)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__keys_by_path.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
+class ResponseCacheConfig:
+    def __init__(
+        self,
+        ttl_per_path_in_ms: Union[Dict[str, int], None] = None,
+        max_size: Union[int, None] = None,
+        cache: Union[ResponseCache, None] = None,
+    ):
+        if cache is not None and max_size is not None:
+            raise ValueError("max_size cannot be used together with a custom cache")
+        self.ttl_per_path_in_ms = (
+            ttl_per_path_in_ms
+            if ttl_per_path_in_ms is not None
+            else DEFAULT_TTL_PER_PATH_IN_MS
+        )
+        self.cache = (
+            cache
+            if cache is not None
+            else InMemoryLRUResponseCache(
+                max_size if max_size is not None else DEFAULT_RESPONSE_CACHE_MAX_SIZE
+            )
+        )
+
+    def get_ttl_in_ms(self, path: str) -> Union[int, None]:
+        return self.ttl_per_path_in_ms.get(path)
+
+    def invalidate_for_write(self, path: str, user_id: Union[str, None]) -> None:
+        paths = INVALIDATED_PATHS_BY_WRITE_PATH.get(path)
+        if paths is None:
+            return
+        if _ALL_PATHS in paths:
+            self.cache.clear()
+            return
+        for cached_path in paths:
+            self.cache.invalidate(cached_path, user_id)
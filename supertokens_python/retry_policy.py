@@ -0,0 +1,87 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+from random import uniform
+from typing import List, Set, Union
+
+DEFAULT_RETRYABLE_STATUS_CODES = [429, 502, 503, 504]
+
+# POST APIs of the core that can safely be sent more than once. Other POSTs
+# (for example /recipe/session/refresh, which rotates the refresh token) are
+# never retried once they may have reached the core.
+DEFAULT_IDEMPOTENT_POST_PATHS = [
+    "/recipe/handshake",
+    "/recipe/session/verify",
+]
+
+
+class RetryPolicy:
+    """
+    Controls how requests to the core are retried.
+
+    Independently of this policy, a request that could not connect to a core is
+    always sent to the next core (once per core). On top of that, idempotent
+    requests (GET, PUT, DELETE and the POSTs in `idempotent_post_paths`) are
+    retried up to `max_attempts` times when all cores failed, timed out after
+    `attempt_timeout_ms`, or replied with one of `retryable_status_codes`.
+    Retries wait for an exponential backoff with full jitter, and stop once
+    `deadline_ms` (the budget for the whole call) would be exceeded.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        deadline_ms: Union[int, None] = 10000,
+        attempt_timeout_ms: Union[int, None] = None,
+        retryable_status_codes: Union[List[int], None] = None,
+        initial_backoff_ms: int = 100,
+        max_backoff_ms: int = 2000,
+        idempotent_post_paths: Union[List[str], None] = None,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if initial_backoff_ms < 0 or max_backoff_ms < initial_backoff_ms:
+            raise ValueError("initial_backoff_ms must be >= 0 and <= max_backoff_ms")
+        self.max_attempts = max_attempts
+        self.deadline_ms = deadline_ms
+        self.attempt_timeout_ms = attempt_timeout_ms
+        self.retryable_status_codes: Set[int] = set(
+            retryable_status_codes
+            if retryable_status_codes is not None
+            else DEFAULT_RETRYABLE_STATUS_CODES
+        )
+        self.initial_backoff_ms = initial_backoff_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.idempotent_post_paths: Set[str] = set(
+            idempotent_post_paths
+            if idempotent_post_paths is not None
+            else DEFAULT_IDEMPOTENT_POST_PATHS
+        )
+
+    def is_idempotent(self, method: str, path: str) -> bool:
+        method = method.lower()
+        if method in ("get", "put", "delete"):
+            return True
+        return method == "post" and path in self.idempotent_post_paths
+
+    def is_retryable_status_code(self, status_code: int) -> bool:
+        return status_code in self.retryable_status_codes
+
+    def get_backoff_ms(self, attempt: int) -> float:
+        # attempt is the number of attempts made so far (starting at 1)
+        return uniform(
+            0,
+            min(self.max_backoff_ms, self.initial_backoff_ms * (2 ** (attempt - 1))),
+        )
@@ -15,7 +15,7 @@
 from __future__ import annotations
 
 from os import environ
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 from typing_extensions import Literal
 
@@ -23,6 +23,7 @@ from supertokens_python.logger import get_maybe_none_as_str, log_debug_message
 from supertokens_python.types import SupportedFrameworks
 from .constants import FDI_KEY_HEADER, RID_KEY_HEADER, USER_COUNT, USER_DELETE, USERS
 from .exceptions import SuperTokensError
+from .host_selector import HostSelector
 from .interfaces import (
     CreateUserIdMappingOkResult,
     DeleteUserIdMappingOkResult,
@@ -37,6 +38,10 @@ from .normalised_url_domain import NormalisedURLDomain
 from .normalised_url_path import NormalisedURLPath
 from .post_init_callbacks import PostSTInitCallbacks
 from .querier import Querier
+from .request_hedging import HedgingConfig
+from .request_observer import CoreRequestObserver
+from .response_cache import ResponseCacheConfig
+from .retry_policy import RetryPolicy
 from .types import ThirdPartyInfo, User, UsersResponse
 from .utils import (
     get_rid_from_header,
@@ -47,7 +52,6 @@ from .utils import (
 )
 
 if TYPE_CHECKING:
-    from .recipe_module import RecipeModule
     from supertokens_python.framework.request import BaseRequest
     from supertokens_python.framework.response import BaseResponse
     from supertokens_python.recipe.session import SessionContainer
@@ -55,14 +59,35 @@ if TYPE_CHECKING:
 import json
 
 from .exceptions import BadInputError, GeneralError, raise_general_exception
+from .recipe_module import RecipeModule
 
 
 class SupertokensConfig:
     def __init__(
-        self, connection_uri: str, api_key: Union[str, None] = None
+        self,
+        connection_uri: str,
+        api_key: Union[str, None] = None,
+        max_connections: Union[int, None] = None,
+        keep_alive_expiry_in_sec: Union[float, None] = None,
+        http2: bool = False,
+        host_selector: Union[HostSelector, None] = None,
+        coalesce_get_requests: bool = False,
+        response_cache: Union[ResponseCacheConfig, None] = None,
+        hedging: Union[HedgingConfig, None] = None,
+        retry_policy: Union[RetryPolicy, None] = None,
+        request_observers: Union[List[CoreRequestObserver], None] = None,
     ):  # We keep this = None here because this is directly used by the user.
         self.connection_uri = connection_uri
         self.api_key = api_key
+        self.max_connections = max_connections
+        self.keep_alive_expiry_in_sec = keep_alive_expiry_in_sec
+        self.http2 = http2
+        self.host_selector = host_selector
+        self.coalesce_get_requests = coalesce_get_requests
+        self.response_cache = response_cache
+        self.hedging = hedging
+        self.retry_policy = retry_policy
+        self.request_observers = request_observers
 
 
 class Host:
@@ -179,7 +204,19 @@ class Supertokens:
                 filter(lambda x: x != "", supertokens_config.connection_uri.split(";")),
             )
         )
-        Querier.init(hosts, supertokens_config.api_key)
+        Querier.init(
+            hosts,
+            supertokens_config.api_key,
+            supertokens_config.max_connections,
+            supertokens_config.keep_alive_expiry_in_sec,
+            supertokens_config.http2,
+            supertokens_config.host_selector,
+            supertokens_config.coalesce_get_requests,
+            supertokens_config.response_cache,
+            supertokens_config.hedging,
+            supertokens_config.retry_policy,
+            supertokens_config.request_observers,
+        )
 
         if len(recipe_list) == 0:
             raise_general_exception(
@@ -195,6 +232,19 @@ class Supertokens:
             if telemetry is not None
             else (environ.get("TEST_MODE") != "testing")
         )
+        # Built on the first request, see __get_api_routes
+        self.__api_routes: Union[
+            Dict[Tuple[str, str], Tuple[int, RecipeModule, str]], None
+        ] = None
+        self.__recipes_with_custom_routing: List[Tuple[int, RecipeModule]] = []
+        self.__recipes_by_id: Dict[str, RecipeModule] = {}
+        # The request path (before it's appended to the api gateway path) of
+        # requests to the api base path starts with this
+        self.__api_base_path_without_gateway = (
+            self.app_info.api_base_path.get_as_string_dangerous()[
+                len(self.app_info.api_gateway_path.get_as_string_dangerous()) :
+            ]
+        )
 
     @staticmethod
     def init(
@@ -228,6 +278,11 @@ class Supertokens:
             "Initialisation not done. Did you forget to call the SuperTokens.init function?"
         )
 
+    async def close(self) -> None:  # pylint: disable=no-self-use
+        # Closes the pooled connections to the SuperTokens core. Call this when
+        # shutting down the app (for example from a FastAPI shutdown event).
+        await Querier.close()
+
     def get_all_cors_headers(self) -> List[str]:
         headers_set: Set[str] = set()
         headers_set.add(RID_KEY_HEADER)
@@ -243,12 +298,8 @@ class Supertokens:
         self, include_recipe_ids: Union[None, List[str]]
     ) -> int:
         querier = Querier.get_instance(None)
-        include_recipe_ids_str = None
-        if include_recipe_ids is not None:
-            include_recipe_ids_str = ",".join(include_recipe_ids)
-
         response = await querier.send_get_request(
-            NormalisedURLPath(USER_COUNT), {"includeRecipeIds": include_recipe_ids_str}
+            NormalisedURLPath(USER_COUNT), get_user_count_params(include_recipe_ids)
         )
 
         return int(response["count"])
@@ -275,52 +326,13 @@ class Supertokens:
         query: Union[Dict[str, str], None] = None,
     ) -> UsersResponse:
         querier = Querier.get_instance(None)
-        params = {"timeJoinedOrder": time_joined_order}
-        if limit is not None:
-            params = {"limit": limit, **params}
-        if pagination_token is not None:
-            params = {"paginationToken": pagination_token, **params}
-
-        include_recipe_ids_str = None
-        if include_recipe_ids is not None:
-            include_recipe_ids_str = ",".join(include_recipe_ids)
-            params = {"includeRecipeIds": include_recipe_ids_str, **params}
-
-        if query is not None:
-            params = {**params, **query}
-
-        response = await querier.send_get_request(NormalisedURLPath(USERS), params)
-        next_pagination_token = None
-        if "nextPaginationToken" in response:
-            next_pagination_token = response["nextPaginationToken"]
-        users_list = response["users"]
-        users: List[User] = []
-        for user in users_list:
-            recipe_id = user["recipeId"]
-            user_obj = user["user"]
-            third_party = None
-            if "thirdParty" in user_obj:
-                third_party = ThirdPartyInfo(
-                    user_obj["thirdParty"]["userId"], user_obj["thirdParty"]["id"]
-                )
-            email = None
-            if "email" in user_obj:
-                email = user_obj["email"]
-            phone_number = None
-            if "phoneNumber" in user_obj:
-                phone_number = user_obj["phoneNumber"]
-            users.append(
-                User(
-                    recipe_id,
-                    user_obj["id"],
-                    user_obj["timeJoined"],
-                    email,
-                    phone_number,
-                    third_party,
-                )
-            )
-
-        return UsersResponse(users, next_pagination_token)
+        response = await querier.send_get_request(
+            NormalisedURLPath(USERS),
+            get_users_params(
+                time_joined_order, limit, pagination_token, include_recipe_ids, query
+            ),
+        )
+        return parse_users_response(response)
 
     async def create_user_id_mapping(  # pylint: disable=no-self-use
         self,
@@ -338,28 +350,13 @@ class Supertokens:
         cdi_version = await querier.get_api_version()
 
         if is_version_gte(cdi_version, "2.15"):
-            body: Dict[str, Any] = {
-                "superTokensUserId": supertokens_user_id,
-                "externalUserId": external_user_id,
-                "externalUserIdInfo": external_user_id_info,
-            }
-            if force:
-                body["force"] = force
-
             res = await querier.send_post_request(
-                NormalisedURLPath("/recipe/userid/map"), body
+                NormalisedURLPath("/recipe/userid/map"),
+                get_create_user_id_mapping_body(
+                    supertokens_user_id, external_user_id, external_user_id_info, force
+                ),
             )
-            if res["status"] == "OK":
-                return CreateUserIdMappingOkResult()
-            if res["status"] == "UNKNOWN_SUPERTOKENS_USER_ID_ERROR":
-                return UnknownSupertokensUserIDError()
-            if res["status"] == "USER_ID_MAPPING_ALREADY_EXISTS_ERROR":
-                return UserIdMappingAlreadyExistsError(
-                    does_super_tokens_user_id_exist=res["doesSuperTokensUserIdExist"],
-                    does_external_user_id_exist=res["does_external_user_id_exist"],
-                )
-
-            raise_general_exception("Unknown response")
+            return parse_create_user_id_mapping_response(res)
 
         raise_general_exception("Please upgrade the SuperTokens core to >= 3.15.0")
 
@@ -373,25 +370,11 @@ class Supertokens:
         cdi_version = await querier.get_api_version()
 
         if is_version_gte(cdi_version, "2.15"):
-            body = {
-                "userId": user_id,
-            }
-            if user_id_type:
-                body["userIdType"] = user_id_type
             res = await querier.send_get_request(
                 NormalisedURLPath("/recipe/userid/map"),
-                body,
+                get_user_id_mapping_params(user_id, user_id_type),
             )
-            if res["status"] == "OK":
-                return GetUserIdMappingOkResult(
-                    supertokens_user_id=res["superTokensUserId"],
-                    external_user_id=res["externalUserId"],
-                    external_user_info=res.get("externalUserIdInfo"),
-                )
-            if res["status"] == "UNKNOWN_MAPPING_ERROR":
-                return UnknownMappingError()
-
-            raise_general_exception("Unknown response")
+            return parse_get_user_id_mapping_response(res)
 
         raise_general_exception("Please upgrade the SuperTokens core to >= 3.15.0")
 
@@ -406,21 +389,11 @@ class Supertokens:
         cdi_version = await querier.get_api_version()
 
         if is_version_gte(cdi_version, "2.15"):
-            body: Dict[str, Any] = {
-                "userId": user_id,
-                "userIdType": user_id_type,
-            }
-            if force:
-                body["force"] = force
             res = await querier.send_post_request(
-                NormalisedURLPath("/recipe/userid/map/remove"), body
+                NormalisedURLPath("/recipe/userid/map/remove"),
+                get_delete_user_id_mapping_body(user_id, user_id_type, force),
             )
-            if res["status"] == "OK":
-                return DeleteUserIdMappingOkResult(
-                    did_mapping_exist=res["didMappingExist"]
-                )
-
-            raise_general_exception("Unknown response")
+            return parse_delete_user_id_mapping_response(res)
 
         raise_general_exception("Please upgrade the SuperTokens core to >= 3.15.0")
 
@@ -437,27 +410,82 @@ class Supertokens:
         if is_version_gte(cdi_version, "2.15"):
             res = await querier.send_post_request(
                 NormalisedURLPath("/recipe/userid/external-user-id-info"),
-                {
-                    "userId": user_id,
-                    "userIdType": user_id_type,
-                    "externalUserIdInfo": external_user_id_info,
-                },
+                get_update_or_delete_user_id_mapping_info_body(
+                    user_id, user_id_type, external_user_id_info
+                ),
             )
-            if res["status"] == "OK":
-                return UpdateOrDeleteUserIdMappingInfoOkResult()
-            if res["status"] == "UNKNOWN_MAPPING_ERROR":
-                return UnknownMappingError()
-
-            raise_general_exception("Unknown response")
+            return parse_update_or_delete_user_id_mapping_info_response(res)
 
         raise_general_exception("Please upgrade the SuperTokens core to >= 3.15.0")
 
+    def __get_api_routes(
+        self,
+    ) -> Dict[Tuple[str, str], Tuple[int, RecipeModule, str]]:
+        if self.__api_routes is None:
+            # (method, path) -> (index, recipe, request ID) of the first recipe
+            # (in the order of recipe_modules) that handles the API
+            api_routes: Dict[Tuple[str, str], Tuple[int, RecipeModule, str]] = {}
+            for index, recipe in enumerate(self.recipe_modules):
+                self.__recipes_by_id.setdefault(recipe.get_recipe_id(), recipe)
+                if (
+                    type(recipe).return_api_id_if_can_handle_request
+                    is not RecipeModule.return_api_id_if_can_handle_request
+                ):
+                    # Like the dashboard recipe, which handles paths by prefix
+                    self.__recipes_with_custom_routing.append((index, recipe))
+                    continue
+                for route, request_id in recipe.get_api_routes().items():
+                    api_routes.setdefault(route, (index, recipe, request_id))
+            self.__api_routes = api_routes
+        return self.__api_routes
+
+    def __get_api_route(
+        self, path: NormalisedURLPath, method: str
+    ) -> Tuple[Union[RecipeModule, None], Union[str, None]]:
+        route = self.__get_api_routes().get((method, path.get_as_string_dangerous()))
+        # Recipes with their own routing that come before the matched recipe
+        # take precedence, like when the recipes were checked one by one
+        for index, recipe in self.__recipes_with_custom_routing:
+            if route is not None and index > route[0]:
+                break
+            request_id = recipe.return_api_id_if_can_handle_request(path, method)
+            if request_id is not None:
+                return recipe, request_id
+        if route is None:
+            return None, None
+        return route[1], route[2]
+
+    def __is_outside_api_base_path(self, request_path: str) -> bool:
+        """
+        Checks, without normalising it, whether the path of a request can't be
+        under the api base path. Paths that start with a / are only stripped,
+        lowercased and cut (at ?, #, ; or a trailing /) by normalisation, unless
+        they have tabs or newlines, which urlparse removes.
+        """
+        request_path = request_path.lstrip()
+        if (
+            not request_path.startswith("/")
+            or "\t" in request_path
+            or "\r" in request_path
+            or "\n" in request_path
+        ):
+            return False
+        prefix = self.__api_base_path_without_gateway
+        return not request_path[: len(prefix)].lower().startswith(prefix)
+
     async def middleware(  # pylint: disable=no-self-use
         self, request: BaseRequest, response: BaseResponse
     ) -> Union[BaseResponse, None]:
         log_debug_message("middleware: Started")
+        request_path = request.get_path()
+        if self.__is_outside_api_base_path(request_path):
+            log_debug_message(
+                "middleware: Not handling because request path did not start with api base path. Request path: %s",
+                request_path,
+            )
+            return None
         path = Supertokens.get_instance().app_info.api_gateway_path.append(
-            NormalisedURLPath(request.get_path())
+            NormalisedURLPath(request_path)
         )
         method = normalise_http_method(request.method())
 
@@ -478,28 +506,14 @@ class Supertokens:
         request_id = None
         matched_recipe = None
         if request_rid is not None:
-            for recipe in Supertokens.get_instance().recipe_modules:
-                log_debug_message(
-                    "middleware: Checking recipe ID for match: %s",
-                    recipe.get_recipe_id(),
-                )
-                if recipe.get_recipe_id() == request_rid:
-                    matched_recipe = recipe
-                    break
+            self.__get_api_routes()
+            matched_recipe = self.__recipes_by_id.get(request_rid)
             if matched_recipe is not None:
                 request_id = matched_recipe.return_api_id_if_can_handle_request(
                     path, method
                 )
         else:
-            for recipe in Supertokens.get_instance().recipe_modules:
-                log_debug_message(
-                    "middleware: Checking recipe ID for match: %s",
-                    recipe.get_recipe_id(),
-                )
-                request_id = recipe.return_api_id_if_can_handle_request(path, method)
-                if request_id is not None:
-                    matched_recipe = recipe
-                    break
+            matched_recipe, request_id = self.__get_api_route(path, method)
         if matched_recipe is not None:
             log_debug_message(
                 "middleware: Matched with recipe ID: %s", matched_recipe.get_recipe_id()
@@ -552,3 +566,180 @@ class Supertokens:
                 )
                 return await recipe.handle_error(request, err, response)
         raise err
+
+
+# The helpers below build the requests to / parse the responses from the core
+# for the Supertokens functions, so that they can be shared by the async
+# functions above and the ones in supertokens_python.syncio.
+
+
+def get_user_count_params(include_recipe_ids: Union[None, List[str]]) -> Dict[str, Any]:
+    include_recipe_ids_str = None
+    if include_recipe_ids is not None:
+        include_recipe_ids_str = ",".join(include_recipe_ids)
+    return {"includeRecipeIds": include_recipe_ids_str}
+
+
+def get_users_params(
+    time_joined_order: Literal["ASC", "DESC"],
+    limit: Union[int, None],
+    pagination_token: Union[str, None],
+    include_recipe_ids: Union[None, List[str]],
+    query: Union[Dict[str, str], None] = None,
+) -> Dict[str, Any]:
+    params: Dict[str, Any] = {"timeJoinedOrder": time_joined_order}
+    if limit is not None:
+        params = {"limit": limit, **params}
+    if pagination_token is not None:
+        params = {"paginationToken": pagination_token, **params}
+
+    include_recipe_ids_str = None
+    if include_recipe_ids is not None:
+        include_recipe_ids_str = ",".join(include_recipe_ids)
+        params = {"includeRecipeIds": include_recipe_ids_str, **params}
+
+    if query is not None:
+        params = {**params, **query}
+    return params
+
+
+def parse_users_response(response: Dict[str, Any]) -> UsersResponse:
+    next_pagination_token = None
+    if "nextPaginationToken" in response:
+        next_pagination_token = response["nextPaginationToken"]
+    users_list = response["users"]
+    users: List[User] = []
+    for user in users_list:
+        recipe_id = user["recipeId"]
+        user_obj = user["user"]
+        third_party = None
+        if "thirdParty" in user_obj:
+            third_party = ThirdPartyInfo(
+                user_obj["thirdParty"]["userId"], user_obj["thirdParty"]["id"]
+            )
+        email = None
+        if "email" in user_obj:
+            email = user_obj["email"]
+        phone_number = None
+        if "phoneNumber" in user_obj:
+            phone_number = user_obj["phoneNumber"]
+        users.append(
+            User(
+                recipe_id,
+                user_obj["id"],
+                user_obj["timeJoined"],
+                email,
+                phone_number,
+                third_party,
+            )
+        )
+
+    return UsersResponse(users, next_pagination_token)
+
+
+def get_create_user_id_mapping_body(
+    supertokens_user_id: str,
+    external_user_id: str,
+    external_user_id_info: Optional[str] = None,
+    force: Optional[bool] = None,
+) -> Dict[str, Any]:
+    body: Dict[str, Any] = {
+        "superTokensUserId": supertokens_user_id,
+        "externalUserId": external_user_id,
+        "externalUserIdInfo": external_user_id_info,
+    }
+    if force:
+        body["force"] = force
+    return body
+
+
+def parse_create_user_id_mapping_response(
+    res: Dict[str, Any]
+) -> Union[
+    CreateUserIdMappingOkResult,
+    UnknownSupertokensUserIDError,
+    UserIdMappingAlreadyExistsError,
+]:
+    if res["status"] == "OK":
+        return CreateUserIdMappingOkResult()
+    if res["status"] == "UNKNOWN_SUPERTOKENS_USER_ID_ERROR":
+        return UnknownSupertokensUserIDError()
+    if res["status"] == "USER_ID_MAPPING_ALREADY_EXISTS_ERROR":
+        return UserIdMappingAlreadyExistsError(
+            does_super_tokens_user_id_exist=res["doesSuperTokensUserIdExist"],
+            does_external_user_id_exist=res["does_external_user_id_exist"],
+        )
+
+    return raise_general_exception("Unknown response")
+
+
+def get_user_id_mapping_params(
+    user_id: str, user_id_type: Optional[UserIDTypes] = None
+) -> Dict[str, Any]:
+    params = {
+        "userId": user_id,
+    }
+    if user_id_type:
+        params["userIdType"] = user_id_type
+    return params
+
+
+def parse_get_user_id_mapping_response(
+    res: Dict[str, Any]
+) -> Union[GetUserIdMappingOkResult, UnknownMappingError]:
+    if res["status"] == "OK":
+        return GetUserIdMappingOkResult(
+            supertokens_user_id=res["superTokensUserId"],
+            external_user_id=res["externalUserId"],
+            external_user_info=res.get("externalUserIdInfo"),
+        )
+    if res["status"] == "UNKNOWN_MAPPING_ERROR":
+        return UnknownMappingError()
+
+    return raise_general_exception("Unknown response")
+
+
+def get_delete_user_id_mapping_body(
+    user_id: str,
+    user_id_type: Optional[UserIDTypes] = None,
+    force: Optional[bool] = None,
+) -> Dict[str, Any]:
+    body: Dict[str, Any] = {
+        "userId": user_id,
+        "userIdType": user_id_type,
+    }
+    if force:
+        body["force"] = force
+    return body
+
+
+def parse_delete_user_id_mapping_response(
+    res: Dict[str, Any]
+) -> DeleteUserIdMappingOkResult:
+    if res["status"] == "OK":
+        return DeleteUserIdMappingOkResult(did_mapping_exist=res["didMappingExist"])
+
+    return raise_general_exception("Unknown response")
+
+
+def get_update_or_delete_user_id_mapping_info_body(
+    user_id: str,
+    user_id_type: Optional[UserIDTypes] = None,
+    external_user_id_info: Optional[str] = None,
+) -> Dict[str, Any]:
+    return {
+        "userId": user_id,
+        "userIdType": user_id_type,
+        "externalUserIdInfo": external_user_id_info,
+    }
+
+
+def parse_update_or_delete_user_id_mapping_info_response(
+    res: Dict[str, Any]
+) -> Union[UpdateOrDeleteUserIdMappingInfoOkResult, UnknownMappingError]:
+    if res["status"] == "OK":
+        return UpdateOrDeleteUserIdMappingInfoOkResult()
+    if res["status"] == "UNKNOWN_MAPPING_ERROR":
+        return UnknownMappingError()
+
+    return raise_general_exception("Unknown response")
@@ -11,10 +11,10 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
-from typing import List, Union, Optional
+from typing import List, Optional, Union
 
-from supertokens_python import Supertokens
-from supertokens_python.async_to_sync_wrapper import sync
+from supertokens_python.constants import USER_COUNT, USER_DELETE, USERS
+from supertokens_python.exceptions import raise_general_exception
 from supertokens_python.interfaces import (
     CreateUserIdMappingOkResult,
     UnknownSupertokensUserIDError,
@@ -25,7 +25,26 @@ from supertokens_python.interfaces import (
     DeleteUserIdMappingOkResult,
     UpdateOrDeleteUserIdMappingInfoOkResult,
 )
+from supertokens_python.normalised_url_path import NormalisedURLPath
+from supertokens_python.querier import Querier
+from supertokens_python.supertokens import (
+    get_create_user_id_mapping_body,
+    get_delete_user_id_mapping_body,
+    get_update_or_delete_user_id_mapping_info_body,
+    get_user_count_params,
+    get_user_id_mapping_params,
+    get_users_params,
+    parse_create_user_id_mapping_response,
+    parse_delete_user_id_mapping_response,
+    parse_get_user_id_mapping_response,
+    parse_update_or_delete_user_id_mapping_info_response,
+    parse_users_response,
+)
 from supertokens_python.types import UsersResponse
+from supertokens_python.utils import is_version_gte
+
+# These functions query the core using the sync transport of the querier, so
+# they don't need an event loop.
 
 
 def get_users_oldest_first(
@@ -33,11 +52,11 @@ def get_users_oldest_first(
     pagination_token: Union[str, None] = None,
     include_recipe_ids: Union[None, List[str]] = None,
 ) -> UsersResponse:
-    return sync(
-        Supertokens.get_instance().get_users(
-            "ASC", limit, pagination_token, include_recipe_ids
-        )
+    response = Querier.get_instance(None).send_get_request_sync(
+        NormalisedURLPath(USERS),
+        get_users_params("ASC", limit, pagination_token, include_recipe_ids),
     )
+    return parse_users_response(response)
 
 
 def get_users_newest_first(
@@ -45,19 +64,28 @@ def get_users_newest_first(
     pagination_token: Union[str, None] = None,
     include_recipe_ids: Union[None, List[str]] = None,
 ) -> UsersResponse:
-    return sync(
-        Supertokens.get_instance().get_users(
-            "DESC", limit, pagination_token, include_recipe_ids
-        )
+    response = Querier.get_instance(None).send_get_request_sync(
+        NormalisedURLPath(USERS),
+        get_users_params("DESC", limit, pagination_token, include_recipe_ids),
     )
+    return parse_users_response(response)
 
 
 def get_user_count(include_recipe_ids: Union[None, List[str]] = None) -> int:
-    return sync(Supertokens.get_instance().get_user_count(include_recipe_ids))
+    response = Querier.get_instance(None).send_get_request_sync(
+        NormalisedURLPath(USER_COUNT), get_user_count_params(include_recipe_ids)
+    )
+    return int(response["count"])
 
 
 def delete_user(user_id: str) -> None:
-    return sync(Supertokens.get_instance().delete_user(user_id))
+    querier = Querier.get_instance(None)
+    if is_version_gte(querier.get_api_version_sync(), "2.10"):
+        querier.send_post_request_sync(
+            NormalisedURLPath(USER_DELETE), {"userId": user_id}
+        )
+        return None
+    raise_general_exception("Please upgrade the SuperTokens core to >= 3.7.0")
 
 
 def create_user_id_mapping(
@@ -69,26 +97,43 @@ def create_user_id_mapping(
     UnknownSupertokensUserIDError,
     UserIdMappingAlreadyExistsError,
 ]:
-    return sync(
-        Supertokens.get_instance().create_user_id_mapping(
-            supertokens_user_id, external_user_id, external_user_id_info
+    querier = Querier.get_instance(None)
+    if is_version_gte(querier.get_api_version_sync(), "2.15"):
+        res = querier.send_post_request_sync(
+            NormalisedURLPath("/recipe/userid/map"),
+            get_create_user_id_mapping_body(
+                supertokens_user_id, external_user_id, external_user_id_info
+            ),
         )
-    )
+        return parse_create_user_id_mapping_response(res)
+    return raise_general_exception("Please upgrade the SuperTokens core to >= 3.15.0")
 
 
 def get_user_id_mapping(
     user_id: str,
     user_id_type: Optional[UserIDTypes] = None,
 ) -> Union[GetUserIdMappingOkResult, UnknownMappingError]:
-    return sync(Supertokens.get_instance().get_user_id_mapping(user_id, user_id_type))
+    querier = Querier.get_instance(None)
+    if is_version_gte(querier.get_api_version_sync(), "2.15"):
+        res = querier.send_get_request_sync(
+            NormalisedURLPath("/recipe/userid/map"),
+            get_user_id_mapping_params(user_id, user_id_type),
+        )
+        return parse_get_user_id_mapping_response(res)
+    return raise_general_exception("Please upgrade the SuperTokens core to >= 3.15.0")
 
 
 def delete_user_id_mapping(
     user_id: str, user_id_type: Optional[UserIDTypes] = None
 ) -> DeleteUserIdMappingOkResult:
-    return sync(
-        Supertokens.get_instance().delete_user_id_mapping(user_id, user_id_type)
-    )
+    querier = Querier.get_instance(None)
+    if is_version_gte(querier.get_api_version_sync(), "2.15"):
+        res = querier.send_post_request_sync(
+            NormalisedURLPath("/recipe/userid/map/remove"),
+            get_delete_user_id_mapping_body(user_id, user_id_type),
+        )
+        return parse_delete_user_id_mapping_response(res)
+    return raise_general_exception("Please upgrade the SuperTokens core to >= 3.15.0")
 
 
 def update_or_delete_user_id_mapping_info(
@@ -96,8 +141,13 @@ def update_or_delete_user_id_mapping_info(
     user_id_type: Optional[UserIDTypes] = None,
     external_user_id_info: Optional[str] = None,
 ) -> Union[UpdateOrDeleteUserIdMappingInfoOkResult, UnknownMappingError]:
-    return sync(
-        Supertokens.get_instance().update_or_delete_user_id_mapping_info(
-            user_id, user_id_type, external_user_id_info
+    querier = Querier.get_instance(None)
+    if is_version_gte(querier.get_api_version_sync(), "2.15"):
+        res = querier.send_post_request_sync(
+            NormalisedURLPath("/recipe/userid/external-user-id-info"),
+            get_update_or_delete_user_id_mapping_info_body(
+                user_id, user_id_type, external_user_id_info
+            ),
         )
-    )
+        return parse_update_or_delete_user_id_mapping_info_response(res)
+    return raise_general_exception("Please upgrade the SuperTokens core to >= 3.15.0")
@@ -15,7 +15,6 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import warnings
 from base64 import b64decode, b64encode
 from math import floor
@@ -28,7 +27,10 @@ from typing import (
     Callable,
     Coroutine,
     Dict,
+    Generic,
+    Hashable,
     List,
+    Tuple,
     TypeVar,
     Union,
 )
@@ -44,6 +46,7 @@ from supertokens_python.framework.flask.framework import FlaskFramework
 from supertokens_python.framework.litestar.framework import LitestarFramework
 from supertokens_python.framework.request import BaseRequest
 from supertokens_python.framework.response import BaseResponse
+from supertokens_python.json_codec import json_dumps
 from supertokens_python.logger import log_debug_message
 
 from .constants import ERROR_MESSAGE_KEY, RID_KEY_HEADER
@@ -52,6 +55,7 @@ from .framework.types import Framework
 from .types import MaybeAwaitable, SupportedFrameworks
 
 _T = TypeVar("_T")
+_K = TypeVar("_K", bound=Hashable)
 
 if TYPE_CHECKING:
     pass
@@ -230,7 +234,7 @@ def handle_httpx_client_exceptions(
 
     if input_ is not None:
         log_debug_message("Logging the input:")
-        log_debug_message("%s", json.dumps(input_))
+        log_debug_message("%s", json_dumps(input_))
 
 
 def humanize_time(ms: int) -> str:
@@ -268,6 +272,87 @@ async def resolve(obj: MaybeAwaitable[_T]) -> _T:
     return obj  # type: ignore
 
 
+async def run_with_limited_concurrency(
+    funcs: List[Callable[[], Awaitable[_T]]], max_concurrency: int
+) -> List[Union[_T, Exception]]:
+    """
+    Runs funcs with at most max_concurrency of them in flight at a time. The
+    results are in the order of funcs, and an exception raised by a func is
+    returned in place of its result.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    results: List[Union[_T, Exception]] = [None for _ in funcs]  # type: ignore
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < len(funcs):
+            index = next_index
+            next_index += 1
+            try:
+                results[index] = await funcs[index]()
+            except Exception as e:
+                results[index] = e
+
+    await asyncio.gather(*[worker() for _ in range(min(max_concurrency, len(funcs)))])
+    return results
+
+
+class SingleFlight(Generic[_K, _T]):
+    """
+    Makes concurrent calls for the same key share one call of their function.
+    Calls are only shared within an event loop, since a future can only be
+    awaited in the loop it belongs to. on_done is called with the key and the
+    call once it's done.
+    """
+
+    def __init__(
+        self,
+        on_done: Union[Callable[[_K, "asyncio.Future[_T]"], None], None] = None,
+    ):
+        self.__on_done = on_done
+        self.__in_flight: Dict[
+            Tuple[asyncio.AbstractEventLoop, _K], "asyncio.Future[_T]"
+        ] = {}
+
+    def start(
+        self, key: _K, func: Callable[[], Awaitable[_T]]
+    ) -> Tuple["asyncio.Future[_T]", bool]:
+        """
+        Returns the call for key that is in flight (or a new call of func) and
+        whether it was started by this.
+        """
+        loop_key = (asyncio.get_event_loop(), key)
+        request = self.__in_flight.get(loop_key)
+        if request is not None:
+            return request, False
+
+        request = asyncio.ensure_future(func())
+        self.__in_flight[loop_key] = request
+
+        def on_done(request: "asyncio.Future[_T]"):
+            self.__in_flight.pop(loop_key, None)
+            if self.__on_done is not None:
+                self.__on_done(key, request)
+
+        request.add_done_callback(on_done)
+        return request, True
+
+    @staticmethod
+    async def wait(request: "asyncio.Future[_T]") -> _T:
+        if request.done():
+            # Can be a call that ran in another event loop
+            return request.result()
+        # shield so that a cancelled caller doesn't cancel the shared call
+        return await asyncio.shield(request)
+
+    async def run(self, key: _K, func: Callable[[], Awaitable[_T]]) -> _T:
+        request, _ = self.start(key, func)
+        return await self.wait(request)
+
+
 def get_top_level_domain_for_same_site_resolution(url: str) -> str:
     url_obj = urlparse(url)
     hostname = url_obj.hostname
@@ -0,0 +1,130 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from typing import Any, Dict
+
+from pytest import mark, raises
+
+from supertokens_python.json_codec import json_loads
+from supertokens_python.recipe.session.access_token import (
+    INVALID_ACCESS_TOKEN_STRUCTURE_MESSAGE,
+    get_access_token_info_from_payload,
+    sanitize_number,
+    sanitize_string,
+)
+from supertokens_python.recipe.session.jwt import (
+    parse_jwt_without_signature_verification,
+)
+from supertokens_python.utils import utf_base64decode
+from tests.sessions.jwt_utils import create_access_token, create_signing_key
+
+from .utils import compare_time_per_call_in_us, report
+
+
+def test_access_token_payload_is_decoded_and_validated_once():
+    key, _ = create_signing_key()
+    info = parse_jwt_without_signature_verification(
+        create_access_token(key, user_data={"role": "admin"})
+    )
+
+    access_token_info = get_access_token_info_from_payload(info)
+    assert get_access_token_info_from_payload(info) is access_token_info
+    assert access_token_info["sessionHandle"] == "session-handle"
+    assert access_token_info["userData"] == {"role": "admin"}
+
+    invalid_info = parse_jwt_without_signature_verification(
+        info.header + ".e30." + info.signature
+    )
+    with raises(Exception):
+        get_access_token_info_from_payload(invalid_info)
+
+
+class EagerParsedJWTInfo:
+    # ParsedJWTInfo before it decoded the payload lazily
+    def __init__(
+        self,
+        raw_token_string: str,
+        raw_payload: str,
+        header: str,
+        payload: Dict[str, Any],
+        signature: str,
+    ) -> None:
+        self.raw_token_string = raw_token_string
+        self.raw_payload = raw_payload
+        self.header = header
+        self.payload = payload
+        self.signature = signature
+
+
+def validate_access_token_structure(payload: Dict[str, Any]) -> None:
+    # The structure check get_session used to run separately from building the
+    # access token info
+    if (
+        not isinstance(payload.get("sessionHandle"), str)
+        or payload.get("userData") is None
+        or not isinstance(payload.get("refreshTokenHash1"), str)
+        or not isinstance(payload.get("expiryTime"), int)
+        or not isinstance(payload.get("timeCreated"), int)
+    ):
+        raise Exception(INVALID_ACCESS_TOKEN_STRUCTURE_MESSAGE)
+
+
+@mark.benchmark
+def test_access_token_parsing_benchmark():
+    key, _ = create_signing_key()
+    token = create_access_token(key, user_data={"role": "admin"})
+    allowed_headers = [token.split(".")[0]]
+
+    def parse_with_repeated_reads():
+        # What get_session used to do: decode while parsing, then validate the
+        # structure and build the info from separate reads of the payload
+        header, payload, signature = token.split(".")
+        if header not in allowed_headers:
+            raise Exception("jwt header mismatch")
+        info = EagerParsedJWTInfo(
+            raw_token_string=token,
+            raw_payload=payload,
+            header=header,
+            payload=json_loads(utf_base64decode(payload)),
+            signature=signature,
+        )
+        decoded_payload = info.payload
+        validate_access_token_structure(decoded_payload)
+        return {
+            "sessionHandle": sanitize_string(decoded_payload.get("sessionHandle")),
+            "userId": sanitize_string(decoded_payload.get("userId")),
+            "refreshTokenHash1": sanitize_string(
+                decoded_payload.get("refreshTokenHash1")
+            ),
+            "parentRefreshTokenHash1": sanitize_string(
+                decoded_payload.get("parentRefreshTokenHash1")
+            ),
+            "userData": decoded_payload.get("userData"),
+            "antiCsrfToken": sanitize_string(decoded_payload.get("antiCsrfToken")),
+            "expiryTime": sanitize_number(decoded_payload.get("expiryTime")),
+            "timeCreated": sanitize_number(decoded_payload.get("timeCreated")),
+        }
+
+    def parse_once():
+        info = parse_jwt_without_signature_verification(token)
+        get_access_token_info_from_payload(info)
+        return get_access_token_info_from_payload(info)
+
+    assert parse_once() == parse_with_repeated_reads()
+
+    baseline, optimised = compare_time_per_call_in_us(
+        parse_with_repeated_reads, parse_once, 20000
+    )
+    report("Access token parsing", baseline, optimised)
+
+    assert optimised < baseline
@@ -0,0 +1,110 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from typing import Union
+from unittest.mock import MagicMock
+
+from pytest import mark
+
+from supertokens_python import Supertokens
+from supertokens_python.normalised_url_path import (
+    NormalisedURLPath,
+    normalise_url_path_or_throw_error,
+)
+from supertokens_python.recipe_module import RecipeModule
+from tests.test_api_routing import (  # pylint: disable=unused-import
+    supertokens_init,  # type: ignore
+)
+
+from .utils import compare_time_per_call_in_us, report
+
+
+def return_api_id_with_api_checks(
+    recipe: RecipeModule, path: NormalisedURLPath, method: str
+) -> Union[str, None]:
+    # What RecipeModule.return_api_id_if_can_handle_request used to do
+    for current_api in recipe.get_apis_handled():
+        if (
+            not current_api.disabled
+            and current_api.method == method
+            and recipe.app_info.api_base_path.append(
+                current_api.path_without_api_base_path
+            ).equals(path)
+        ):
+            return current_api.request_id
+    return None
+
+
+@mark.benchmark
+def test_api_routing_benchmark():
+    recipes = [
+        recipe
+        for recipe in Supertokens.get_instance().recipe_modules
+        if recipe.get_recipe_id() != "dashboard"
+    ]
+    # The middleware checks every recipe for paths that aren't an API
+    path = NormalisedURLPath("/auth/unknown")
+
+    def route_with_api_checks():
+        for recipe in recipes:
+            assert return_api_id_with_api_checks(recipe, path, "post") is None
+
+    def route():
+        for recipe in recipes:
+            assert recipe.return_api_id_if_can_handle_request(path, "post") is None
+
+    baseline_time, optimised_time = compare_time_per_call_in_us(
+        route_with_api_checks, route
+    )
+    report("Routing a request that isn't an API", baseline_time, optimised_time)
+
+    assert optimised_time < baseline_time
+
+
+class OtherRequest:
+    def get_path(self) -> str:
+        return "/api/products/1234/reviews?page=2"
+
+
+@mark.benchmark
+def test_middleware_benchmark_for_other_paths():
+    supertokens = Supertokens.get_instance()
+    app_info = supertokens.app_info
+    # Not a MagicMock, whose calls would take most of the time
+    request = OtherRequest()
+    response = MagicMock()
+    # Without the lru_cache, like every new path
+    normalise = normalise_url_path_or_throw_error.__wrapped__
+
+    def middleware():
+        # It doesn't await anything for these requests
+        try:
+            supertokens.middleware(request, response).send(None)  # type: ignore
+        except StopIteration as e:
+            assert e.value is None
+
+    def middleware_with_normalisation():
+        # What the middleware used to do before checking the api base path
+        path = normalise(
+            app_info.api_gateway_path.get_as_string_dangerous()
+            + normalise(request.get_path())
+        )
+        assert not path.startswith(app_info.api_base_path.get_as_string_dangerous())
+        middleware()
+
+    baseline_time, optimised_time = compare_time_per_call_in_us(
+        middleware_with_normalisation, middleware
+    )
+    report("Middleware for a path that isn't an API", baseline_time, optimised_time)
+
+    assert optimised_time < baseline_time
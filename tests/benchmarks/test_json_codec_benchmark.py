@@ -0,0 +1,57 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from pytest import mark
+
+from supertokens_python.json_codec import JSONCodec, StdlibJSONCodec, get_json_codec
+
+from .utils import report, time_per_call_in_us
+
+# Roughly what the core returns for a session verification
+SESSION_VERIFY_RESPONSE = (
+    b'{"status":"OK","session":{"handle":"5d3c7e2a-8c0b-4b6f-9d0e-3c1b2a4f5e6d",'
+    b'"userId":"fa7a0841-b533-4478-95533-0fde890c3483","userDataInJWT":{"st-ev":'
+    b'{"v":true,"t":1681897389018},"st-role":{"v":["admin","user"],"t":1681897389018},'
+    b'"st-perm":{"v":["read","write","delete"],"t":1681897389018}}},'
+    b'"accessToken":{"token":"' + b"a" * 600 + b'","expiry":1681900989018,'
+    b'"createdTime":1681897389018},"jwtSigningPublicKey":"' + b"k" * 400 + b'",'
+    b'"jwtSigningPublicKeyExpiryTime":1681983789018}'
+)
+
+
+def round_trip(codec: JSONCodec):
+    response = codec.loads(SESSION_VERIFY_RESPONSE)
+    return codec.dumps(response["session"]["userDataInJWT"], sort_keys=True)
+
+
+def test_codecs_produce_the_same_output():
+    codec = get_json_codec()
+    stdlib_codec = StdlibJSONCodec()
+    assert codec.loads(SESSION_VERIFY_RESPONSE) == stdlib_codec.loads(
+        SESSION_VERIFY_RESPONSE
+    )
+    assert round_trip(codec) == round_trip(stdlib_codec)
+    assert codec.dumps({1: "a"}) == stdlib_codec.dumps({1: "a"})
+
+
+@mark.benchmark
+@mark.skipif(get_json_codec().name == "json", reason="orjson / ujson is not installed")
+def test_json_codec_benchmark():
+    codec = get_json_codec()
+    stdlib_codec = StdlibJSONCodec()
+
+    stdlib_time = time_per_call_in_us(lambda: round_trip(stdlib_codec))
+    codec_time = time_per_call_in_us(lambda: round_trip(codec))
+    report("JSON round trip (json vs %s)" % codec.name, stdlib_time, codec_time)
+
+    assert codec_time < stdlib_time
@@ -0,0 +1,81 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from pytest import mark, raises
+
+from supertokens_python.recipe.session import jwt
+from supertokens_python.recipe.session.jwt import (
+    get_verifier,
+    parse_jwt_without_signature_verification,
+    set_cached_verifiers,
+    verify_jwt,
+)
+from tests.sessions.jwt_utils import create_signed_jwt, create_signing_key
+
+from .utils import report, time_per_call_in_us
+
+
+def test_verifiers_are_cached_and_evicted_with_the_key_list():
+    key, public_key = create_signing_key()
+    _, other_public_key = create_signing_key()
+    token = create_signed_jwt(key, {"userId": "user"})
+    info = parse_jwt_without_signature_verification(token)
+
+    set_cached_verifiers([public_key])
+    verifier = get_verifier(public_key)
+    verify_jwt(info, public_key)
+    assert get_verifier(public_key) is verifier
+
+    with raises(Exception) as e:
+        verify_jwt(info, other_public_key)
+    assert str(e.value) == "jwt verification failed"
+
+    other_verifier = get_verifier(other_public_key)
+    set_cached_verifiers([other_public_key])
+    assert get_verifier(other_public_key) is other_verifier
+    assert get_verifier(public_key) is not verifier
+
+
+def test_verifiers_can_be_cached_from_many_threads():
+    set_cached_verifiers([])
+    keys = ["key-%d" % i for i in range(1000)]
+
+    # Importing keys is slow, any object works as a verifier here
+    with patch.object(jwt, "_create_verifier", side_effect=lambda _: object()):  # type: ignore
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            verifiers = list(executor.map(get_verifier, keys))
+
+    assert len(verifiers) == len(keys)
+    assert len(jwt._verifiers) <= jwt._MAX_CACHED_VERIFIERS  # type: ignore # pylint: disable=protected-access
+    set_cached_verifiers([])
+
+
+@mark.benchmark
+def test_jwt_verify_benchmark():
+    key, public_key = create_signing_key()
+    token = create_signed_jwt(key, {"userId": "user", "expiryTime": 1})
+    info = parse_jwt_without_signature_verification(token)
+
+    def verify_without_cache():
+        set_cached_verifiers([])
+        verify_jwt(info, public_key)
+
+    uncached_time = time_per_call_in_us(verify_without_cache, 300)
+    set_cached_verifiers([public_key])
+    cached_time = time_per_call_in_us(lambda: verify_jwt(info, public_key), 300)
+    report("Access token signature verification", uncached_time, cached_time)
+
+    assert cached_time < uncached_time
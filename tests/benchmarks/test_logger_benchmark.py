@@ -0,0 +1,38 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import logging
+
+from pytest import mark
+
+from supertokens_python.json_codec import json_dumps
+from supertokens_python.logger import NAMESPACE, LazyLogArg, log_debug_message
+
+from .utils import compare_time_per_call_in_us, report
+
+
+@mark.benchmark
+def test_disabled_debug_logging_benchmark():
+    # SUPERTOKENS_DEBUG isn't set when running the tests
+    assert not logging.getLogger(NAMESPACE).isEnabledFor(logging.DEBUG)
+    # Like the value of a permission claim
+    value = {"v": ["permission-%d" % i for i in range(50)], "t": 1}
+
+    eager_time, lazy_time = compare_time_per_call_in_us(
+        lambda: log_debug_message("validate res %s", json_dumps(value)),
+        lambda: log_debug_message(
+            "validate res %s", LazyLogArg(lambda: json_dumps(value))
+        ),
+    )
+    report("Disabled debug log with a JSON argument", eager_time, lazy_time)
+    assert lazy_time < eager_time
@@ -0,0 +1,78 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import asyncio
+from typing import Any, Dict
+
+from pytest import mark
+
+from supertokens_python.json_codec import json_dumps
+from supertokens_python.recipe.session.claims import BooleanClaim
+from tests.sessions.utils import FakeQuerier, create_recipe_implementation
+
+from .utils import compare_time_per_call_in_us, report
+
+Claim = BooleanClaim("st-claim", lambda _, __: True)
+
+
+def create_large_payload() -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "custom-%d" % i: {"id": i, "tags": ["a", "b", "c"], "name": "x" * 20}
+        for i in range(500)
+    }
+    return Claim.add_to_payload_(payload, True)
+
+
+@mark.asyncio
+async def test_payload_update_is_only_returned_if_the_payload_changed():
+    recipe = create_recipe_implementation(FakeQuerier([]))
+    payload = create_large_payload()
+
+    result = await recipe.validate_claims(
+        "user", payload, [Claim.validators.is_true(None)], {}
+    )
+    assert result.access_token_payload_update is None
+
+    # Without the claim in the payload, it's fetched and added
+    del payload[Claim.key]
+    result = await recipe.validate_claims(
+        "user", payload, [Claim.validators.is_true(None)], {}
+    )
+    assert result.access_token_payload_update is payload
+
+
+@mark.benchmark
+def test_validate_claims_benchmark():
+    recipe = create_recipe_implementation(FakeQuerier([]))
+    payload = create_large_payload()
+    validators = [Claim.validators.is_true(None)]
+    loop = asyncio.new_event_loop()
+
+    def validate_claims():
+        loop.run_until_complete(recipe.validate_claims("user", payload, validators, {}))
+
+    def validate_claims_with_serialisation():
+        # What validate_claims used to do to find if the payload changed
+        json_dumps(payload)
+        validate_claims()
+        json_dumps(payload)
+
+    try:
+        baseline_time, optimised_time = compare_time_per_call_in_us(
+            validate_claims_with_serialisation, validate_claims, 200
+        )
+    finally:
+        loop.close()
+    report("validate_claims with a 500 key payload", baseline_time, optimised_time)
+
+    assert optimised_time < baseline_time
@@ -0,0 +1,58 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from time import perf_counter
+from typing import Any, Callable, Tuple
+
+
+def time_per_call_in_us(func: Callable[[], Any], iterations: int = 2000) -> float:
+    # Best of 3 runs, to reduce the noise from other processes
+    best = None
+    for _ in range(3):
+        start = perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    assert best is not None
+    return best / iterations * 1_000_000
+
+
+def compare_time_per_call_in_us(
+    baseline: Callable[[], Any], optimised: Callable[[], Any], iterations: int = 2000
+) -> Tuple[float, float]:
+    # For small differences: alternates between the two functions (best of 5
+    # runs each), so that the load of the machine affects both the same way
+    baseline_best = optimised_best = None
+    for _ in range(5):
+        baseline_time = time_per_call_in_us(baseline, iterations)
+        optimised_time = time_per_call_in_us(optimised, iterations)
+        baseline_best = (
+            baseline_time
+            if baseline_best is None
+            else min(baseline_best, baseline_time)
+        )
+        optimised_best = (
+            optimised_time
+            if optimised_best is None
+            else min(optimised_best, optimised_time)
+        )
+    assert baseline_best is not None and optimised_best is not None
+    return baseline_best, optimised_best
+
+
+def report(name: str, baseline_in_us: float, optimised_in_us: float):
+    print(
+        "\n%s: %.2fus -> %.2fus per call (%.1fx)"
+        % (name, baseline_in_us, optimised_in_us, baseline_in_us / optimised_in_us)
+    )
@@ -1,6 +1,29 @@
+from pytest import mark
+
+
+def pytest_addoption(parser):  # type: ignore
+    parser.addoption(  # type: ignore
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="run the timing tests marked with benchmark",
+    )
+
+
 def pytest_configure():
     import os
 
     os.environ.setdefault("SUPERTOKENS_ENV", "testing")
     os.environ.setdefault("SUPERTOKENS_PATH", "../supertokens-root")
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.Django.settings")
+
+
+def pytest_collection_modifyitems(config, items):  # type: ignore
+    # Timing comparisons are too noisy for shared CI runners, so they only run
+    # when asked for (see make benchmark)
+    if config.getoption("--run-benchmarks"):  # type: ignore
+        return
+    skip_benchmark = mark.skip(reason="needs --run-benchmarks to run")
+    for item in items:  # type: ignore
+        if "benchmark" in item.keywords:  # type: ignore
+            item.add_marker(skip_benchmark)  # type: ignore
@@ -0,0 +1,103 @@
+import asyncio
+from typing import Any, Dict, Union
+
+from pytest import mark, raises
+
+from supertokens_python.recipe.session.claims import BooleanClaim, PrimitiveClaim
+from supertokens_python.utils import get_timestamp_ms
+from tests.sessions.utils import FakeQuerier, create_recipe_implementation
+
+pytestmark = mark.asyncio
+
+
+def create_claim(key: str, value: Any, delay: float, started: Dict[str, float]):
+    async def fetch_value(_user_id: str, _user_context: Dict[str, Any]):
+        started[key] = asyncio.get_event_loop().time()
+        await asyncio.sleep(delay)
+        return value
+
+    return PrimitiveClaim[Any](key, fetch_value)
+
+
+async def test_stale_claims_are_fetched_concurrently_and_merged_in_order():
+    started: Dict[str, float] = {}
+    slow_claim = create_claim("slow", 1, 0.1, started)
+    fast_claim = create_claim("fast", 2, 0.01, started)
+    recipe = create_recipe_implementation(FakeQuerier([]))
+
+    result = await recipe.validate_claims(
+        "user",
+        {"sub": "user"},
+        [
+            slow_claim.validators.has_value(1),
+            fast_claim.validators.has_value(2),
+            slow_claim.validators.has_value(1, 600),
+        ],
+        {},
+    )
+
+    assert result.invalid_claims == []
+    assert result.access_token_payload_update is not None
+    assert list(result.access_token_payload_update) == ["sub", "slow", "fast"]
+    assert abs(started["slow"] - started["fast"]) < 0.05
+    assert set(result.claim_fetch_times_in_ms) == {"slow", "fast"}
+    fetch_times = result.claim_fetch_times_in_ms
+    assert fetch_times["fast"] < fetch_times["slow"]
+
+
+async def test_fresh_claims_are_not_fetched():
+    claim = BooleanClaim("claim", lambda _, __: True)
+    recipe = create_recipe_implementation(FakeQuerier([]))
+    payload = claim.add_to_payload_({}, True)
+
+    result = await recipe.validate_claims(
+        "user", payload, [claim.validators.is_true(None)], {}
+    )
+
+    assert result.invalid_claims == []
+    assert result.access_token_payload_update is None
+    assert result.claim_fetch_times_in_ms == {}
+
+
+async def test_fetch_errors_are_raised():
+    async def fetch_value(_user_id: str, _user_context: Dict[str, Any]):
+        raise ValueError("fetch failed")
+
+    claim = PrimitiveClaim[bool]("claim", fetch_value)
+    recipe = create_recipe_implementation(FakeQuerier([]))
+
+    with raises(ValueError) as e:
+        await recipe.validate_claims("user", {}, [claim.validators.has_value(True)], {})
+    assert str(e.value) == "fetch failed"
+
+
+class InPlaceClaim(PrimitiveClaim[int]):
+    def add_to_payload_(
+        self,
+        payload: Dict[str, Any],
+        value: int,
+        user_context: Union[Dict[str, Any], None] = None,
+    ) -> Dict[str, Any]:
+        entry = payload.setdefault(self.key, {})
+        entry["v"] = value
+        entry["t"] = get_timestamp_ms()
+        return payload
+
+
+async def test_claims_updated_in_place_are_returned_as_an_update():
+    async def fetch_value(_user_id: str, _user_context: Dict[str, Any]):
+        return 2
+
+    claim = InPlaceClaim("claim", fetch_value)
+    recipe = create_recipe_implementation(FakeQuerier([]))
+
+    result = await recipe.validate_claims(
+        "user",
+        {"sub": "user", "claim": {"v": 1, "t": 0}},
+        [claim.validators.has_value(2, 600)],
+        {},
+    )
+
+    assert result.invalid_claims == []
+    assert result.access_token_payload_update is not None
+    assert result.access_token_payload_update["claim"]["v"] == 2
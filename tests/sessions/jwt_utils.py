@@ -0,0 +1,64 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from base64 import b64encode
+from typing import Any, Dict, Tuple, Union
+
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import RSA
+from Crypto.Signature.pkcs1_15 import PKCS115_SigScheme
+
+from supertokens_python.json_codec import json_dumps
+from supertokens_python.utils import get_timestamp_ms, utf_base64encode
+
+
+def create_signing_key() -> Tuple[RSA.RsaKey, str]:
+    # Returns the key and its public key in the format sent by the core
+    key = RSA.generate(2048)
+    public_key = "".join(key.publickey().export_key("PEM").decode().splitlines()[1:-1])
+    return key, public_key
+
+
+def create_signed_jwt(key: RSA.RsaKey, payload: Dict[str, Any]) -> str:
+    header = utf_base64encode(
+        json_dumps({"alg": "RS256", "typ": "JWT", "version": "2"}, sort_keys=True)
+    )
+    body = utf_base64encode(json_dumps(payload))
+    signature = PKCS115_SigScheme(key).sign(
+        SHA256.new((header + "." + body).encode("utf-8"))
+    )
+    return header + "." + body + "." + b64encode(signature).decode()
+
+
+def create_access_token(
+    key: RSA.RsaKey,
+    session_handle: str = "session-handle",
+    user_id: str = "user-id",
+    time_created: Union[int, None] = None,
+    expiry_time: Union[int, None] = None,
+    user_data: Union[Dict[str, Any], None] = None,
+) -> str:
+    now = get_timestamp_ms()
+    return create_signed_jwt(
+        key,
+        {
+            "sessionHandle": session_handle,
+            "userId": user_id,
+            "refreshTokenHash1": "refresh-token-hash",
+            "parentRefreshTokenHash1": None,
+            "userData": user_data if user_data is not None else {},
+            "antiCsrfToken": None,
+            "expiryTime": expiry_time if expiry_time is not None else now + 3600000,
+            "timeCreated": time_created if time_created is not None else now,
+        },
+    )
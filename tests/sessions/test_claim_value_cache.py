@@ -0,0 +1,159 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import asyncio
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, patch
+
+from pytest import mark
+
+from supertokens_python.recipe.emailpassword.recipe_implementation import (
+    RecipeImplementation as EmailPasswordRecipeImplementation,
+)
+from supertokens_python.recipe.passwordless.recipe_implementation import (
+    RecipeImplementation as PasswordlessRecipeImplementation,
+)
+from supertokens_python.recipe.session import claim_value_cache
+from supertokens_python.recipe.session.claim_value_cache import (
+    ClaimValueCache,
+    with_claim_value_cache,
+)
+
+
+def test_values_expire_and_are_copied():
+    cache = ClaimValueCache(10)
+    cache.set("st-role", "user", ["admin"], 1000)
+
+    found, value = cache.get("st-role", "user")
+    assert found and value == ["admin"]
+    value.append("user")
+    assert cache.get("st-role", "user") == (True, ["admin"])
+    assert cache.get("st-role", "other-user") == (False, None)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    now = claim_value_cache.get_timestamp_ms()
+    with patch.object(claim_value_cache, "get_timestamp_ms", return_value=now + 1000):
+        assert cache.get("st-role", "user") == (False, None)
+    assert len(cache) == 0
+
+
+def test_least_recently_used_values_are_evicted():
+    cache = ClaimValueCache(2)
+    cache.set("st-role", "a", [], 1000)
+    cache.set("st-role", "b", [], 1000)
+    cache.get("st-role", "a")
+    cache.set("st-role", "c", [], 1000)
+
+    assert cache.get("st-role", "a")[0]
+    assert not cache.get("st-role", "b")[0]
+    assert cache.get("st-role", "c")[0]
+
+
+def test_invalidate():
+    cache = ClaimValueCache(10)
+    for user_id in ["a", "b"]:
+        cache.set("st-role", user_id, [], 1000)
+        cache.set("st-perm", user_id, [], 1000)
+
+    cache.invalidate(["st-role", "st-perm"], "a")
+    assert not cache.get("st-role", "a")[0]
+    assert not cache.get("st-perm", "a")[0]
+    assert cache.get("st-perm", "b")[0]
+
+    cache.invalidate(["st-perm"])
+    assert not cache.get("st-perm", "b")[0]
+    assert cache.get("st-role", "b")[0]
+
+
+@mark.asyncio
+async def test_with_claim_value_cache():
+    fetched_user_ids: List[str] = []
+
+    async def fetch_value(user_id: str, _: Dict[str, Any]) -> bool:
+        fetched_user_ids.append(user_id)
+        return user_id == "verified"
+
+    fetch = with_claim_value_cache("st-ev", fetch_value, 300, lambda value: value)
+
+    # Without a cache every call fetches the value
+    with patch.object(claim_value_cache, "get_claim_value_cache", return_value=None):
+        assert await fetch("verified", {}) is True
+        assert await fetch("verified", {}) is True
+    assert fetched_user_ids == ["verified", "verified"]
+
+    fetched_user_ids.clear()
+    cache = ClaimValueCache(10)
+    with patch.object(claim_value_cache, "get_claim_value_cache", return_value=cache):
+        for _ in range(2):
+            assert await fetch("verified", {}) is True
+            assert await fetch("unverified", {}) is False
+
+        # Only the values accepted by should_cache are cached
+        assert fetched_user_ids == ["verified", "unverified", "unverified"]
+
+        claim_value_cache.invalidate_claim_values(["st-ev"], "verified")
+        assert await fetch("verified", {}) is True
+        assert fetched_user_ids[-1] == "verified"
+
+
+@mark.asyncio
+async def test_values_fetched_before_an_invalidation_are_not_cached():
+    fetch_started = asyncio.Event()
+    write_done = asyncio.Event()
+
+    async def fetch_value(_: str, __: Dict[str, Any]) -> bool:
+        # Reads the value from before the write
+        fetch_started.set()
+        await write_done.wait()
+        return False
+
+    fetch = with_claim_value_cache("st-ev", fetch_value, 300)
+    cache = ClaimValueCache(10)
+    with patch.object(claim_value_cache, "get_claim_value_cache", return_value=cache):
+        fetch_task = asyncio.ensure_future(fetch("user", {}))
+        await fetch_started.wait()
+        # Like verify_email_using_token, once the core verified the email
+        claim_value_cache.invalidate_claim_values(["st-ev"], "user")
+        write_done.set()
+
+        assert await fetch_task is False
+    assert cache.get("st-ev", "user") == (False, None)
+
+
+@mark.asyncio
+async def test_email_updates_invalidate_the_email_verification_claim():
+    querier = AsyncMock()
+    querier.send_put_request.return_value = {"status": "OK"}
+    cache = ClaimValueCache(10)
+
+    async def update_email(user_id: str, email: Any):
+        await EmailPasswordRecipeImplementation(querier).update_email_or_password(
+            user_id, email, None, {}
+        )
+        await PasswordlessRecipeImplementation(querier).update_user(
+            user_id, email, None, {}
+        )
+
+    with patch.object(claim_value_cache, "get_claim_value_cache", return_value=cache):
+        cache.set("st-ev", "user", True, 1000)
+        await update_email("user", None)
+        assert cache.get("st-ev", "user")[0]
+
+        await update_email("user", "new@example.com")
+        assert not cache.get("st-ev", "user")[0]
+
+        cache.set("st-ev", "user", True, 1000)
+        await PasswordlessRecipeImplementation(querier).delete_email_for_user(
+            "user", {}
+        )
+        assert not cache.get("st-ev", "user")[0]
@@ -0,0 +1,191 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import asyncio
+import time
+from typing import Callable, List
+from unittest.mock import patch
+
+from pytest import mark
+
+from supertokens_python.recipe.session import recipe_implementation
+from supertokens_python.recipe.session.recipe_implementation import HandshakeInfo
+from supertokens_python.utils import get_timestamp_ms
+from tests.sessions.utils import FakeQuerier, create_recipe_implementation
+
+
+def test_handshake_info_only_rebuilds_the_key_list_when_a_key_expires():
+    now = get_timestamp_ms()
+    handshake_info = HandshakeInfo(
+        {
+            "accessTokenBlacklistingEnabled": False,
+            "antiCsrf": "NONE",
+            "accessTokenValidity": 3600,
+            "refreshTokenValidity": 144000,
+        }
+    )
+    handshake_info.set_jwt_signing_public_key_list(
+        [
+            {"publicKey": "a", "expiryTime": now + 1000, "createdAt": now},
+            {"publicKey": "b", "expiryTime": now + 2000, "createdAt": now},
+            {"publicKey": "c", "expiryTime": now - 1, "createdAt": now},
+        ]
+    )
+
+    key_list = handshake_info.get_jwt_signing_public_key_list()
+    assert [key["publicKey"] for key in key_list] == ["a", "b"]
+    assert handshake_info.get_jwt_signing_public_key_list() is key_list
+
+    with patch.object(
+        recipe_implementation, "get_timestamp_ms", return_value=now + 1000
+    ):
+        key_list = handshake_info.get_jwt_signing_public_key_list()
+        assert [key["publicKey"] for key in key_list] == ["b"]
+
+    handshake_info.set_jwt_signing_public_key_list([])
+    assert handshake_info.get_jwt_signing_public_key_list() == []
+
+
+@mark.asyncio
+async def test_concurrent_get_handshake_info_calls_share_one_request():
+    now = get_timestamp_ms()
+    querier = FakeQuerier(
+        [[{"publicKey": "a", "expiryTime": now + 60000, "createdAt": now}]]
+    )
+    recipe = create_recipe_implementation(querier)
+
+    results = await asyncio.gather(*[recipe.get_handshake_info() for _ in range(10)])
+
+    assert querier.call_count == 1
+    assert all(result is results[0] for result in results)
+
+    await recipe.get_handshake_info(True)
+    assert querier.call_count == 2
+
+
+@mark.asyncio
+async def test_signing_keys_are_refreshed_before_they_expire():
+    now = get_timestamp_ms()
+    querier = FakeQuerier(
+        [
+            [{"publicKey": "a", "expiryTime": now + 60000, "createdAt": now}],
+            [
+                {"publicKey": "b", "expiryTime": now + 3600000, "createdAt": now},
+                {"publicKey": "a", "expiryTime": now + 60000, "createdAt": now},
+            ],
+        ]
+    )
+
+    with patch.object(recipe_implementation, "MIN_SIGNING_KEYS_REFRESH_DELAY_IN_MS", 0):
+        recipe = create_recipe_implementation(
+            querier, refresh_signing_keys_before_expiry_in_ms=59950
+        )
+        await recipe.get_handshake_info()
+        assert querier.call_count == 1
+
+        await asyncio.sleep(0.2)
+
+    assert querier.call_count == 2
+    handshake_info = await recipe.get_handshake_info()
+    assert [
+        key["publicKey"] for key in handshake_info.get_jwt_signing_public_key_list()
+    ] == ["b", "a"]
+
+
+def test_startup_handshake_uses_the_sync_transport_without_an_event_loop():
+    now = get_timestamp_ms()
+    querier = FakeQuerier(
+        [[{"publicKey": "a", "expiryTime": now + 60000, "createdAt": now}]]
+    )
+
+    with patch.object(querier, "send_post_request", side_effect=AssertionError):
+        recipe = create_recipe_implementation(querier)
+
+    assert querier.call_count == 1
+    assert recipe.handshake_info is not None
+
+
+class FakeTimer:
+    def __init__(self, interval: float, function: Callable[[], None]):
+        self.interval = interval
+        self.function = function
+        self.daemon = False
+        self.cancelled = False
+
+    def start(self):
+        timers.append(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+timers: List[FakeTimer] = []
+
+
+def test_signing_keys_refresh_backs_off_while_the_core_returns_the_same_keys():
+    now = get_timestamp_ms()
+    # Already in the refresh window, but the core doesn't rotate the key yet
+    key_list = [{"publicKey": "a", "expiryTime": now + 30000, "createdAt": now}]
+    querier = FakeQuerier(
+        [
+            key_list,
+            key_list,
+            key_list,
+            [{"publicKey": "b", "expiryTime": now + 3600000, "createdAt": now}],
+        ]
+    )
+    timers.clear()
+
+    with patch.object(recipe_implementation, "Timer", FakeTimer):
+        # Without a running event loop, the handshake is done right away
+        recipe = create_recipe_implementation(
+            querier, refresh_signing_keys_before_expiry_in_ms=60000
+        )
+        assert querier.call_count == 1
+        assert [timer.interval for timer in timers] == [1]
+
+        # The keys sent with a session don't reschedule the refresh
+        recipe.update_jwt_signing_public_key_info(key_list, "a", now + 30000)
+        assert len(timers) == 1
+
+        for _ in range(3):
+            timers[-1].function()
+        assert querier.call_count == 4
+
+    assert [timer.interval for timer in timers[:3]] == [1, 2, 4]
+    # Once the key is rotated, the refresh is scheduled before the new one expires
+    assert 3500 < timers[3].interval <= 3540
+    assert all(timer.daemon for timer in timers)
+
+
+def test_signing_keys_are_refreshed_without_a_running_event_loop():
+    now = get_timestamp_ms()
+    querier = FakeQuerier(
+        [
+            [{"publicKey": "a", "expiryTime": now + 60000, "createdAt": now}],
+            [{"publicKey": "b", "expiryTime": now + 3600000, "createdAt": now}],
+        ]
+    )
+
+    with patch.object(
+        recipe_implementation, "MIN_SIGNING_KEYS_REFRESH_DELAY_IN_MS", 0
+    ), patch.object(querier, "send_post_request", side_effect=AssertionError):
+        # Like with WSGI: both the handshake and the refresh (in its own thread)
+        # use the sync transport
+        create_recipe_implementation(
+            querier, refresh_signing_keys_before_expiry_in_ms=59950
+        )
+        assert querier.call_count == 1
+        time.sleep(0.3)
+
+    assert querier.call_count == 2
@@ -0,0 +1,127 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from pytest import mark
+
+from supertokens_python.recipe.session.handshake_snapshot import (
+    load_handshake_snapshot,
+    save_handshake_snapshot,
+)
+from supertokens_python.recipe.session import recipe_implementation
+from supertokens_python.utils import get_timestamp_ms
+
+from tests.sessions.utils import FakeQuerier, create_recipe_implementation
+
+
+def create_key_list(expiry_time: int) -> List[Dict[str, Any]]:
+    return [{"publicKey": "a", "expiryTime": expiry_time, "createdAt": 0}]
+
+
+def test_saved_snapshot_is_loaded(tmp_path: Path):
+    path = str(tmp_path / "handshake.json")
+    assert load_handshake_snapshot(path) is None
+
+    key_list = create_key_list(get_timestamp_ms() + 60000)
+    save_handshake_snapshot(path, True, 3600, 144000, key_list)
+
+    assert load_handshake_snapshot(path) == {
+        "accessTokenBlacklistingEnabled": True,
+        "accessTokenValidity": 3600,
+        "refreshTokenValidity": 144000,
+        "jwtSigningPublicKeyList": key_list,
+    }
+    assert [p.name for p in tmp_path.iterdir()] == ["handshake.json"]
+
+
+def test_expired_or_invalid_snapshots_are_ignored(tmp_path: Path):
+    path = str(tmp_path / "handshake.json")
+    save_handshake_snapshot(
+        path, False, 3600, 144000, create_key_list(get_timestamp_ms() - 1)
+    )
+    assert load_handshake_snapshot(path) is None
+
+    with open(path, "w") as f:
+        f.write('{"jwtSigningPublicKeyList": [')
+    assert load_handshake_snapshot(path) is None
+
+    with open(path, "w") as f:
+        f.write('{"jwtSigningPublicKeyList": [{"publicKey": 1}]}')
+    assert load_handshake_snapshot(path) is None
+
+    valid_key = create_key_list(get_timestamp_ms() + 60000)[0]
+    for invalid_key in [
+        {"publicKey": "a", "createdAt": 0},
+        {"publicKey": "a", "expiryTime": "1", "createdAt": 0},
+        {"publicKey": "a", "expiryTime": valid_key["expiryTime"]},
+        {"publicKey": "a", "expiryTime": valid_key["expiryTime"], "createdAt": None},
+    ]:
+        save_handshake_snapshot(path, False, 3600, 144000, [valid_key, invalid_key])
+        assert load_handshake_snapshot(path) is None
+
+
+@mark.asyncio
+async def test_recipe_implementation_uses_and_saves_the_snapshot(tmp_path: Path):
+    path = str(tmp_path / "handshake.json")
+    now = get_timestamp_ms()
+    querier = FakeQuerier(
+        [[{"publicKey": "b", "expiryTime": now + 60000, "createdAt": now}]]
+    )
+
+    recipe = create_recipe_implementation(querier, handshake_snapshot_path=path)
+    await recipe.get_handshake_info()
+    assert querier.call_count == 1
+    snapshot = load_handshake_snapshot(path)
+    assert snapshot is not None
+    assert [key["publicKey"] for key in snapshot["jwtSigningPublicKeyList"]] == ["b"]
+
+    # A new process starts with the snapshot instead of doing a handshake
+    recipe = create_recipe_implementation(querier, handshake_snapshot_path=path)
+    handshake_info = await recipe.get_handshake_info()
+    assert querier.call_count == 1
+    assert handshake_info.access_token_validity == 3600
+    assert [
+        key["publicKey"] for key in handshake_info.get_jwt_signing_public_key_list()
+    ] == ["b"]
+
+
+def test_signing_keys_refresh_is_scheduled_after_loading_the_snapshot(
+    tmp_path: Path,
+):
+    path = str(tmp_path / "handshake.json")
+    now = get_timestamp_ms()
+    save_handshake_snapshot(
+        path,
+        False,
+        3600,
+        144000,
+        [{"publicKey": "a", "expiryTime": now + 60000, "createdAt": now}],
+    )
+    querier = FakeQuerier(
+        [[{"publicKey": "b", "expiryTime": now + 3600000, "createdAt": now}]]
+    )
+
+    with patch.object(recipe_implementation, "Timer") as timer:
+        create_recipe_implementation(
+            querier,
+            handshake_snapshot_path=path,
+            refresh_signing_keys_before_expiry_in_ms=50000,
+        )
+
+    assert querier.call_count == 0
+    interval = timer.call_args[0][0]
+    assert 9.9 < interval <= 10
+    timer.return_value.start.assert_called_once_with()
@@ -0,0 +1,124 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import asyncio
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from pytest import mark, raises
+
+from supertokens_python.recipe.session import refresh_coalescer
+from supertokens_python.recipe.session.exceptions import UnauthorisedError
+from supertokens_python.recipe.session.refresh_coalescer import (
+    RefreshSessionCoalescer,
+)
+from supertokens_python.utils import get_timestamp_ms
+from tests.sessions.utils import FakeQuerier, create_recipe_implementation
+
+KEY = RefreshSessionCoalescer.get_key("refresh-token", None, True, "header")
+
+
+class FakeRefresh:
+    def __init__(self, errors: List[Exception]):
+        self.errors = errors
+        self.call_count = 0
+
+    async def __call__(self) -> Dict[str, Any]:
+        self.call_count += 1
+        await asyncio.sleep(0.01)
+        if self.call_count <= len(self.errors):
+            raise self.errors[self.call_count - 1]
+        return {"accessToken": {"token": "token-%d" % self.call_count}}
+
+
+def test_key_depends_on_the_whole_request():
+    assert KEY == RefreshSessionCoalescer.get_key("refresh-token", None, True, "header")
+    assert KEY != RefreshSessionCoalescer.get_key("refresh-token", "", False, "header")
+    assert KEY != RefreshSessionCoalescer.get_key("refresh-token", None, True, "cookie")
+    assert KEY != RefreshSessionCoalescer.get_key("other-token", None, True, "header")
+
+
+@mark.asyncio
+async def test_concurrent_refreshes_share_one_call():
+    coalescer = RefreshSessionCoalescer(0)
+    refresh = FakeRefresh([])
+
+    results = await asyncio.gather(*[coalescer.refresh(KEY, refresh) for _ in range(5)])
+
+    assert refresh.call_count == 1
+    assert all(result == {"accessToken": {"token": "token-1"}} for result in results)
+    assert results[0] is not results[1]
+    assert (coalescer.hits, coalescer.misses) == (4, 1)
+
+    # Without a window, the result isn't reused once the refresh is done
+    await coalescer.refresh(KEY, refresh)
+    assert refresh.call_count == 2
+
+
+@mark.asyncio
+async def test_result_is_reused_within_the_window():
+    coalescer = RefreshSessionCoalescer(1000)
+    refresh = FakeRefresh([])
+
+    assert await coalescer.refresh(KEY, refresh) == {
+        "accessToken": {"token": "token-1"}
+    }
+    assert await coalescer.refresh(KEY, refresh) == {
+        "accessToken": {"token": "token-1"}
+    }
+    assert refresh.call_count == 1
+
+    now = refresh_coalescer.get_timestamp_ms()
+    with patch.object(refresh_coalescer, "get_timestamp_ms", return_value=now + 1000):
+        assert await coalescer.refresh(KEY, refresh) == {
+            "accessToken": {"token": "token-2"}
+        }
+    assert refresh.call_count == 2
+
+
+@mark.asyncio
+async def test_only_session_errors_are_reused():
+    coalescer = RefreshSessionCoalescer(1000)
+    refresh = FakeRefresh([ConnectionError(), UnauthorisedError("unauthorised")])
+
+    with raises(ConnectionError):
+        await coalescer.refresh(KEY, refresh)
+
+    errors: List[UnauthorisedError] = []
+    for _ in range(2):
+        with raises(UnauthorisedError) as e:
+            await coalescer.refresh(KEY, refresh)
+        errors.append(e.value)
+
+    assert refresh.call_count == 2
+    assert errors[0] is not errors[1]
+    errors[0].response_mutators.append(lambda _: None)
+    assert errors[0].response_mutators != errors[1].response_mutators
+
+
+def test_coalescing_window_is_an_opt_in_option_of_session_init():
+    now = get_timestamp_ms()
+    querier = FakeQuerier(
+        [[{"publicKey": "a", "expiryTime": now + 60000, "createdAt": now}]]
+    )
+
+    assert create_recipe_implementation(querier).refresh_session_coalescer is None
+    recipe = create_recipe_implementation(
+        querier, refresh_session_coalescing_window_in_ms=0
+    )
+    assert recipe.refresh_session_coalescer is not None
+
+    with raises(ValueError):
+        create_recipe_implementation(
+            querier, refresh_session_coalescing_window_in_ms=-1
+        )
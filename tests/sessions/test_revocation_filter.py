@@ -0,0 +1,108 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from typing import Any, Dict
+from unittest.mock import patch
+
+from pytest import mark
+
+from supertokens_python.recipe.session import revocation_filter, session_functions
+from supertokens_python.recipe.session.jwt import (
+    parse_jwt_without_signature_verification,
+)
+from supertokens_python.recipe.session.revocation_filter import (
+    SessionRevocationFilter,
+)
+from supertokens_python.utils import get_timestamp_ms
+from tests.sessions.jwt_utils import create_access_token, create_signing_key
+from tests.sessions.utils import FakeQuerier, create_recipe_implementation
+
+
+def test_revocation_filter_expires_verifications_and_honours_revocations():
+    now = get_timestamp_ms()
+    revocation_filter_ = SessionRevocationFilter(1000)
+    revocation_filter_.set_verified("a")
+    assert revocation_filter_.is_recently_verified("a")
+    assert not revocation_filter_.is_recently_verified("b")
+
+    with patch.object(revocation_filter, "get_timestamp_ms", return_value=now + 1000):
+        assert not revocation_filter_.is_recently_verified("a")
+
+    revocation_filter_.set_verified("a")
+    revocation_filter_.set_revoked(["a"])
+    assert not revocation_filter_.is_recently_verified("a")
+    # For example a verification that was in flight during the revocation
+    revocation_filter_.set_verified("a")
+    assert not revocation_filter_.is_recently_verified("a")
+    assert (revocation_filter_.hits, revocation_filter_.misses) == (1, 4)
+
+
+@mark.asyncio
+async def test_get_session_only_asks_the_core_about_sessions_not_recently_verified():
+    now = get_timestamp_ms()
+    key, public_key = create_signing_key()
+    key_list = [
+        {"publicKey": public_key, "expiryTime": now + 60000, "createdAt": now - 1000}
+    ]
+
+    def verify_session(_: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "OK",
+            "session": {
+                "handle": "session-handle",
+                "userId": "user-id",
+                "userDataInJWT": {},
+            },
+            "jwtSigningPublicKeyList": key_list,
+            "jwtSigningPublicKey": public_key,
+            "jwtSigningPublicKeyExpiryTime": now + 60000,
+        }
+
+    def remove_sessions(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"sessionHandlesRevoked": data["sessionHandles"]}
+
+    querier = FakeQuerier(
+        [key_list],
+        {
+            "/recipe/session/verify": verify_session,
+            "/recipe/session/remove": remove_sessions,
+        },
+        access_token_blacklisting_enabled=True,
+    )
+    recipe_implementation = create_recipe_implementation(
+        querier, revocation_filter_max_staleness_in_ms=60000
+    )
+    token = create_access_token(key)
+
+    async def get_session():
+        res = await session_functions.get_session(
+            recipe_implementation,
+            parse_jwt_without_signature_verification(token),
+            None,
+            False,
+            False,
+        )
+        assert res["session"]["handle"] == "session-handle"
+
+    await get_session()
+    await get_session()
+    await get_session()
+    assert querier.paths == ["/recipe/session/verify"]
+
+    await session_functions.revoke_session(recipe_implementation, "session-handle")
+    await get_session()
+    assert querier.paths == [
+        "/recipe/session/verify",
+        "/recipe/session/remove",
+        "/recipe/session/verify",
+    ]
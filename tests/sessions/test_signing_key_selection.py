@@ -0,0 +1,143 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import sys
+import threading
+from time import monotonic
+from typing import List
+from unittest.mock import patch
+
+from pytest import mark
+
+from supertokens_python.recipe.session import session_functions
+from supertokens_python.recipe.session.jwt import (
+    parse_jwt_without_signature_verification,
+)
+from supertokens_python.recipe.session.recipe_implementation import HandshakeInfo
+from supertokens_python.utils import get_timestamp_ms
+from tests.sessions.jwt_utils import create_access_token, create_signing_key
+from tests.sessions.utils import FakeQuerier, create_recipe_implementation
+
+
+def test_signing_key_is_looked_up_by_the_time_the_token_was_created():
+    now = get_timestamp_ms()
+    handshake_info = HandshakeInfo(
+        {
+            "accessTokenBlacklistingEnabled": False,
+            "antiCsrf": "NONE",
+            "accessTokenValidity": 3600,
+            "refreshTokenValidity": 144000,
+        }
+    )
+    handshake_info.set_jwt_signing_public_key_list(
+        [
+            {"publicKey": "new", "expiryTime": now + 20000, "createdAt": now - 1000},
+            {"publicKey": "old", "expiryTime": now + 10000, "createdAt": now - 2000},
+        ]
+    )
+
+    def get_key(time_created: int):
+        key = handshake_info.get_jwt_signing_public_key_for_access_token(time_created)
+        return None if key is None else key["publicKey"]
+
+    assert get_key(now) == "new"
+    assert get_key(now - 1000) == "new"
+    assert get_key(now - 1500) == "old"
+    assert get_key(now - 3000) is None
+
+
+def test_signing_key_lookups_are_consistent_while_the_keys_change():
+    now = get_timestamp_ms()
+    handshake_info = HandshakeInfo(
+        {
+            "accessTokenBlacklistingEnabled": False,
+            "antiCsrf": "NONE",
+            "accessTokenValidity": 3600,
+            "refreshTokenValidity": 144000,
+        }
+    )
+    key_lists = [
+        [{"publicKey": "a", "expiryTime": now + 60000, "createdAt": now - 1000}],
+        [
+            {"publicKey": "c", "expiryTime": now + 60000, "createdAt": now - i}
+            for i in range(1, 5000)
+        ],
+    ]
+    handshake_info.set_jwt_signing_public_key_list(key_lists[0])
+    done = threading.Event()
+    errors: List[BaseException] = []
+
+    def look_up_keys():
+        try:
+            while not done.is_set():
+                key = handshake_info.get_jwt_signing_public_key_for_access_token(now)
+                assert key is not None and key["publicKey"] in ("a", "c")
+        except BaseException as e:  # pylint: disable=broad-except
+            errors.append(e)
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    readers = [threading.Thread(target=look_up_keys) for _ in range(4)]
+    try:
+        for reader in readers:
+            reader.start()
+        deadline = monotonic() + 1
+        i = 0
+        while monotonic() < deadline:
+            i += 1
+            handshake_info.set_jwt_signing_public_key_list(key_lists[i % 2])
+    finally:
+        done.set()
+        for reader in readers:
+            reader.join()
+        sys.setswitchinterval(switch_interval)
+
+    assert not errors, errors
+
+
+@mark.asyncio
+async def test_get_session_only_tries_the_key_the_token_was_signed_with():
+    now = get_timestamp_ms()
+    old_key, old_public_key = create_signing_key()
+    _, new_public_key = create_signing_key()
+    key_list = [
+        {
+            "publicKey": new_public_key,
+            "expiryTime": now + 20000,
+            "createdAt": now - 1000,
+        },
+        {
+            "publicKey": old_public_key,
+            "expiryTime": now + 10000,
+            "createdAt": now - 2000,
+        },
+    ]
+    recipe_implementation = create_recipe_implementation(FakeQuerier([key_list]))
+
+    for time_created, expected_call_count in ((now - 1500, 1), (now - 3000, 2)):
+        # The second token is older than all the keys, so they are all tried
+        token = create_access_token(old_key, time_created=time_created)
+        with patch.object(
+            session_functions,
+            "get_info_from_access_token",
+            wraps=session_functions.get_info_from_access_token,
+        ) as get_info_from_access_token:
+            res = await session_functions.get_session(
+                recipe_implementation,
+                parse_jwt_without_signature_verification(token),
+                None,
+                False,
+                False,
+            )
+        assert res["session"]["handle"] == "session-handle"
+        assert get_info_from_access_token.call_count == expected_call_count
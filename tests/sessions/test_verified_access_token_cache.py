@@ -0,0 +1,79 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from unittest.mock import patch
+
+from pytest import mark
+
+from supertokens_python.recipe.session import session_functions
+from supertokens_python.recipe.session.access_token_cache import (
+    VerifiedAccessTokenCache,
+)
+from supertokens_python.recipe.session.jwt import (
+    parse_jwt_without_signature_verification,
+)
+from supertokens_python.utils import get_timestamp_ms
+from tests.sessions.jwt_utils import create_access_token, create_signing_key
+from tests.sessions.utils import FakeQuerier, create_recipe_implementation
+
+pytestmark = mark.asyncio
+
+
+def test_verified_access_token_cache_is_bounded_and_respects_expiry():
+    cache = VerifiedAccessTokenCache(2)
+    now = get_timestamp_ms()
+    cache.set("a", {"expiryTime": now + 10000})
+    cache.set("b", {"expiryTime": now - 1})
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    cache.set("c", {"expiryTime": now + 10000})
+    cache.set("d", {"expiryTime": now + 10000})
+    assert cache.get("a") is None
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+async def test_get_session_verifies_a_token_only_once():
+    key, public_key = create_signing_key()
+    now = get_timestamp_ms()
+    recipe_implementation = create_recipe_implementation(
+        FakeQuerier(
+            [[{"publicKey": public_key, "expiryTime": now + 10000, "createdAt": now}]]
+        ),
+        verified_access_token_cache_size=10,
+    )
+    token = create_access_token(key, user_data={"role": "admin"})
+
+    with patch.object(
+        session_functions,
+        "get_info_from_access_token",
+        wraps=session_functions.get_info_from_access_token,
+    ) as get_info_from_access_token:
+        for _ in range(3):
+            res = await session_functions.get_session(
+                recipe_implementation,
+                parse_jwt_without_signature_verification(token),
+                None,
+                False,
+                False,
+            )
+            assert res["session"] == {
+                "handle": "session-handle",
+                "userId": "user-id",
+                "userDataInJWT": {"role": "admin"},
+            }
+
+    assert get_info_from_access_token.call_count == 1
+    cache = recipe_implementation.verified_access_token_cache
+    assert cache is not None
+    assert (cache.hits, cache.misses) == (2, 1)
@@ -0,0 +1,137 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Union
+
+from pytest import mark
+
+from supertokens_python.recipe.session import session_functions
+from supertokens_python.recipe.session.exceptions import (
+    TryRefreshTokenError,
+    UnauthorisedError,
+)
+from supertokens_python.recipe.session.interfaces import SessionContainer
+from supertokens_python.recipe.session.jwt import (
+    parse_jwt_without_signature_verification,
+)
+from supertokens_python.utils import get_timestamp_ms
+from tests.sessions.jwt_utils import create_access_token, create_signing_key
+from tests.sessions.utils import FakeQuerier, create_recipe_implementation
+
+pytestmark = mark.asyncio
+
+
+def verify_session(_: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "status": "TRY_REFRESH_TOKEN",
+        "message": "invalid access token",
+        "jwtSigningPublicKeyList": None,
+        "jwtSigningPublicKey": None,
+        "jwtSigningPublicKeyExpiryTime": None,
+    }
+
+
+@mark.parametrize("executor_class", [None, ThreadPoolExecutor, ProcessPoolExecutor])
+async def test_batch_results_match_get_session(executor_class: Any):
+    now = get_timestamp_ms()
+    key, public_key = create_signing_key()
+    other_key, _ = create_signing_key()
+    querier = FakeQuerier(
+        [
+            [
+                {
+                    "publicKey": public_key,
+                    "expiryTime": now + 60000,
+                    "createdAt": now - 1000,
+                }
+            ]
+        ],
+        {"/recipe/session/verify": verify_session},
+    )
+    recipe_implementation = create_recipe_implementation(
+        querier, verified_access_token_cache_size=10
+    )
+    tokens = [
+        create_access_token(key, user_id="user-1"),
+        create_access_token(other_key, user_id="user-2"),
+        create_access_token(key, user_id="user-3", expiry_time=now - 1),
+        create_access_token(key, user_id="user-4"),
+    ]
+    parsed_access_tokens = [
+        parse_jwt_without_signature_verification(token) for token in tokens
+    ]
+
+    executor: Union[Executor, None] = (
+        None if executor_class is None else executor_class(max_workers=2)
+    )
+    try:
+        results = await session_functions.get_sessions_batch(
+            recipe_implementation, parsed_access_tokens, executor
+        )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    assert [result["session"]["userId"] for result in results[::3]] == [  # type: ignore
+        "user-1",
+        "user-4",
+    ]
+    # Signed with an unknown key / expired, so they are verified by the core
+    assert isinstance(results[1], TryRefreshTokenError)
+    assert isinstance(results[2], TryRefreshTokenError)
+    assert querier.paths == ["/recipe/session/verify", "/recipe/session/verify"]
+    cache = recipe_implementation.verified_access_token_cache
+    assert cache is not None and len(cache) == 2
+
+    for parsed_access_token, result in zip(parsed_access_tokens, results):
+        try:
+            expected = await session_functions.get_session(
+                recipe_implementation,
+                parsed_access_token,
+                None,
+                False,
+                False,
+            )
+        except Exception as e:
+            expected = e
+        assert type(result) is type(expected)
+        if isinstance(expected, dict):
+            assert result == expected
+
+
+async def test_recipe_implementation_returns_sessions_and_errors_in_order():
+    now = get_timestamp_ms()
+    key, public_key = create_signing_key()
+    recipe_implementation = create_recipe_implementation(
+        FakeQuerier(
+            [
+                [
+                    {
+                        "publicKey": public_key,
+                        "expiryTime": now + 60000,
+                        "createdAt": now - 1000,
+                    }
+                ]
+            ]
+        )
+    )
+
+    results = await recipe_implementation.verify_access_tokens_batch(
+        [create_access_token(key, user_id="user-1"), "not-a-token"], None, {}
+    )
+
+    assert isinstance(results[0], SessionContainer)
+    assert results[0].get_user_id() == "user-1"
+    assert results[0].transfer_method == "header"
+    assert isinstance(results[1], UnauthorisedError)
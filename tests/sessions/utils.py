@@ -0,0 +1,95 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import asyncio
+from typing import Any, Callable, Dict, List, Union
+from unittest.mock import patch
+
+from supertokens_python.normalised_url_path import NormalisedURLPath
+from supertokens_python.querier import Querier
+from supertokens_python.recipe.session.recipe import SessionRecipe
+from supertokens_python.recipe.session.recipe_implementation import (
+    RecipeImplementation,
+)
+from supertokens_python.supertokens import AppInfo
+
+
+class FakeQuerier:
+    """
+    Answers handshakes with the next of key_lists (the last one is repeated)
+    and other requests with responses[path](data).
+    """
+
+    def __init__(
+        self,
+        key_lists: List[List[Dict[str, Any]]],
+        responses: Union[
+            Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]], None
+        ] = None,
+        access_token_blacklisting_enabled: bool = False,
+    ):
+        self.key_lists = key_lists
+        self.responses = {} if responses is None else responses
+        self.access_token_blacklisting_enabled = access_token_blacklisting_enabled
+        self.call_count = 0
+        self.paths: List[str] = []
+
+    async def send_post_request(
+        self, path: NormalisedURLPath, data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if path.get_as_string_dangerous() == "/recipe/handshake":
+            await asyncio.sleep(0.01)
+        return self.send_post_request_sync(path, data)
+
+    def send_post_request_sync(
+        self, path: NormalisedURLPath, data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if path.get_as_string_dangerous() != "/recipe/handshake":
+            self.paths.append(path.get_as_string_dangerous())
+            return self.responses[path.get_as_string_dangerous()](data)
+
+        key_list = self.key_lists[min(self.call_count, len(self.key_lists) - 1)]
+        self.call_count += 1
+        return {
+            "accessTokenBlacklistingEnabled": self.access_token_blacklisting_enabled,
+            "accessTokenValidity": 3600,
+            "refreshTokenValidity": 144000,
+            "jwtSigningPublicKeyList": key_list,
+            "jwtSigningPublicKey": key_list[0]["publicKey"],
+            "jwtSigningPublicKeyExpiryTime": key_list[0]["expiryTime"],
+        }
+
+
+app_info = AppInfo(
+    app_name="ST",
+    api_domain="http://api.supertokens.io",
+    website_domain="http://supertokens.io",
+    framework="fastapi",
+    api_gateway_path="",
+    api_base_path="/auth",
+    website_base_path="/auth",
+    mode="asgi",
+)
+
+
+def create_recipe_implementation(
+    querier: FakeQuerier, **kwargs: Any
+) -> RecipeImplementation:
+    """
+    Returns the implementation of a session recipe configured like with
+    session.init(**kwargs), that sends its requests to querier.
+    """
+    with patch.object(Querier, "get_instance", return_value=querier):
+        recipe = SessionRecipe(SessionRecipe.recipe_id, app_info, **kwargs)
+    assert isinstance(recipe.recipe_implementation, RecipeImplementation)
+    return recipe.recipe_implementation
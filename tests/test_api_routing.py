@@ -0,0 +1,181 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from contextlib import ExitStack
+from typing import Dict, Optional, Tuple, Union
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pytest import fixture, mark
+
+from supertokens_python import InputAppInfo, Supertokens, SupertokensConfig, init
+from supertokens_python.normalised_url_path import NormalisedURLPath
+from supertokens_python.recipe import dashboard, emailpassword, session
+from supertokens_python.recipe.dashboard import DashboardRecipe
+from supertokens_python.recipe.emailpassword import EmailPasswordRecipe
+from supertokens_python.recipe.session import SessionRecipe
+from supertokens_python.recipe.session.interfaces import APIInterface
+
+pytestmark = mark.asyncio
+
+
+def override_session_apis(original_implementation: APIInterface) -> APIInterface:
+    original_implementation.disable_signout_post = True
+    return original_implementation
+
+
+def init_supertokens(api_gateway_path: str = ""):
+    init(
+        supertokens_config=SupertokensConfig("http://localhost:3567"),
+        app_info=InputAppInfo(
+            app_name="SuperTokens Demo",
+            api_domain="https://api.supertokens.io",
+            website_domain="https://supertokens.io",
+            api_gateway_path=api_gateway_path,
+            api_base_path="/auth",
+        ),
+        framework="fastapi",
+        recipe_list=[
+            emailpassword.init(),
+            dashboard.init(api_key="test"),
+            session.init(
+                override=session.InputOverrideConfig(apis=override_session_apis)
+            ),
+        ],
+    )
+
+
+def reset_supertokens():
+    for recipe in [SessionRecipe, EmailPasswordRecipe, DashboardRecipe]:
+        recipe.reset()
+    Supertokens.reset()
+
+
+@fixture(autouse=True)
+def supertokens_init():  # type: ignore
+    init_supertokens()
+    yield
+    reset_supertokens()
+
+
+async def route(
+    path: str, method: str, rid: Optional[str] = None
+) -> Union[Tuple[str, str], None]:
+    """Returns the recipe ID and request ID of the API that handled the request"""
+    request = MagicMock()
+    request.get_path.return_value = path
+    request.method.return_value = method
+    request.get_header.side_effect = lambda key: rid if key == "rid" else None  # type: ignore
+
+    handle_api_requests: Dict[str, AsyncMock] = {}
+    with ExitStack() as stack:
+        for recipe in Supertokens.get_instance().recipe_modules:
+            handle_api_requests[recipe.get_recipe_id()] = stack.enter_context(
+                patch.object(recipe, "handle_api_request", AsyncMock())
+            )
+        response = await Supertokens.get_instance().middleware(request, MagicMock())
+
+    handled = [
+        (recipe_id, handle_api_request.call_args[0][0])
+        for recipe_id, handle_api_request in handle_api_requests.items()
+        if handle_api_request.called
+    ]
+    if response is None:
+        assert handled == []
+        return None
+    assert len(handled) == 1
+    return handled[0]
+
+
+async def test_requests_are_routed_to_the_recipe_api():
+    assert await route("/auth/signin", "POST") == ("emailpassword", "/signin")
+    assert await route("/auth/signin/", "post") == ("emailpassword", "/signin")
+    assert await route("/auth/session/refresh", "post") == (
+        "session",
+        "/session/refresh",
+    )
+    assert await route("/auth/dashboard", "get") == ("dashboard", "/dashboard")
+    assert await route("/auth/dashboard/api/key/validate", "post") == (
+        "dashboard",
+        "/api/key/validate",
+    )
+
+
+async def test_requests_are_not_routed_to_unknown_or_disabled_apis():
+    assert await route("/auth/signin", "get") is None
+    assert await route("/auth/unknown", "post") is None
+    assert await route("/signin", "post") is None
+    assert await route("/auth/signout", "post") is None
+
+
+async def test_rid_restricts_routing_to_its_recipe():
+    assert await route("/auth/signin", "post", "emailpassword") == (
+        "emailpassword",
+        "/signin",
+    )
+    assert await route("/auth/signin", "post", "session") is None
+    assert await route("/auth/signin", "post", "unknown") is None
+    # The anti-csrf rid is ignored
+    assert await route("/auth/signin", "post", "anti-csrf") == (
+        "emailpassword",
+        "/signin",
+    )
+
+
+async def test_request_paths_are_normalised_before_routing():
+    for path in [
+        "/AUTH/SignIn",
+        "  /auth/signin",
+        "/auth/signin/?redirect=/auth",
+        "/auth/signin#hash",
+        "/au\tth/signin",
+        "auth/signin",
+        "https://api.supertokens.io/auth/signin",
+    ]:
+        assert await route(path, "post") == ("emailpassword", "/signin")
+
+    for path in ["/other/auth/signin", "/aut", "/", "", "/?/auth/signin", "other"]:
+        assert await route(path, "post") is None
+
+
+async def test_requests_outside_the_api_base_path_are_not_normalised():
+    with patch(
+        "supertokens_python.supertokens.NormalisedURLPath",
+        side_effect=NormalisedURLPath,
+    ) as normalised_url_path:
+        assert await route("/other/path", "post") is None
+        assert await route("/Other/auth", "post") is None
+        normalised_url_path.assert_not_called()
+
+        assert await route("/auth/other", "post") is None
+        normalised_url_path.assert_called()
+
+
+async def test_requests_are_routed_with_the_api_gateway_path():
+    reset_supertokens()
+    init_supertokens("/gateway")
+
+    assert await route("/auth/signin", "post") == ("emailpassword", "/signin")
+    assert await route("/Auth/signin/", "post") == ("emailpassword", "/signin")
+    assert await route("/gateway/auth/signin", "post") is None
+    assert await route("/other", "post") is None
+
+
+def test_recipe_api_routes():
+    routes = SessionRecipe.get_instance().get_api_routes()
+    assert routes == {("post", "/auth/session/refresh"): "/session/refresh"}
+    assert (
+        SessionRecipe.get_instance().return_api_id_if_can_handle_request(
+            NormalisedURLPath("/auth/session/refresh"), "post"
+        )
+        == "/session/refresh"
+    )
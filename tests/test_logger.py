@@ -1,10 +1,16 @@
 import json
+import logging
 from datetime import datetime as real_datetime
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
 from supertokens_python.constants import VERSION
-from supertokens_python.logger import log_debug_message, streamFormatter
+from supertokens_python.logger import (
+    NAMESPACE,
+    LazyLogArg,
+    log_debug_message,
+    streamFormatter,
+)
 
 
 class LoggerTests(TestCase):
@@ -22,7 +28,7 @@ class LoggerTests(TestCase):
             "t": "2000-01-01T00:00Z",
             "sdkVer": VERSION,
             "message": "API replied with status 200",
-            "file": "../tests/test_logger.py:16",
+            "file": "../tests/test_logger.py:22",
         }
 
     @staticmethod
@@ -31,3 +37,25 @@ class LoggerTests(TestCase):
             streamFormatter._fmt  # pylint: disable=protected-access
             == "{name} {message}\n"
         )
+
+    def test_lazy_args_are_only_computed_when_logged(self):
+        computed: "list[str]" = []
+
+        def compute() -> str:
+            computed.append("value")
+            return "value"
+
+        with self.assertLogs(level="DEBUG") as captured:
+            log_debug_message("Lazy %s", LazyLogArg(compute))
+        assert json.loads(captured.records[0].getMessage())["message"] == "Lazy value"
+        assert len(computed) > 0
+
+        logger = logging.getLogger(NAMESPACE)
+        level = logger.level
+        logger.setLevel(logging.INFO)
+        try:
+            computed.clear()
+            log_debug_message("Lazy %s", LazyLogArg(compute))
+            assert not computed
+        finally:
+            logger.setLevel(level)
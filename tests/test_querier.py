@@ -0,0 +1,622 @@
+# Copyright (c) 2023, VRAI Labs and/or its affiliates. All rights reserved.
+#
+# This software is licensed under the Apache License, Version 2.0 (the
+# "License") as published by the Apache Software Foundation.
+#
+# You may not use this file except in compliance with the License. You may
+# obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import asyncio
+import threading
+from typing import Any, List
+from unittest.mock import patch
+
+import httpx
+import respx
+from pytest import mark, raises
+
+from supertokens_python import querier as querier_module
+from supertokens_python.exceptions import GeneralError
+from supertokens_python.host_selector import (
+    HealthAwareHostSelector,
+    HostSelector,
+    RoundRobinHostSelector,
+)
+from supertokens_python.normalised_url_domain import NormalisedURLDomain
+from supertokens_python.normalised_url_path import NormalisedURLPath
+from supertokens_python.process_state import ProcessState
+from supertokens_python.querier import CoreRequest, Querier
+from supertokens_python.request_hedging import HedgingConfig
+from supertokens_python.request_observer import (
+    CoreRequestEvent,
+    CoreRequestObserver,
+    LatencyHistogramRegistry,
+)
+from supertokens_python.response_cache import (
+    InMemoryLRUResponseCache,
+    ResponseCacheConfig,
+)
+from supertokens_python.retry_policy import RetryPolicy
+from supertokens_python.supertokens import Host
+
+pytestmark = mark.asyncio
+
+CORE_1 = "http://localhost:3567"
+CORE_2 = "http://localhost:3568"
+
+
+def init_querier(connection_uris: List[str], **kwargs: Any):
+    ProcessState.get_instance().reset()
+    Querier.reset()
+    hosts = [
+        Host(NormalisedURLDomain(h), NormalisedURLPath(h)) for h in connection_uris
+    ]
+    Querier.init(hosts, None, **kwargs)
+
+
+class InOrderHostSelector(HostSelector):
+    def get_hosts_in_order_of_preference(self, hosts: List[Host]) -> List[Host]:
+        return hosts
+
+
+def mock_api_version(mocker: respx.MockRouter, host: str = CORE_1):
+    mocker.get(host + "/apiversion").mock(
+        return_value=httpx.Response(200, json={"versions": ["2.20"]})
+    )
+
+
+async def test_querier_reuses_a_pooled_client_across_requests():
+    init_querier([CORE_1], max_connections=5)
+    created: List[httpx.AsyncClient] = []
+    original_client = querier_module.AsyncClient
+
+    def create_client(*args: Any, **kwargs: Any):
+        client = original_client(*args, **kwargs)
+        created.append(client)
+        return client
+
+    with respx.mock() as mocker, patch.object(
+        querier_module, "AsyncClient", side_effect=create_client
+    ):
+        mock_api_version(mocker)
+        mocker.get(CORE_1 + "/recipe/user").mock(
+            return_value=httpx.Response(200, json={"status": "OK"})
+        )
+        mocker.post(CORE_1 + "/recipe/session").mock(
+            return_value=httpx.Response(200, json={"status": "OK"})
+        )
+
+        querier = Querier.get_instance()
+        await querier.send_get_request(NormalisedURLPath("/recipe/user"), {})
+        await querier.send_post_request(NormalisedURLPath("/recipe/session"), {})
+        await querier.send_get_request(NormalisedURLPath("/recipe/user"), {})
+
+    assert len(created) == 1
+    await Querier.close()
+    assert created[0].is_closed
+
+
+def run_on_new_loop(coro: Any, shutdown: bool = True) -> asyncio.AbstractEventLoop:
+    # Runs coro on a new loop in another thread, shutting it down like
+    # asyncio.run does. nest_asyncio (applied to the tests) replaces asyncio.run
+    # and makes run_until_complete skip the async generator hooks of the loop,
+    # so this goes through run_forever instead.
+    loop = asyncio.new_event_loop()
+
+    def run():
+        task = loop.create_task(coro)
+        task.add_done_callback(lambda _: loop.stop())
+        loop.run_forever()
+        task.result()
+        if shutdown:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return loop
+
+
+async def test_querier_closes_the_client_of_a_loop_when_it_is_shut_down():
+    init_querier([CORE_1])
+    created: List[httpx.AsyncClient] = []
+    original_client = querier_module.AsyncClient
+
+    def create_client(*args: Any, **kwargs: Any):
+        client = original_client(*args, **kwargs)
+        created.append(client)
+        return client
+
+    with respx.mock() as mocker, patch.object(
+        querier_module, "AsyncClient", side_effect=create_client
+    ):
+        mock_api_version(mocker)
+        mocker.get(CORE_1 + "/recipe/user").mock(
+            return_value=httpx.Response(200, json={"status": "OK"})
+        )
+        querier = Querier.get_instance()
+
+        run_on_new_loop(querier.send_get_request(NormalisedURLPath("/recipe/user"), {}))
+        assert len(created) == 1
+        assert created[0].is_closed
+
+        idle_loop = run_on_new_loop(
+            querier.send_get_request(NormalisedURLPath("/recipe/user"), {}),
+            shutdown=False,
+        )
+        assert len(created) == 2
+        assert not created[1].is_closed
+
+    await Querier.close()
+    assert created[1].is_closed
+    idle_loop.close()
+
+
+async def test_round_robin_host_selector_rotates_over_hosts():
+    init_querier([CORE_1, CORE_2], host_selector=RoundRobinHostSelector())
+    with respx.mock(assert_all_called=False) as mocker:
+        mock_api_version(mocker)
+        mock_api_version(mocker, CORE_2)
+        route_1 = mocker.get(CORE_1 + "/recipe/user").mock(
+            return_value=httpx.Response(200, json={"status": "OK"})
+        )
+        route_2 = mocker.get(CORE_2 + "/recipe/user").mock(
+            return_value=httpx.Response(200, json={"status": "OK"})
+        )
+
+        querier = Querier.get_instance()
+        await querier.get_api_version()
+        for _ in range(4):
+            await querier.send_get_request(NormalisedURLPath("/recipe/user"), {})
+
+    assert route_1.call_count == 2
+    assert route_2.call_count == 2
+
+
+async def test_health_aware_host_selector_skips_host_with_open_circuit():
+    selector = HealthAwareHostSelector(
+        failure_threshold=2, open_circuit_duration_ms=60000
+    )
+    init_querier([CORE_1, CORE_2], host_selector=selector)
+    with respx.mock() as mocker:
+        mocker.get(CORE_1 + "/apiversion").mock(side_effect=httpx.ConnectError)
+        mock_api_version(mocker, CORE_2)
+        route_1 = mocker.get(CORE_1 + "/recipe/user").mock(
+            side_effect=httpx.ConnectError
+        )
+        route_2 = mocker.get(CORE_2 + "/recipe/user").mock(
+            return_value=httpx.Response(200, json={"status": "OK"})
+        )
+
+        querier = Querier.get_instance()
+        for _ in range(5):
+            res = await querier.send_get_request(NormalisedURLPath("/recipe/user"), {})
+            assert res == {"status": "OK"}
+
+    # one failure while fetching the api version + one on the first request
+    # opens the circuit, after which core 1 is no longer contacted
+    assert route_1.call_count == 1
+    assert route_2.call_count == 5
+
+
+def test_health_aware_host_selector_prefers_lower_latency_and_probes():
+    hosts = [
+        Host(NormalisedURLDomain(h), NormalisedURLPath(h)) for h in [CORE_1, CORE_2]
+    ]
+    selector = HealthAwareHostSelector(failure_threshold=1, open_circuit_duration_ms=0)
+    selector.on_success(hosts[0], 50)
+    selector.on_success(hosts[1], 5)
+    assert selector.get_hosts_in_order_of_preference(hosts) == [hosts[1], hosts[0]]
+
+    selector.on_failure(hosts[1])
+    # the cool down is over immediately, so host 2 is tried first as a probe
+    assert selector.get_hosts_in_order_of_preference(hosts) == [hosts[1], hosts[0]]
+    # while the probe is in flight, host 2 is not probed again
+    selector.open_circuit_duration_ms = 60000
+    assert selector.get_hosts_in_order_of_preference(hosts) == [hosts[0], hosts[1]]
+
+    selector.on_success(hosts[1], 5)
+    assert selector.get_host_health(hosts[1]).circuit_opened_at is None
+
+
+def test_health_aware_host_selector_tries_failing_hosts_last():
+    hosts = [
+        Host(NormalisedURLDomain(h), NormalisedURLPath(h)) for h in [CORE_1, CORE_2]
+    ]
+    selector = HealthAwareHostSelector(failure_threshold=3)
+    selector.on_success(hosts[1], 50)
+    # host 1 has no latency data, but it has only failed so far
+    selector.on_failure(hosts[0])
+    assert selector.get_hosts_in_order_of_preference(hosts) == [hosts[1], hosts[0]]
+
+    selector.on_success(hosts[0], 5)
+    assert selector.get_hosts_in_order_of_preference(hosts) == [hosts[0], hosts[1]]
+
+
+async def test_concurrent_identical_get_requests_are_coalesced():
+    init_querier([CORE_1], coalesce_get_requests=True)
+
+    async def user_side_effect(_: httpx.Request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"status": "OK", "user": {"id": "a"}})
+
+    with respx.mock() as mocker:
+        mock_api_version(mocker)
+        route = mocker.get(CORE_1 + "/recipe/user").mock(side_effect=user_side_effect)
+
+        querier = Querier.get_instance()
+        await querier.get_api_version()
+        results = await asyncio.gather(
+            *[
+                querier.send_get_request(
+                    NormalisedURLPath("/recipe/user"), {"userId": "a"}
+                )
+                for _ in range(5)
+            ],
+            Querier.get_instance("emailpassword").send_get_request(
+                NormalisedURLPath("/recipe/user"), {"userId": "a"}
+            ),
+        )
+
+    # the request with a different rid is not coalesced with the others
+    assert route.call_count == 2
+    assert all(r == {"status": "OK", "user": {"id": "a"}} for r in results)
+    # every caller gets its own copy of the response
+    results[0]["user"]["id"] = "b"
+    assert results[1]["user"]["id"] == "a"
+
+    stats = Querier.get_request_coalescing_stats()
+    assert stats.hits == 4
+    assert stats.misses == 2
+
+
+async def test_response_cache_serves_lookups_and_is_invalidated_by_writes():
+    init_querier([CORE_1], response_cache=ResponseCacheConfig())
+
+    def metadata_side_effect(request: httpx.Request):
+        return httpx.Response(
+            200,
+            json={"status": "OK", "metadata": {"user": request.url.params["userId"]}},
+        )
+
+    with respx.mock() as mocker:
+        mock_api_version(mocker)
+        get_route = mocker.get(CORE_1 + "/recipe/user/metadata").mock(
+            side_effect=metadata_side_effect
+        )
+        mocker.put(CORE_1 + "/recipe/user/metadata").mock(
+            return_value=httpx.Response(200, json={"status": "OK", "metadata": {}})
+        )
+
+        querier = Querier.get_instance()
+        path = NormalisedURLPath("/recipe/user/metadata")
+        res = await querier.send_get_request(path, {"userId": "a"})
+        res["metadata"]["user"] = "changed by the caller"
+        assert await querier.send_get_request(path, {"userId": "a"}) == {
+            "status": "OK",
+            "metadata": {"user": "a"},
+        }
+        await querier.send_get_request(path, {"userId": "b"})
+        assert get_route.call_count == 2
+
+        await querier.send_put_request(path, {"userId": "a", "metadataUpdate": {}})
+        await querier.send_get_request(path, {"userId": "a"})
+        await querier.send_get_request(path, {"userId": "b"})
+        assert get_route.call_count == 3
+
+
+def test_in_memory_lru_response_cache_is_bounded_and_expires():
+    cache = InMemoryLRUResponseCache(max_size=2)
+    cache.set("a", "/recipe/user", "a", {"v": "a"}, 10000)
+    cache.set("b", "/recipe/user", "b", {"v": "b"}, 10000)
+    assert cache.get("a") == {"v": "a"}
+    cache.set("c", "/recipe/user", "c", {"v": "c"}, 10000)
+    # b was the least recently used entry
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    cache.set("d", "/recipe/user/roles", "d", {"v": "d"}, -1)
+    assert cache.get("d") is None
+
+    cache.invalidate("/recipe/user", "a")
+    assert cache.get("a") is None
+    assert cache.get("c") == {"v": "c"}
+
+
+async def test_slow_read_only_requests_are_hedged_to_another_core():
+    hedging = HedgingConfig(initial_delay_ms=20)
+    init_querier([CORE_1, CORE_2], host_selector=InOrderHostSelector(), hedging=hedging)
+
+    async def slow_side_effect(_: httpx.Request):
+        await asyncio.sleep(0.5)
+        return httpx.Response(200, json={"status": "OK", "core": 1})
+
+    with respx.mock(assert_all_called=False) as mocker:
+        mock_api_version(mocker)
+        mocker.post(CORE_1 + "/recipe/session/verify").mock(
+            side_effect=slow_side_effect
+        )
+        mocker.post(CORE_2 + "/recipe/session/verify").mock(
+            return_value=httpx.Response(200, json={"status": "OK", "core": 2})
+        )
+        mocker.post(CORE_1 + "/recipe/session").mock(side_effect=slow_side_effect)
+
+        querier = Querier.get_instance()
+        await querier.get_api_version()
+        res = await querier.send_post_request(
+            NormalisedURLPath("/recipe/session/verify"), {}
+        )
+        assert res == {"status": "OK", "core": 2}
+        assert hedging.stats.hedges_issued == 1
+        assert hedging.stats.hedges_won == 1
+
+        # requests that are not read only are never hedged
+        res = await querier.send_post_request(NormalisedURLPath("/recipe/session"), {})
+        assert res == {"status": "OK", "core": 1}
+        assert hedging.stats.hedges_issued == 1
+
+
+async def test_hedged_request_fails_only_if_both_requests_fail():
+    hedging = HedgingConfig(initial_delay_ms=20)
+    init_querier([CORE_1, CORE_2], host_selector=InOrderHostSelector(), hedging=hedging)
+
+    async def timeout_side_effect(request: httpx.Request):
+        await asyncio.sleep(0.05)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    async def slower_side_effect(_: httpx.Request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json={"status": "OK", "core": 2})
+
+    with respx.mock(assert_all_called=False) as mocker:
+        mock_api_version(mocker)
+        mocker.post(CORE_1 + "/recipe/session/verify").mock(
+            side_effect=timeout_side_effect
+        )
+        secondary = mocker.post(CORE_2 + "/recipe/session/verify").mock(
+            side_effect=slower_side_effect
+        )
+
+        querier = Querier.get_instance()
+        await querier.get_api_version()
+        # The primary times out (which isn't retried) while the hedge is running
+        res = await querier.send_post_request(
+            NormalisedURLPath("/recipe/session/verify"), {}
+        )
+        assert res == {"status": "OK", "core": 2}
+        assert hedging.stats.hedges_won == 1
+
+        secondary.mock(side_effect=timeout_side_effect)
+        with raises(GeneralError) as e:
+            await querier.send_post_request(
+                NormalisedURLPath("/recipe/session/verify"), {}
+            )
+        assert "timed out" in str(e.value)
+
+
+async def test_retry_policy_retries_idempotent_requests_only():
+    init_querier(
+        [CORE_1],
+        retry_policy=RetryPolicy(initial_backoff_ms=1, max_backoff_ms=5),
+    )
+    with respx.mock() as mocker:
+        mock_api_version(mocker)
+        get_route = mocker.get(CORE_1 + "/recipe/user").mock(
+            side_effect=[
+                httpx.Response(503, text="restarting"),
+                httpx.Response(502, text="bad gateway"),
+                httpx.Response(200, json={"status": "OK"}),
+            ]
+        )
+        refresh_route = mocker.post(CORE_1 + "/recipe/session/refresh").mock(
+            return_value=httpx.Response(503, text="restarting")
+        )
+
+        querier = Querier.get_instance()
+        res = await querier.send_get_request(NormalisedURLPath("/recipe/user"), {})
+        assert res == {"status": "OK"}
+        assert get_route.call_count == 3
+
+        with raises(GeneralError):
+            await querier.send_post_request(
+                NormalisedURLPath("/recipe/session/refresh"), {}
+            )
+        assert refresh_route.call_count == 1
+
+
+async def test_retry_policy_gives_up_after_max_attempts_and_times_out_attempts():
+    init_querier(
+        [CORE_1],
+        retry_policy=RetryPolicy(
+            max_attempts=2,
+            attempt_timeout_ms=20,
+            initial_backoff_ms=1,
+            max_backoff_ms=5,
+        ),
+    )
+
+    calls = 0
+
+    async def slow_side_effect(_: httpx.Request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={"status": "OK"})
+
+    with respx.mock(assert_all_called=False) as mocker:
+        mock_api_version(mocker)
+        mocker.get(CORE_1 + "/recipe/user").mock(side_effect=slow_side_effect)
+
+        querier = Querier.get_instance()
+        await querier.get_api_version()
+        with raises(GeneralError) as e:
+            await querier.send_get_request(NormalisedURLPath("/recipe/user"), {})
+        assert str(e.value) == "No SuperTokens core available to query"
+        assert calls == 2
+
+
+async def test_send_many_bounds_concurrency_and_keeps_results_in_order():
+    init_querier([CORE_1])
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def side_effect(request: httpx.Request):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        user_id = request.url.params["userId"]
+        # later requests finish first
+        await asyncio.sleep(0.01 * (10 - int(user_id)))
+        in_flight -= 1
+        if user_id == "3":
+            return httpx.Response(500, text="error")
+        return httpx.Response(200, json={"status": "OK", "userId": user_id})
+
+    with respx.mock() as mocker:
+        mock_api_version(mocker)
+        mocker.get(CORE_1 + "/recipe/user").mock(side_effect=side_effect)
+
+        querier = Querier.get_instance()
+        await querier.get_api_version()
+        results = await querier.send_many(
+            [
+                CoreRequest(
+                    "GET", NormalisedURLPath("/recipe/user"), {"userId": str(i)}
+                )
+                for i in range(8)
+            ],
+            max_concurrency=3,
+        )
+
+    assert max_in_flight == 3
+    assert len(results) == 8
+    for i, result in enumerate(results):
+        if i == 3:
+            assert isinstance(result, GeneralError)
+        else:
+            assert result == {"status": "OK", "userId": str(i)}
+
+
+async def test_request_observers_receive_events_spans_and_histograms():
+    events: List[CoreRequestEvent] = []
+    spans: List[Any] = []
+
+    class RecordingObserver(CoreRequestObserver):
+        def on_request(self, event: CoreRequestEvent) -> None:
+            events.append(event)
+
+        def on_span_start(self, method: str, path: str) -> Any:
+            return [method, path]
+
+        def on_span_end(self, span: Any, status_code: Any, error: Any) -> None:
+            spans.append((span, status_code, error))
+
+    registry = LatencyHistogramRegistry()
+    init_querier(
+        [CORE_1, CORE_2],
+        host_selector=InOrderHostSelector(),
+        request_observers=[RecordingObserver(), registry],
+    )
+    with respx.mock() as mocker:
+        mock_api_version(mocker)
+        mocker.get(CORE_1 + "/recipe/user").mock(side_effect=httpx.ConnectError)
+        mocker.get(CORE_2 + "/recipe/user").mock(
+            return_value=httpx.Response(200, json={"status": "OK"})
+        )
+
+        querier = Querier.get_instance()
+        await querier.get_api_version()
+        events.clear()
+        spans.clear()
+        await querier.send_get_request(NormalisedURLPath("/recipe/user"), {})
+
+    assert [(e.host, e.status_code, e.attempt) for e in events] == [
+        (CORE_1, None, 1),
+        (CORE_2, 200, 1),
+    ]
+    assert events[1].response_size_in_bytes == len(b'{"status": "OK"}')
+    assert spans == [(["GET", "/recipe/user"], 200, None)]
+
+    histogram = registry.get_histogram("GET", "/recipe/user", "200")
+    assert histogram is not None and histogram.count == 1
+    text = registry.to_prometheus_text()
+    assert "# TYPE supertokens_core_request_duration_seconds histogram" in text
+    assert (
+        'supertokens_core_request_duration_seconds_count{method="GET",path="/recipe/user",status="200"} 1'
+        in text
+    )
+    assert (
+        'supertokens_core_request_duration_seconds_bucket{method="GET",path="/recipe/user",status="error",le="+Inf"} 1'
+        in text
+    )
+
+
+async def test_failing_request_observers_dont_fail_requests():
+    class FailingObserver(CoreRequestObserver):
+        def on_request(self, event: CoreRequestEvent) -> None:
+            raise Exception("on_request failed")
+
+        def on_span_start(self, method: str, path: str) -> Any:
+            raise Exception("on_span_start failed")
+
+        def on_span_end(self, span: Any, status_code: Any, error: Any) -> None:
+            raise Exception("on_span_end failed")
+
+    registry = LatencyHistogramRegistry()
+    init_querier([CORE_1], request_observers=[FailingObserver(), registry])
+    with respx.mock() as mocker:
+        mock_api_version(mocker)
+        mocker.get(CORE_1 + "/recipe/user").mock(
+            return_value=httpx.Response(200, json={"status": "OK"})
+        )
+
+        querier = Querier.get_instance()
+        res = await querier.send_get_request(NormalisedURLPath("/recipe/user"), {})
+
+    assert res == {"status": "OK"}
+    # The other observers still get the events
+    histogram = registry.get_histogram("GET", "/recipe/user", "200")
+    assert histogram is not None and histogram.count == 1
+
+
+def test_sync_requests_fail_over_and_retry_without_an_event_loop():
+    init_querier(
+        [CORE_1, CORE_2],
+        host_selector=InOrderHostSelector(),
+        retry_policy=RetryPolicy(initial_backoff_ms=1, max_backoff_ms=5),
+    )
+    with respx.mock() as mocker:
+        mock_api_version(mocker, CORE_2)
+        mocker.get(CORE_1 + "/apiversion").mock(side_effect=httpx.ConnectError)
+        mocker.get(CORE_1 + "/recipe/user").mock(side_effect=httpx.ConnectError)
+        mocker.post(CORE_1 + "/recipe/session/refresh").mock(
+            side_effect=httpx.ConnectError
+        )
+        get_route = mocker.get(CORE_2 + "/recipe/user").mock(
+            side_effect=[
+                httpx.Response(503, text="restarting"),
+                httpx.Response(200, json={"status": "OK"}),
+            ]
+        )
+        post_route = mocker.post(CORE_2 + "/recipe/session/refresh").mock(
+            return_value=httpx.Response(503, text="restarting")
+        )
+
+        querier = Querier.get_instance()
+        res = querier.send_get_request_sync(NormalisedURLPath("/recipe/user"), {})
+        assert res == {"status": "OK"}
+        assert get_route.call_count == 2
+
+        with raises(GeneralError):
+            querier.send_post_request_sync(
+                NormalisedURLPath("/recipe/session/refresh"), {}
+            )
+        assert post_route.call_count == 1
+    Querier.close_sync()